@@ -5,13 +5,13 @@ from sqlalchemy import pool
 from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
 
+# Import models for Alembic autogenerate
+import app.api.v1.features.extraction.models  # noqa: F401
+import app.db.models  # noqa: F401
 from alembic import context
 from app.core.config import settings
 from app.core.database import Base
 
-# Import models for Alembic autogenerate
-from app.api.v1.features.extraction.models import ExtractionDocument
-
 config = context.config
 
 # Interpret the config file for Python logging.
@@ -0,0 +1,9 @@
+"""
+Dependencies shared by the layered routes and the feature modules.
+"""
+from uuid import UUID
+
+
+# Mock Auth Dependency
+async def get_current_user_id() -> UUID:
+    return UUID("550e8400-e29b-41d4-a716-446655440000") # Fixed test UUID
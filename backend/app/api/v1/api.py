@@ -1,7 +1,10 @@
 from fastapi import APIRouter
-from app.api.v1.routes import sessions, ai, health
+
+from app.api.v1.routes import ai, health, jobs, profiles, sessions
 
 api_router = APIRouter()
 api_router.include_router(sessions.router, prefix="/sessions", tags=["Sessions"])
 api_router.include_router(ai.router, prefix="/ai", tags=["AI"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
 api_router.include_router(health.router, prefix="/health", tags=["Health"])
+api_router.include_router(profiles.router, prefix="/profiles", tags=["Profiling"])
@@ -1,7 +1,18 @@
 
+from typing import List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import LargeBinary, func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
-from .models import ExtractionDocument
+from .models import (
+    ExtractionChunk,
+    ExtractionDocument,
+    ExtractionDocumentOwner,
+    ExtractionPage,
+)
 from .schemas import ExtractionMetadata
 
 
@@ -9,7 +20,9 @@ async def create_extraction_record(
     db: AsyncSession,
     filename: str,
     content: str,
-    metadata: ExtractionMetadata
+    metadata: ExtractionMetadata,
+    content_hash: Optional[str] = None,
+    pages: Optional[Sequence[str]] = None
 ) -> ExtractionDocument:
     """
     Creates a new extraction record in the database.
@@ -19,6 +32,8 @@ async def create_extraction_record(
         filename: Original file name.
         content: Extracted text content.
         metadata: Metadata object containing page_count and word_count.
+        content_hash: SHA-256 hex digest of the uploaded file bytes.
+        pages: Per-page text, stored in the same transaction as the document.
         
     Returns:
         The created ExtractionDocument instance.
@@ -28,9 +43,176 @@ async def create_extraction_record(
         content=content,
         page_count=metadata.page_count,
         word_count=metadata.word_count,
-        language=metadata.language
+        language=metadata.language,
+        content_hash=content_hash
     )
     db.add(db_obj)
+    if pages:
+        await db.flush()
+        # One executemany round trip for all pages
+        await db.execute(
+            insert(ExtractionPage),
+            [
+                {
+                    "document_id": db_obj.id,
+                    "page_number": number,
+                    "text": text,
+                    "char_count": len(text),
+                    "word_count": len(text.split()),
+                }
+                for number, text in enumerate(pages, start=1)
+            ],
+        )
     await db.commit()
     await db.refresh(db_obj)
     return db_obj
+
+
+async def get_extraction_by_hash(
+    db: AsyncSession,
+    content_hash: str,
+    load_content: bool = True
+) -> Optional[ExtractionDocument]:
+    """
+    Looks up a previously extracted document by the hash of its file bytes.
+
+    Uses the unique index on content_hash, so this is a single index probe.
+    With ``load_content=False`` the (possibly multi-MB) text column is not
+    read; touching ``content`` on the result then raises.
+    """
+    stmt = select(ExtractionDocument).where(
+        ExtractionDocument.content_hash == content_hash
+    )
+    if not load_content:
+        stmt = stmt.options(defer(ExtractionDocument.content, raiseload=True))
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def link_document_owner(
+    db: AsyncSession,
+    document_id: UUID,
+    user_id: UUID
+) -> None:
+    """
+    Records that ``user_id`` uploaded the document (idempotent).
+    """
+    stmt = insert(ExtractionDocumentOwner).values(
+        user_id=user_id, document_id=document_id
+    ).on_conflict_do_nothing()
+    await db.execute(stmt)
+    await db.commit()
+
+
+async def user_owns_document(
+    db: AsyncSession,
+    document_id: UUID,
+    user_id: UUID
+) -> bool:
+    """
+    Whether ``user_id`` is one of the document's owners (primary key probe).
+    """
+    owner = await db.get(ExtractionDocumentOwner, (user_id, document_id))
+    return owner is not None
+
+
+async def get_document_text_size(
+    db: AsyncSession,
+    document_id: UUID
+) -> Optional[int]:
+    """
+    Length of a document's text in UTF-8 bytes (None if there is no document).
+    """
+    stmt = select(func.octet_length(ExtractionDocument.content)).where(
+        ExtractionDocument.id == document_id
+    )
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def read_document_text(
+    db: AsyncSession,
+    document_id: UUID,
+    start: int,
+    length: int
+) -> bytes:
+    """
+    Returns ``length`` bytes of a document's UTF-8 text from byte ``start``
+    (0-based). Only that slice is sent from the database.
+    """
+    encoded = func.convert_to(ExtractionDocument.content, "UTF8")
+    stmt = select(
+        func.substring(encoded, start + 1, length, type_=LargeBinary)
+    ).where(ExtractionDocument.id == document_id)
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none() or b""
+
+
+async def get_document_pages(
+    db: AsyncSession,
+    document_id: UUID,
+    start: int,
+    end: Optional[int] = None
+) -> List[ExtractionPage]:
+    """
+    Returns pages ``start``..``end`` (inclusive, 1-based) of a document.
+
+    Uses the (document_id, page_number) primary key, so only the requested
+    rows are read.
+    """
+    stmt = (
+        select(ExtractionPage)
+        .where(
+            ExtractionPage.document_id == document_id,
+            ExtractionPage.page_number >= start,
+        )
+        .order_by(ExtractionPage.page_number)
+    )
+    if end is not None:
+        stmt = stmt.where(ExtractionPage.page_number <= end)
+    result = await db.execute(stmt)
+    return list(result.scalars())
+
+
+async def create_document_chunks(
+    db: AsyncSession,
+    document_id: UUID,
+    chunks: Sequence,
+    vectors: Sequence[bytes]
+) -> None:
+    """
+    Stores a document's retrieval chunks and their vectors.
+
+    Args:
+        chunks: ``retrieval_index.Chunk`` objects, in document order.
+        vectors: The encoded vector of each chunk.
+    """
+    db.add_all(
+        ExtractionChunk(
+            document_id=document_id,
+            chunk_index=i,
+            char_start=chunk.start,
+            char_end=chunk.end,
+            page_start=chunk.page_start,
+            page_end=chunk.page_end,
+            vector=vector,
+        )
+        for i, (chunk, vector) in enumerate(zip(chunks, vectors))
+    )
+    await db.commit()
+
+
+async def get_document_chunks(
+    db: AsyncSession,
+    document_id: UUID
+) -> List[ExtractionChunk]:
+    """
+    Returns a document's retrieval chunks in document order.
+    """
+    stmt = (
+        select(ExtractionChunk)
+        .where(ExtractionChunk.document_id == document_id)
+        .order_by(ExtractionChunk.chunk_index)
+    )
+    result = await db.execute(stmt)
+    return list(result.scalars())
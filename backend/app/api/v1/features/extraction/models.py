@@ -1,8 +1,19 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, Integer, String, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import (
+    Column,
+    Computed,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import deferred
 
 from app.core.database import Base
 
@@ -12,6 +23,13 @@ class ExtractionDocument(Base):
     Database model for stored extracted PDF content.
     """
     __tablename__ = "extraction_documents"
+    __table_args__ = (
+        Index(
+            "ix_extraction_documents_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     filename = Column(String(255), nullable=False)
@@ -19,9 +37,90 @@ class ExtractionDocument(Base):
     page_count = Column(Integer, nullable=False)
     word_count = Column(Integer, nullable=False)
     language = Column(String(10), default="en")
+    # SHA-256 of the uploaded file bytes; identical uploads share one row
+    content_hash = Column(String(64), unique=True, index=True, nullable=True)
+    # Maintained by Postgres. Only the first 500k characters are indexed:
+    # a tsvector is capped at 1MB and longer input would fail the insert.
+    # Deferred: it is only ever used inside search queries
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "to_tsvector('english', coalesce(filename, '') || ' ' || "
+                "left(content, 500000))",
+                persisted=True,
+            ),
+        )
+    )
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def __repr__(self) -> str:
-        return f"<ExtractionDocument(filename='{self.filename}', pages={self.page_count})>"
+        return (
+            f"<ExtractionDocument(filename='{self.filename}', "
+            f"pages={self.page_count})>"
+        )
+
+
+class ExtractionDocumentOwner(Base):
+    """
+    Links users to the documents they uploaded.
+
+    Documents are deduplicated by content, so one row may belong to several
+    users; this table decides whose searches and listings it appears in.
+    """
+    __tablename__ = "extraction_document_owners"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    document_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("extraction_documents.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ExtractionChunk(Base):
+    """
+    Retrieval chunk of an extracted document.
+
+    Text is not duplicated: ``char_start``/``char_end`` slice the document's
+    ``content``. ``vector`` is the chunk's sparse hashed term vector (see
+    ``app.services.retrieval_index``).
+    """
+    __tablename__ = "extraction_chunks"
+
+    document_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("extraction_documents.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    chunk_index = Column(Integer, primary_key=True)
+    char_start = Column(Integer, nullable=False)
+    char_end = Column(Integer, nullable=False)
+    page_start = Column(Integer, nullable=False)
+    page_end = Column(Integer, nullable=False)
+    vector = Column(LargeBinary, nullable=False)
+
+
+class ExtractionPage(Base):
+    """
+    Text of one page of an extracted document.
+
+    Lets page-range reads touch only the requested rows instead of loading
+    and splitting the whole ``content`` blob.
+    """
+    __tablename__ = "extraction_pages"
+
+    document_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("extraction_documents.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # 1-based; empty pages are stored too so numbering matches the PDF
+    page_number = Column(Integer, primary_key=True)
+    text = Column(Text, nullable=False)
+    char_count = Column(Integer, nullable=False)
+    word_count = Column(Integer, nullable=False)
@@ -1,46 +1,156 @@
-from fastapi import APIRouter, Depends, File, UploadFile
+from typing import Literal, Optional, Union
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.core.schemas.responses import SuccessResponse
+from app.api.deps import get_current_user_id
+from app.core.database import get_db, get_read_db
+from app.core.schemas.responses import MetaData, SuccessResponse
+from app.utils.ranges import RangeNotSatisfiable, offset_range, parse_range_header
+from app.utils.responses import ModelResponse
+from app.utils.streaming import STREAMING_HEADERS, stream_media_type
+from app.utils.uploads import spool_upload
 
-from .crud import create_extraction_record
-from .schemas import ExtractionData
+from .schemas import ExtractionData, ExtractionPagesData, ExtractionSummary
 from .services import extraction_service
 
 router = APIRouter()
 
 @router.post(
     "/upload",
-    response_model=SuccessResponse[ExtractionData],
+    response_model=Union[
+        SuccessResponse[ExtractionData], SuccessResponse[ExtractionSummary]
+    ],
     summary="Upload and extract PDF content",
-    description="Accepts a PDF file, extracts its text, saves it to the database, and returns the results."
+    description=(
+        "Accepts a PDF file, extracts its text, saves it to the database, "
+        "and returns the results. With `include_text=false` only the id and "
+        "metadata are returned; the text can then be read in ranges from "
+        "`GET /{document_id}/text`. With `stream=ndjson` or `stream=sse` each "
+        "page's text is sent as soon as it is extracted. Files identical to an "
+        "earlier upload are served from the stored record without re-parsing."
+    )
 )
 async def upload_document(
     file: UploadFile = File(..., description="The PDF file to extract content from"),
-    db: AsyncSession = Depends(get_db)
+    stream: Optional[Literal["ndjson", "sse"]] = Query(
+        None, description="Stream per-page results as NDJSON or server-sent events"
+    ),
+    include_text: bool = Query(
+        True, description="Set to false to receive only the id and metadata"
+    ),
+    db: AsyncSession = Depends(get_db),
+    user_id: UUID = Depends(get_current_user_id)
 ):
     """
     Endpoint to handle PDF uploads and extraction.
     """
-    # 1. Extract content and metadata
-    text, metadata = await extraction_service.extract_text_from_pdf(file)
-    
-    # 2. Persist to database
-    db_obj = await create_extraction_record(
-        db=db,
-        filename=file.filename,
-        content=text,
-        metadata=metadata
+    extraction_service.validate_pdf_upload(file)
+    # Spool before anything else: the form file is closed once the handler returns
+    upload = await spool_upload(file)
+
+    if stream:
+        return StreamingResponse(
+            extraction_service.stream_extraction(upload, stream, user_id),
+            media_type=stream_media_type(stream),
+            headers=STREAMING_HEADERS,
+        )
+
+    try:
+        # 1. Extract and persist, or reuse an identical earlier upload
+        db_obj, deduplicated, report = await extraction_service.ingest(
+            db, upload, user_id, include_text
+        )
+    finally:
+        upload.cleanup()
+
+    # 2. Construct response data (a shared row is described as this upload)
+    uploaded = upload if deduplicated else None
+    extraction_data = (
+        extraction_service.to_extraction_data(db_obj, uploaded)
+        if include_text
+        else extraction_service.to_extraction_summary(db_obj, uploaded)
+    )
+
+    # Serialized once, straight to bytes: the text can be megabytes long
+    return ModelResponse(SuccessResponse(
+        data=extraction_data,
+        meta=MetaData(extra={
+            "deduplicated": deduplicated,
+            "extraction": report.to_dict() if report else None,
+        })
+    ))
+
+@router.get(
+    "/{document_id}/pages",
+    response_model=SuccessResponse[ExtractionPagesData],
+    summary="Get a page range of an extracted document",
+    description=(
+        "Returns the text and counts of pages `start` to `end` (inclusive, "
+        "1-based). Only the requested pages are read. Omit `end` to read to "
+        "the last page."
     )
-    
-    # 3. Construct response data
-    extraction_data = ExtractionData(
-        id=db_obj.id,
-        filename=db_obj.filename,
-        text=db_obj.content,
-        metadata=metadata,
-        created_at=db_obj.created_at
+)
+async def get_document_pages(
+    document_id: UUID,
+    start: int = Query(1, ge=1, description="First page to return"),
+    end: Optional[int] = Query(None, ge=1, description="Last page to return"),
+    db: AsyncSession = Depends(get_read_db),
+    user_id: UUID = Depends(get_current_user_id)
+):
+    if end is not None and end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    pages = await extraction_service.get_pages(db, document_id, user_id, start, end)
+    return ModelResponse(SuccessResponse(
+        data=ExtractionPagesData(document_id=document_id, pages=pages)
+    ))
+
+@router.get(
+    "/{document_id}/text",
+    response_class=StreamingResponse,
+    summary="Stream the text of an extracted document",
+    description=(
+        "Streams the document's text as UTF-8, read from the database in "
+        "chunks. A byte range can be selected with a `Range: bytes=...` "
+        "header or with `offset` and `length` (in bytes); the response is "
+        "then 206 Partial Content with a `Content-Range` header. The header "
+        "takes precedence over the query parameters."
+    ),
+    responses={
+        200: {"content": {"text/plain": {}}, "description": "The whole text"},
+        206: {"content": {"text/plain": {}}, "description": "The requested byte range"},
+        416: {"description": "The range starts past the end of the text"},
+    },
+)
+async def get_document_text(
+    document_id: UUID,
+    offset: Optional[int] = Query(None, ge=0, description="First byte to return"),
+    length: Optional[int] = Query(None, ge=1, description="Maximum bytes to return"),
+    range_header: Optional[str] = Header(None, alias="Range"),
+    db: AsyncSession = Depends(get_read_db),
+    user_id: UUID = Depends(get_current_user_id)
+):
+    size = await extraction_service.get_text_size(db, document_id, user_id)
+    try:
+        selected = parse_range_header(range_header, size) if range_header else None
+        if selected is None and (offset is not None or length is not None):
+            selected = offset_range(offset or 0, length, size)
+    except RangeNotSatisfiable:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range is outside the text",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+
+    start, end = selected or (0, size)
+    headers = {"Accept-Ranges": "bytes", "Content-Length": str(end - start)}
+    if selected is not None:
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    return StreamingResponse(
+        extraction_service.iter_text(document_id, start, end),
+        status_code=206 if selected is not None else 200,
+        media_type="text/plain; charset=utf-8",
+        headers=headers,
     )
-    
-    return SuccessResponse(data=extraction_data)
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import List
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field
@@ -25,3 +26,30 @@ class ExtractionData(BaseModel):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+class ExtractionSummary(BaseModel):
+    """
+    A stored document without its text.
+    """
+    id: UUID = Field(..., description="Unique ID of the document record")
+    filename: str = Field(..., description="Original name of the uploaded file")
+    metadata: ExtractionMetadata
+    created_at: datetime
+
+class ExtractionPageData(BaseModel):
+    """
+    Text and counts of a single page.
+    """
+    page_number: int = Field(..., description="1-based page number")
+    text: str = Field(..., description="Extracted text of the page")
+    char_count: int
+    word_count: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+class ExtractionPagesData(BaseModel):
+    """
+    A page range of a stored document.
+    """
+    document_id: UUID
+    pages: List[ExtractionPageData]
@@ -1,17 +1,84 @@
-import io
+import os
+import time
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+from uuid import UUID
 
-import pdfplumber
 from fastapi import HTTPException, UploadFile
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from .schemas import ExtractionMetadata
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, ReadSessionLocal
+from app.core.errors import APIError
+from app.core.metrics import Counter, Histogram
+from app.services.pdf_engine import ExtractionReport, pdf_engine
+from app.services.retrieval_service import retrieval_service
+from app.utils.streaming import stream_frame
+from app.utils.uploads import SpooledUpload, spool_upload
+
+from .crud import (
+    create_extraction_record,
+    get_document_pages,
+    get_document_text_size,
+    get_extraction_by_hash,
+    link_document_owner,
+    read_document_text,
+    user_owns_document,
+)
+from .models import ExtractionDocument
+from .schemas import (
+    ExtractionData,
+    ExtractionMetadata,
+    ExtractionPageData,
+    ExtractionSummary,
+)
+
+EXTRACTION_DOCUMENTS = Counter(
+    "extraction_documents_total", "PDF documents extracted", ("outcome",)
+)
+EXTRACTION_PAGES = Counter(
+    "extraction_pages_total",
+    "Pages extracted, by the backend that produced them",
+    ("backend",),
+)
+EXTRACTION_BYTES = Counter("extraction_bytes_total", "PDF bytes extracted")
+EXTRACTION_SECONDS = Histogram(
+    "extraction_duration_seconds", "Time to extract one document"
+)
+EXTRACTION_PAGES_PER_SECOND = Histogram(
+    "extraction_pages_per_second",
+    "Extraction throughput of each document",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000),
+)
+
+
+def record_extraction(size_bytes: int, report: ExtractionReport) -> None:
+    EXTRACTION_DOCUMENTS.labels("ok").inc()
+    EXTRACTION_PAGES.labels("fast").inc(report.fast_pages)
+    EXTRACTION_PAGES.labels("layout").inc(report.layout_pages)
+    EXTRACTION_BYTES.inc(size_bytes)
+    EXTRACTION_SECONDS.observe(report.total_seconds)
+    if report.page_count and report.total_seconds > 0:
+        EXTRACTION_PAGES_PER_SECOND.observe(report.page_count / report.total_seconds)
 
 
 class ExtractionService:
     """
     Business logic for extracting text and metadata from PDF files.
     """
-    
-    async def extract_text_from_pdf(self, file: UploadFile) -> tuple[str, ExtractionMetadata]:
+
+    def validate_pdf_upload(self, file: UploadFile) -> None:
+        """
+        Raises:
+            HTTPException: If the file is not a PDF.
+        """
+        if not file.filename.lower().endswith(".pdf"):
+            raise HTTPException(status_code=400, detail="Only PDF files are supported.")
+
+    async def extract_text_from_pdf(
+        self, file: UploadFile
+    ) -> tuple[str, ExtractionMetadata]:
         """
         Extracts text and metadata from an uploaded PDF file.
         
@@ -23,40 +90,303 @@ class ExtractionService:
             
         Raises:
             HTTPException: If the file is not a valid PDF or extraction fails.
+            APIError: If the file exceeds the upload size limit.
         """
-        if not file.filename.lower().endswith(".pdf"):
-            raise HTTPException(status_code=400, detail="Only PDF files are supported.")
+        self.validate_pdf_upload(file)
 
+        # Stream the upload to disk instead of reading it into memory
+        upload = await spool_upload(file)
         try:
-            content = await file.read()
-            text_parts = []
-            page_count = 0
-            
-            # Use io.BytesIO to handle the file in memory
-            with pdfplumber.open(io.BytesIO(content)) as pdf:
-                page_count = len(pdf.pages)
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_parts.append(page_text)
-            
-            full_text = "\n".join(text_parts)
-            word_count = len(full_text.split())
-            
-            metadata = ExtractionMetadata(
-                page_count=page_count,
-                word_count=word_count,
-                language="en"  # Defaulting to English for MVP
-            )
-            
-            return full_text, metadata
-            
+            return await self.extract_text_from_path(upload.path)
+        finally:
+            upload.cleanup()
+
+    async def extract_text_from_path(self, path: str) -> tuple[str, ExtractionMetadata]:
+        """
+        Extracts text and metadata from a PDF on disk.
+        """
+        pages, _ = await self.extract_document_from_path(path)
+        return self.build_result(pages)
+
+    async def extract_document_from_path(
+        self, path: str
+    ) -> tuple[List[str], ExtractionReport]:
+        """
+        Extracts the text of each page of a PDF on disk, with the engine's
+        quality/speed report.
+        """
+        try:
+            # Pages are extracted off the event loop (process pool for large PDFs)
+            pages, report = await pdf_engine.extract_document(path)
         except Exception as e:
+            EXTRACTION_DOCUMENTS.labels("error").inc()
             raise HTTPException(
                 status_code=500, 
                 detail=f"Failed to extract text from PDF: {str(e)}"
             )
+        record_extraction(os.path.getsize(path), report)
+        return pages, report
+
+    def build_result(self, pages: List[str]) -> tuple[str, ExtractionMetadata]:
+        """
+        Joins per-page text and computes the document metadata.
+        """
+        full_text = "\n".join(text for text in pages if text)
+        word_count = len(full_text.split())
+
+        metadata = ExtractionMetadata(
+            page_count=len(pages),
+            word_count=word_count,
+            language="en"  # Defaulting to English for MVP
+        )
+
+        return full_text, metadata
+
+    def to_extraction_data(
+        self, db_obj: ExtractionDocument, upload: Optional[SpooledUpload] = None
+    ) -> ExtractionData:
+        """
+        Builds the API representation of a stored document.
+
+        Pass ``upload`` for a deduplicated upload: the row is shared by
+        everyone who uploaded the same bytes, so the filename and time
+        reported are this upload's rather than the first uploader's.
+        """
+        return ExtractionData(
+            text=db_obj.content, **self._document_fields(db_obj, upload)
+        )
+
+    def to_extraction_summary(
+        self, db_obj: ExtractionDocument, upload: Optional[SpooledUpload] = None
+    ) -> ExtractionSummary:
+        """
+        Builds the API representation of a stored document, without its text.
+        """
+        return ExtractionSummary(**self._document_fields(db_obj, upload))
+
+    def _document_fields(
+        self, db_obj: ExtractionDocument, upload: Optional[SpooledUpload]
+    ) -> dict:
+        return dict(
+            id=db_obj.id,
+            filename=upload.filename if upload else db_obj.filename,
+            metadata=ExtractionMetadata(
+                page_count=db_obj.page_count,
+                word_count=db_obj.word_count,
+                language=db_obj.language or "en"
+            ),
+            created_at=datetime.utcnow() if upload else db_obj.created_at
+        )
+
+    async def _check_owner(
+        self, db: AsyncSession, document_id: UUID, user_id: UUID
+    ) -> None:
+        if not await user_owns_document(db, document_id, user_id):
+            raise APIError(
+                code="DOCUMENT_NOT_FOUND",
+                message="Document not found",
+                status_code=404,
+            )
+
+    async def get_pages(
+        self,
+        db: AsyncSession,
+        document_id: UUID,
+        user_id: UUID,
+        start: int = 1,
+        end: Optional[int] = None
+    ) -> List[ExtractionPageData]:
+        """
+        Returns a page range of a document owned by ``user_id``.
+
+        Raises:
+            APIError: If the document does not exist, belongs to someone
+                else, or was stored before per-page storage existed.
+        """
+        await self._check_owner(db, document_id, user_id)
+        pages = await get_document_pages(db, document_id, start, end)
+        if not pages:
+            # Either the range is past the end or the document predates pages
+            document = await db.get(ExtractionDocument, document_id)
+            if start <= document.page_count:
+                raise APIError(
+                    code="PAGES_UNAVAILABLE",
+                    message="This document was stored without per-page text",
+                    status_code=409,
+                )
+        return [ExtractionPageData.model_validate(page) for page in pages]
+
+    async def get_text_size(
+        self, db: AsyncSession, document_id: UUID, user_id: UUID
+    ) -> int:
+        """
+        Returns the length in UTF-8 bytes of a document owned by ``user_id``.
+
+        Raises:
+            APIError: If the document does not exist or belongs to someone else.
+        """
+        await self._check_owner(db, document_id, user_id)
+        return await get_document_text_size(db, document_id) or 0
+
+    async def iter_text(
+        self, document_id: UUID, start: int, end: int
+    ) -> AsyncIterator[bytes]:
+        """
+        Streams bytes ``start`` to ``end`` (exclusive) of a document's text.
+
+        Each slice is one query on a short-lived session, so no connection is
+        held while the client reads. Ranges are in bytes, so a range edge may
+        split a multi-byte character; consecutive ranges join up exactly.
+        """
+        chunk_bytes = settings.EXTRACTION_TEXT_CHUNK_BYTES
+        for offset in range(start, end, chunk_bytes):
+            async with ReadSessionLocal() as db:
+                yield await read_document_text(
+                    db, document_id, offset, min(chunk_bytes, end - offset)
+                )
+
+    async def ingest(
+        self,
+        db: AsyncSession,
+        upload: SpooledUpload,
+        user_id: Optional[UUID] = None,
+        include_text: bool = True
+    ) -> tuple[ExtractionDocument, bool, Optional[ExtractionReport]]:
+        """
+        Extracts and stores a spooled upload, reusing an identical earlier upload.
+
+        Documents are content-addressed by the SHA-256 of the file bytes, so a
+        repeat upload is a single indexed lookup with no parsing. The uploader
+        is recorded as an owner of the document either way. New documents are
+        chunked and indexed for retrieval. Without ``include_text`` a reused
+        row is loaded without its text.
+
+        Returns:
+            The stored document, whether it was an existing (deduplicated) row,
+            and the extraction report (None when nothing was extracted).
+        """
+        report = None
+        existing = await get_extraction_by_hash(
+            db, upload.sha256, load_content=include_text
+        )
+        if existing is not None:
+            db_obj, deduplicated = existing, True
+        else:
+            # Release the connection while the (slow) extraction runs
+            await db.rollback()
+            pages, report = await self.extract_document_from_path(upload.path)
+            db_obj, deduplicated = await self._store(db, upload, pages)
+
+        if user_id is not None:
+            await link_document_owner(db, db_obj.id, user_id)
+        return db_obj, deduplicated, report
+
+    async def _store(
+        self,
+        db: AsyncSession,
+        upload: SpooledUpload,
+        pages: List[str]
+    ) -> tuple[ExtractionDocument, bool]:
+        text, metadata = self.build_result(pages)
+        try:
+            db_obj = await create_extraction_record(
+                db=db,
+                filename=upload.filename,
+                content=text,
+                metadata=metadata,
+                content_hash=upload.sha256,
+                pages=pages
+            )
+        except IntegrityError:
+            # A concurrent upload of the same bytes won the insert
+            await db.rollback()
+            existing = await get_extraction_by_hash(db, upload.sha256)
+            if existing is None:
+                raise
+            return existing, True
+        await retrieval_service.index_document(db, db_obj, pages)
+        return db_obj, False
+
+    async def stream_extraction(
+        self,
+        upload: SpooledUpload,
+        stream_format: str,
+        user_id: Optional[UUID] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Streams page text as each page is extracted, then persists the document.
+
+        Emits one ``page`` message per page followed by a final ``complete``
+        message carrying the stored record (without the text, which the client
+        already has). A repeat upload skips extraction and sends only the
+        ``complete`` message, text included. Failures are reported in-band as
+        an ``error`` message. The spooled upload is removed when the stream ends.
+        """
+        pages = []
+        results = []
+        started = time.perf_counter()
+        try:
+            # The request-scoped session is closed before a streamed body is
+            # sent, so the stream opens short-lived sessions of its own
+            async with AsyncSessionLocal() as db:
+                existing = await get_extraction_by_hash(db, upload.sha256)
+                if existing is not None and user_id is not None:
+                    await link_document_owner(db, existing.id, user_id)
+            if existing is not None:
+                data = self.to_extraction_data(existing, upload)
+                yield stream_frame(
+                    {
+                        "type": "complete",
+                        "deduplicated": True,
+                        "data": data.model_dump(),
+                    },
+                    stream_format,
+                )
+                return
+
+            async for page_number, result in pdf_engine.iter_results(upload.path):
+                pages.append(result.text)
+                results.append(result)
+                yield stream_frame(
+                    {"type": "page", "page": page_number, "text": result.text},
+                    stream_format,
+                )
+            report = ExtractionReport.from_pages(results, time.perf_counter() - started)
+            pdf_engine.record(report)
+            record_extraction(upload.size, report)
+
+            async with AsyncSessionLocal() as db:
+                db_obj, deduplicated = await self._store(db, upload, pages)
+                if user_id is not None:
+                    await link_document_owner(db, db_obj.id, user_id)
+
+            data = self.to_extraction_data(db_obj, upload if deduplicated else None)
+            yield stream_frame(
+                {
+                    "type": "complete",
+                    "deduplicated": deduplicated,
+                    "data": data.model_dump(exclude={"text"}),
+                    "extraction": report.to_dict(),
+                },
+                stream_format,
+            )
+        except APIError as e:
+            yield stream_frame(
+                {"type": "error", "error": {"code": e.code, "message": e.message}},
+                stream_format,
+            )
+        except Exception as e:
+            yield stream_frame(
+                {
+                    "type": "error",
+                    "error": {
+                        "code": "EXTRACTION_FAILED",
+                        "message": f"Failed to extract text from PDF: {str(e)}",
+                    },
+                },
+                stream_format,
+            )
         finally:
-            await file.seek(0)  # Reset file pointer for potential future use
+            upload.cleanup()
 
 extraction_service = ExtractionService()
@@ -0,0 +1,150 @@
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import and_, func, literal_column, select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.features.extraction.models import (
+    ExtractionDocument,
+    ExtractionDocumentOwner,
+)
+from app.db.models import StudySession
+
+# Must match the configuration used by the generated search_vector columns.
+# Inlined as a regconfig literal rather than sent as a text parameter
+TEXT_SEARCH_CONFIG = literal_column("'english'::regconfig")
+
+HEADLINE_OPTIONS = (
+    "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, "
+    'MaxFragments=2, FragmentDelimiter=" ... "'
+)
+
+# ts_headline re-parses the text it is given, so it only sees the start of
+# very long documents (matches further in still rank, with a leading excerpt)
+HEADLINE_MAX_CHARS = 100_000
+
+# Matches ranked per query. ts_rank_cd reads each match's whole tsvector, so
+# a very common term ranks only this many of its matches, not all of them
+MAX_RANKED_CANDIDATES = 1000
+
+
+def _tsquery(query: str):
+    # websearch syntax: quoted phrases, OR, and -exclusions; never a syntax error
+    return func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, query)
+
+
+def _headline(text_column, tsquery):
+    return func.ts_headline(
+        TEXT_SEARCH_CONFIG,
+        func.left(text_column, HEADLINE_MAX_CHARS),
+        tsquery,
+        HEADLINE_OPTIONS,
+    )
+
+
+async def search_documents(
+    db: AsyncSession,
+    user_id: UUID,
+    query: str,
+    limit: int
+) -> List[Row]:
+    """
+    Ranks the user's extraction documents against ``query``.
+
+    The GIN index on search_vector finds up to MAX_RANKED_CANDIDATES
+    matches; only those are ranked, and only the top ``limit`` rows are
+    re-read for their snippets.
+
+    Ownership comes from extraction_document_owners. Documents stored
+    before that table existed have no recorded uploader, so they are not
+    searchable until their owner uploads the file again (a deduplicated
+    upload links the owner without re-extracting).
+    """
+    tsquery = _tsquery(query)
+    candidates = (
+        select(ExtractionDocument.id)
+        .join(
+            ExtractionDocumentOwner,
+            and_(
+                ExtractionDocumentOwner.document_id == ExtractionDocument.id,
+                ExtractionDocumentOwner.user_id == user_id,
+            ),
+        )
+        .where(ExtractionDocument.search_vector.op("@@")(tsquery))
+        .limit(MAX_RANKED_CANDIDATES)
+        .cte("candidates")
+    )
+    rank = func.ts_rank_cd(ExtractionDocument.search_vector, tsquery)
+    top = (
+        select(
+            ExtractionDocument.id,
+            ExtractionDocument.filename.label("title"),
+            ExtractionDocument.created_at,
+            rank.label("rank"),
+        )
+        .join(candidates, candidates.c.id == ExtractionDocument.id)
+        .order_by(rank.desc())
+        .limit(limit)
+        .subquery()
+    )
+    stmt = (
+        select(
+            top.c.id,
+            top.c.title,
+            top.c.created_at,
+            top.c.rank,
+            _headline(ExtractionDocument.content, tsquery).label("snippet"),
+        )
+        .join(ExtractionDocument, ExtractionDocument.id == top.c.id)
+        .order_by(top.c.rank.desc())
+    )
+    return (await db.execute(stmt)).all()
+
+
+async def search_sessions(
+    db: AsyncSession,
+    user_id: UUID,
+    query: str,
+    limit: int
+) -> List[Row]:
+    """
+    Ranks the user's study sessions (title and source text) against ``query``.
+    """
+    tsquery = _tsquery(query)
+    candidates = (
+        select(StudySession.id)
+        .where(
+            StudySession.user_id == user_id,
+            StudySession.search_vector.op("@@")(tsquery),
+        )
+        .limit(MAX_RANKED_CANDIDATES)
+        .cte("candidates")
+    )
+    rank = func.ts_rank_cd(StudySession.search_vector, tsquery)
+    top = (
+        select(
+            StudySession.id,
+            StudySession.title,
+            StudySession.created_at,
+            rank.label("rank"),
+        )
+        .join(candidates, candidates.c.id == StudySession.id)
+        .order_by(rank.desc())
+        .limit(limit)
+        .subquery()
+    )
+    stmt = (
+        select(
+            top.c.id,
+            top.c.title,
+            top.c.created_at,
+            top.c.rank,
+            _headline(
+                func.coalesce(StudySession.original_text, StudySession.title), tsquery
+            ).label("snippet"),
+        )
+        .join(StudySession, StudySession.id == top.c.id)
+        .order_by(top.c.rank.desc())
+    )
+    return (await db.execute(stmt)).all()
@@ -0,0 +1,36 @@
+import time
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user_id
+from app.core.database import get_read_db
+from app.core.schemas.responses import MetaData, SuccessResponse
+
+from .schemas import SearchData, SearchScope
+from .services import search_service
+
+router = APIRouter()
+
+@router.get(
+    "",
+    response_model=SuccessResponse[SearchData],
+    summary="Search your documents and sessions",
+    description=(
+        "Full-text search over the text of the caller's extracted documents "
+        "and study sessions. Supports quoted phrases, `OR` and `-word`. "
+        "Results are ranked by relevance and include highlighted snippets."
+    )
+)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Search query"),
+    scope: SearchScope = Query("all", description="Limit results to one kind"),
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db),
+    user_id: UUID = Depends(get_current_user_id)
+):
+    started = time.perf_counter()
+    data = await search_service.search(db, user_id, q, scope, limit)
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+    return SuccessResponse(data=data, meta=MetaData(processing_time_ms=elapsed_ms))
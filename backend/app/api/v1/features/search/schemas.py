@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import List, Literal
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+SearchScope = Literal["all", "documents", "sessions"]
+
+
+class SearchResult(BaseModel):
+    """
+    One ranked match with a highlighted excerpt.
+    """
+    kind: Literal["document", "session"] = Field(..., description="What matched")
+    id: UUID = Field(..., description="Extraction document or session ID")
+    title: str = Field(..., description="Document filename or session title")
+    rank: float = Field(..., description="Relevance score (higher is better)")
+    snippet: str = Field(
+        ..., description="Excerpt with matched terms wrapped in <mark> tags"
+    )
+    created_at: datetime
+
+
+class SearchData(BaseModel):
+    query: str
+    results: List[SearchResult]
@@ -0,0 +1,37 @@
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .crud import search_documents, search_sessions
+from .schemas import SearchData, SearchResult, SearchScope
+
+
+class SearchService:
+    """
+    Full-text search over the calling user's documents and sessions.
+    """
+
+    async def search(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        query: str,
+        scope: SearchScope = "all",
+        limit: int = 20
+    ) -> SearchData:
+        """
+        Returns the best ``limit`` matches across the requested scope, best first.
+        """
+        results = []
+        if scope in ("all", "documents"):
+            rows = await search_documents(db, user_id, query, limit)
+            results += [SearchResult(kind="document", **row._mapping) for row in rows]
+        if scope in ("all", "sessions"):
+            rows = await search_sessions(db, user_id, query, limit)
+            results += [SearchResult(kind="session", **row._mapping) for row in rows]
+
+        results.sort(key=lambda r: r.rank, reverse=True)
+        return SearchData(query=query, results=results[:limit])
+
+
+search_service = SearchService()
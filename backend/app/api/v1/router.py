@@ -3,6 +3,7 @@ from fastapi import APIRouter
 from app.api.v1.features.diagram.routes import router as diagram_router
 from app.api.v1.features.extraction.routes import router as extraction_router
 from app.api.v1.features.quiz.routes import router as quiz_router
+from app.api.v1.features.search.routes import router as search_router
 from app.api.v1.features.summarization.routes import router as summarization_router
 
 api_router = APIRouter()
@@ -10,6 +11,9 @@ api_router = APIRouter()
 # Extraction
 api_router.include_router(extraction_router, prefix="/extraction", tags=["Extraction"])
 
+# Search
+api_router.include_router(search_router, prefix="/search", tags=["Search"])
+
 # AI Features
 api_router.include_router(
     summarization_router, prefix="/ai/summarize", tags=["Summarization"]
@@ -1,21 +1,225 @@
-from fastapi import APIRouter, HTTPException
-from app.schemas.common import SuccessResponse
-from app.schemas.ai import SummarizeRequest, SummaryResponse, QuizRequest, QuizResponse, DiagramRequest, DiagramResponse
+import time
+from typing import Literal, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.api.deps import get_current_user_id
+from app.core.errors import APIError
+from app.db.repositories.sessions_repo import sessions_repo
+from app.schemas.ai import (
+    DiagramRequest,
+    DiagramResponse,
+    QuizRequest,
+    QuizResponse,
+    RetrievalOptions,
+    StudyPackRequest,
+    StudyPackResponse,
+    SummarizeRequest,
+    SummaryResponse,
+)
+from app.schemas.common import ErrorDetail, SuccessResponse
+from app.schemas.jobs import JobResponse
 from app.services.gemini_service import gemini_service
+from app.services.job_queue import job_queue
+from app.services.retrieval_service import retrieval_service
+from app.utils.streaming import (
+    SSE_MEDIA_TYPE,
+    STREAMING_HEADERS,
+    sse_event,
+    stream_frame,
+    stream_media_type,
+)
 
 router = APIRouter()
 
+ASYNC_MODE_DESCRIPTION = (
+    "Queue the generation as a background job and return 202 with the job; "
+    "poll /jobs/{id} for the result"
+)
+
+async def _enqueue(operation: str, payload: dict, user_id: UUID) -> JSONResponse:
+    job = await job_queue.enqueue(operation, payload, user_id)
+    return JSONResponse(
+        status_code=202,
+        content=jsonable_encoder(SuccessResponse(data=JobResponse.model_validate(job))),
+        headers={"Location": f"/api/v1/jobs/{job.id}"},
+    )
+
+async def _enqueue_generation(
+    operation: str, req: RetrievalOptions, user_id: UUID
+) -> JSONResponse:
+    # The job stores the request, not the text: a stored document is loaded
+    # by the worker, so it is not copied into the queue table
+    if req.document_id is not None:
+        await retrieval_service.check_access(req.document_id, user_id)
+    payload = req.model_dump(mode="json", exclude_none=True)
+    return await _enqueue(operation, payload, user_id)
+
 @router.post("/summarize", response_model=SuccessResponse[SummaryResponse])
-async def summarize(req: SummarizeRequest):
-    result = await gemini_service.summarize(req.content, req.style)
+async def summarize(
+    req: SummarizeRequest,
+    async_mode: bool = Query(False, alias="async", description=ASYNC_MODE_DESCRIPTION),
+    user_id: UUID = Depends(get_current_user_id),
+):
+    if async_mode:
+        return await _enqueue_generation("summarize", req, user_id)
+    content = await retrieval_service.select_for(req, user_id)
+    result = await gemini_service.summarize(content, req.style)
     return SuccessResponse(data=SummaryResponse(**result))
 
+@router.post(
+    "/summarize/stream",
+    response_class=StreamingResponse,
+    summary="Stream a summary as server-sent events",
+    description=(
+        "Sends `token` events with summary text while the model is generating, "
+        "then a `done` event with the SummaryResponse fields and timing "
+        "(time to first token and total time, in ms). Failures arrive as an "
+        "`error` event."
+    ),
+)
+async def summarize_stream(
+    req: SummarizeRequest, user_id: UUID = Depends(get_current_user_id)
+):
+    started = time.perf_counter()
+    content = await retrieval_service.select_for(req, user_id)
+    return StreamingResponse(
+        _summary_events(content, req.style, started),
+        media_type=SSE_MEDIA_TYPE,
+        headers=STREAMING_HEADERS,
+    )
+
+async def _summary_events(content: str, style: str, started: float):
+    def elapsed_ms() -> float:
+        return round((time.perf_counter() - started) * 1000, 2)
+
+    first_token_ms = None
+    try:
+        async for event in gemini_service.summarize_stream(content, style):
+            if event["type"] == "token":
+                if first_token_ms is None:
+                    first_token_ms = elapsed_ms()
+                yield sse_event({"text": event["text"]}, event="token")
+            else:
+                summary = SummaryResponse(**event["data"])
+                payload = SuccessResponse(data=summary).model_dump()
+                payload["timing"] = {
+                    "time_to_first_token_ms": first_token_ms,
+                    "total_ms": elapsed_ms(),
+                }
+                yield sse_event(payload, event="done")
+    except APIError as e:
+        yield sse_event(
+            {"success": False, "error": {"code": e.code, "message": e.message}},
+            event="error",
+        )
+
 @router.post("/quiz", response_model=SuccessResponse[QuizResponse])
-async def generate_quiz(req: QuizRequest):
-    result = await gemini_service.generate_quiz(req.content, req.question_count, req.difficulty)
+async def generate_quiz(
+    req: QuizRequest,
+    async_mode: bool = Query(False, alias="async", description=ASYNC_MODE_DESCRIPTION),
+    user_id: UUID = Depends(get_current_user_id),
+):
+    if async_mode:
+        return await _enqueue_generation("quiz", req, user_id)
+    content = await retrieval_service.select_for(req, user_id)
+    result = await gemini_service.generate_quiz(
+        content, req.question_count, req.difficulty
+    )
     return SuccessResponse(data=QuizResponse(**result))
 
 @router.post("/diagram", response_model=SuccessResponse[DiagramResponse])
-async def generate_diagram(req: DiagramRequest):
+async def generate_diagram(
+    req: DiagramRequest,
+    async_mode: bool = Query(False, alias="async", description=ASYNC_MODE_DESCRIPTION),
+    user_id: UUID = Depends(get_current_user_id),
+):
+    if async_mode:
+        return await _enqueue("diagram", req.model_dump(), user_id)
     result = await gemini_service.generate_diagram(req.content, req.diagram_type)
     return SuccessResponse(data=DiagramResponse(**result))
+
+_ARTIFACT_MODELS = {
+    "summary": SummaryResponse,
+    "quiz": QuizResponse,
+    "diagram": DiagramResponse,
+}
+
+@router.post(
+    "/study-pack",
+    response_model=SuccessResponse[StudyPackResponse],
+    summary="Generate summary, quiz and diagram in one request",
+    description=(
+        "Takes one content body (or a session id) and the artifacts to build. "
+        "The text is preprocessed once and all artifacts are generated "
+        "concurrently. With `stream=ndjson` or `stream=sse` each artifact is "
+        "sent as soon as it is ready. Artifacts that fail are reported in "
+        "`errors` without failing the others."
+    ),
+)
+async def study_pack(
+    req: StudyPackRequest,
+    stream: Optional[Literal["ndjson", "sse"]] = Query(
+        None, description="Stream artifacts as NDJSON or server-sent events"
+    ),
+    user_id: UUID = Depends(get_current_user_id),
+):
+    content = await _study_pack_content(req, user_id)
+    events = gemini_service.iter_study_pack(
+        content,
+        req.artifacts,
+        style=req.style,
+        question_count=req.question_count,
+        difficulty=req.difficulty,
+        diagram_type=req.diagram_type,
+    )
+
+    if stream:
+        return StreamingResponse(
+            _study_pack_frames(events, stream, time.perf_counter()),
+            media_type=stream_media_type(stream),
+            headers=STREAMING_HEADERS,
+        )
+
+    pack = StudyPackResponse()
+    last_error = None
+    async for artifact, result, error in events:
+        if error:
+            last_error = error
+            pack.errors[artifact] = ErrorDetail(code=error.code, message=error.message)
+        else:
+            setattr(pack, artifact, _ARTIFACT_MODELS[artifact](**result))
+    if len(pack.errors) == len(req.artifacts):
+        raise last_error
+    return SuccessResponse(data=pack)
+
+async def _study_pack_content(req: StudyPackRequest, user_id: UUID) -> str:
+    if req.content is not None:
+        return req.content
+    session = await sessions_repo.get_by_id(req.session_id, user_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if not session.original_text:
+        raise HTTPException(status_code=400, detail="Session has no text content")
+    return session.original_text
+
+async def _study_pack_frames(events, stream_format: str, started: float):
+    async for artifact, result, error in events:
+        if error:
+            payload = {
+                "type": "error",
+                "artifact": artifact,
+                "error": {"code": error.code, "message": error.message},
+            }
+        else:
+            payload = {
+                "type": "artifact",
+                "artifact": artifact,
+                "data": _ARTIFACT_MODELS[artifact](**result),
+            }
+        yield stream_frame(payload, stream_format)
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+    yield stream_frame({"type": "complete", "elapsed_ms": elapsed_ms}, stream_format)
@@ -1,9 +1,37 @@
+from typing import Any, Dict
+
 from fastapi import APIRouter
+
+from app.core.config import settings
+from app.core.database import pool_metrics
 from app.schemas.common import SuccessResponse
-from typing import Dict
+from app.services.cache_service import ai_cache
+from app.services.gemini_service import gemini_service
+from app.services.pdf_engine import pdf_engine
 
 router = APIRouter()
 
 @router.get("", response_model=SuccessResponse[Dict[str, str]])
 async def health_check():
     return SuccessResponse(data={"status": "healthy", "version": "1.0.0"})
+
+@router.get("/ai-cache", response_model=SuccessResponse[Dict[str, Any]])
+async def ai_cache_stats():
+    return SuccessResponse(data=ai_cache.stats())
+
+@router.get("/gemini", response_model=SuccessResponse[Dict[str, Any]])
+async def gemini_client_stats():
+    client = gemini_service.client
+    return SuccessResponse(data=client.stats() if client else {"enabled": False})
+
+@router.get("/db-pool", response_model=SuccessResponse[Dict[str, Any]])
+async def db_pool_stats():
+    data = {"primary": pool_metrics["primary"].stats()}
+    if settings.DATABASE_READ_REPLICA_URL:
+        data["replica"] = pool_metrics["replica"].stats()
+    return SuccessResponse(data=data)
+
+@router.get("/pdf-engine", response_model=SuccessResponse[Dict[str, Any]])
+async def pdf_engine_stats():
+    # How many pages took the fast path and why the rest fell back
+    return SuccessResponse(data=pdf_engine.stats())
@@ -0,0 +1,18 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.api.deps import get_current_user_id
+from app.schemas.common import SuccessResponse
+from app.schemas.jobs import JobResponse
+from app.services.job_queue import job_queue
+
+router = APIRouter()
+
+@router.get("/{job_id}", response_model=SuccessResponse[JobResponse])
+async def get_job(job_id: UUID, user_id: UUID = Depends(get_current_user_id)):
+    # Results are generated from the owner's documents
+    job = await job_queue.get(job_id, user_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return SuccessResponse(data=JobResponse.model_validate(job))
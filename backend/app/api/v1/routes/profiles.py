@@ -0,0 +1,67 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.errors import APIError
+from app.core.profiling import profile_store, verify_token
+from app.schemas.common import SuccessResponse
+
+router = APIRouter()
+
+
+async def require_profile_token(x_profile: Optional[str] = Header(None)) -> None:
+    """Profiles expose code paths and timings: the same signed token is required."""
+    if not settings.PROFILING_ENABLED:
+        raise APIError(
+            code="PROFILING_DISABLED", message="Profiling is disabled", status_code=404
+        )
+    if not verify_token(x_profile):
+        raise APIError(
+            code="PROFILING_FORBIDDEN",
+            message="A valid X-Profile token is required",
+            status_code=403,
+        )
+
+
+async def _load(profile_id: str) -> Dict[str, Any]:
+    profile = await asyncio.to_thread(profile_store.get, profile_id)
+    if profile is None:
+        raise APIError(
+            code="PROFILE_NOT_FOUND", message="Profile not found", status_code=404
+        )
+    return profile
+
+
+@router.get(
+    "",
+    response_model=SuccessResponse[List[Dict[str, Any]]],
+    dependencies=[Depends(require_profile_token)],
+)
+async def list_profiles():
+    """Stored profiles, newest first, without their samples."""
+    return SuccessResponse(data=await asyncio.to_thread(profile_store.list))
+
+
+@router.get(
+    "/{profile_id}",
+    response_model=SuccessResponse[Dict[str, Any]],
+    dependencies=[Depends(require_profile_token)],
+)
+async def get_profile(profile_id: str):
+    return SuccessResponse(data=await _load(profile_id))
+
+
+@router.get(
+    "/{profile_id}/folded",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(require_profile_token)],
+)
+async def get_folded_stacks(profile_id: str):
+    """The CPU samples in folded format, for flamegraph.pl or speedscope."""
+    profile = await _load(profile_id)
+    return "\n".join(
+        f"{stack} {count}" for stack, count in profile["cpu"]["folded"].items()
+    )
@@ -1,18 +1,29 @@
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, status
-from typing import Optional
-from uuid import UUID, uuid4
+import asyncio
+from typing import Optional, Tuple
+from uuid import UUID
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    UploadFile,
+)
+
+from app.api.deps import get_current_user_id
+from app.core.config import settings
+from app.db.repositories.sessions_repo import sessions_repo
 from app.schemas.common import SuccessResponse
-from app.schemas.sessions import SessionResponse, SessionListResponse, SessionCreate
+from app.schemas.sessions import SessionCreate, SessionListResponse, SessionResponse
 from app.services.pdf_service import pdf_service
 from app.services.storage_service import storage_service
-from app.db.repositories.sessions_repo import sessions_repo
+from app.utils.responses import ModelResponse
+from app.utils.uploads import SpooledUpload, spool_upload
 
 router = APIRouter()
 
-# Mock Auth Dependency
-async def get_current_user_id():
-    return UUID("550e8400-e29b-41d4-a716-446655440000") # Fixed test UUID
-
 @router.post("", response_model=SuccessResponse[SessionResponse])
 async def create_session(
     title: str = Form(...),
@@ -21,29 +32,93 @@ async def create_session(
     user_id: UUID = Depends(get_current_user_id)
 ):
     if not file and not text:
-        raise HTTPException(status_code=400, detail="Either file or text must be provided")
+        raise HTTPException(
+            status_code=400, detail="Either file or text must be provided"
+        )
 
     file_url = None
+    file_name = file.filename if file else None
+    storage_path = None
     extracted_text = text
 
     if file:
-        content = await file.read()
-        # Simple PDF check
-        if file.content_type == "application/pdf":
-            extracted_text = await pdf_service.extract_text(content)
-        
-        file_url = await storage_service.upload_file(content, file.filename, file.content_type)
-    
-    session_res = await sessions_repo.create(
-        SessionCreate(title=title), 
-        user_id, 
-        file_url=file_url, 
-        text=extracted_text
+        # Spool to disk instead of holding the whole upload in memory
+        upload = await spool_upload(file)
+        storage_path = storage_service.new_path(file.filename)
+        try:
+            file_url, pdf_text = await _extract_and_store(upload, file, storage_path)
+        finally:
+            upload.cleanup()
+        if pdf_text is not None:
+            extracted_text = pdf_text
+
+    try:
+        session_res = await sessions_repo.create(
+            SessionCreate(title=title),
+            user_id,
+            file_url=file_url,
+            text=extracted_text,
+            file_name=file_name
+        )
+    except Exception:
+        if storage_path:
+            await storage_service.delete_file(storage_path)
+        raise
+
+    return ModelResponse(SuccessResponse(data=session_res))
+
+async def _extract_and_store(
+    upload: SpooledUpload, file: UploadFile, storage_path: str
+) -> Tuple[str, Optional[str]]:
+    """
+    Uploads the file to storage while extracting its text (PDFs only).
+
+    Both run off the event loop and are always awaited to completion, so
+    the spooled file is not removed while either still reads it. If either
+    fails, an object that was uploaded anyway is deleted again.
+    """
+    async def no_text() -> None:
+        return None
+
+    # Simple PDF check
+    extract = (
+        pdf_service.extract_text(upload.path)
+        if file.content_type == "application/pdf"
+        else no_text()
+    )
+    store = storage_service.upload_file(
+        upload.path, file.filename, file.content_type, path=storage_path
+    )
+    text_result, url_result = await asyncio.gather(
+        extract, store, return_exceptions=True
     )
-    
-    return SuccessResponse(data=session_res)
+    for result in (text_result, url_result):
+        if isinstance(result, BaseException):
+            if not isinstance(url_result, BaseException):
+                await storage_service.delete_file(storage_path)
+            raise result
+    return url_result, text_result
 
 @router.get("", response_model=SuccessResponse[SessionListResponse])
-async def get_sessions(user_id: UUID = Depends(get_current_user_id)):
-    sessions = await sessions_repo.get_all(user_id)
-    return SuccessResponse(data=SessionListResponse(sessions=sessions, total=len(sessions)))
+async def get_sessions(
+    limit: int = Query(
+        settings.SESSIONS_PAGE_SIZE, ge=1, le=settings.SESSIONS_MAX_PAGE_SIZE
+    ),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor from the previous page"
+    ),
+    user_id: UUID = Depends(get_current_user_id)
+):
+    # Summaries only: the source text comes from GET /sessions/{id}
+    sessions, next_cursor = await sessions_repo.list_page(user_id, limit, cursor)
+    return SuccessResponse(
+        data=SessionListResponse(sessions=sessions, next_cursor=next_cursor)
+    )
+
+@router.get("/{session_id}", response_model=SuccessResponse[SessionResponse])
+async def get_session(session_id: UUID, user_id: UUID = Depends(get_current_user_id)):
+    session = await sessions_repo.get_by_id(session_id, user_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    # Includes the full source text
+    return ModelResponse(SuccessResponse(data=session))
@@ -1,4 +1,7 @@
-from pydantic_settings import BaseSettings
+from typing import List, Union
+
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -22,9 +25,6 @@ class Settings(BaseSettings):
         # extra = "ignore" 
 
 settings = Settings()
-from typing import List, Union
-from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import AnyHttpUrl, field_validator
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Smart Study Assistant Backend"
@@ -45,10 +45,103 @@ class Settings(BaseSettings):
             return v
         raise ValueError(v)
 
+    DATABASE_URL: str = "postgresql+asyncpg://postgres:postgres@db:5432/app"
+    # Optional read replica for read-only queries (empty = use DATABASE_URL)
+    DATABASE_READ_REPLICA_URL: str = ""
+
+    # Connection pool (per engine, per process)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_ECHO: bool = False
+
     SUPABASE_URL: str = ""
     SUPABASE_SERVICE_KEY: str = ""
     GEMINI_API_KEY: str = ""
     LOG_LEVEL: str = "INFO"
+    # Request, extraction, Gemini, cache and DB metrics served at /metrics
+    METRICS_ENABLED: bool = True
+
+    # Opt-in request profiling (see app/core/profiling.py)
+    PROFILING_ENABLED: bool = False
+    # Signs X-Profile tokens; header selection is off while this is empty
+    PROFILING_SECRET: str = ""
+    # Share of all requests profiled at random (0 = only signed requests)
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL_MS: float = 5.0
+    PROFILING_TRACEMALLOC_FRAMES: int = 1
+    PROFILING_DIR: str = "profiles"
+    PROFILING_MAX_PROFILES: int = 50
+
+    # Uploads larger than this are rejected while they are still arriving
+    MAX_UPLOAD_SIZE_MB: int = 10
+
+    # PDF extraction: 0 means one worker process per CPU core
+    EXTRACTION_POOL_SIZE: int = 0
+    EXTRACTION_MIN_PAGES_PER_TASK: int = 8
+    # Documents up to this many pages are extracted in a thread, not the pool
+    EXTRACTION_INLINE_PAGE_LIMIT: int = 16
+    # Try PyPDF2 first and re-extract only broken-looking pages with pdfplumber
+    EXTRACTION_FAST_PATH: bool = True
+    # Document text is streamed from the database in slices of this size
+    EXTRACTION_TEXT_CHUNK_BYTES: int = 256 * 1024
+
+    # Gemini client: global cap on in-flight calls across the worker
+    GEMINI_MAX_CONCURRENCY: int = 8
+    # Threads for the blocking SDK call when the async API is not used
+    GEMINI_EXECUTOR_WORKERS: int = 8
+    GEMINI_USE_ASYNC_API: bool = True
+    # Outbound quota per process (0 = unlimited), backoff on ResourceExhausted
+    GEMINI_REQUESTS_PER_MINUTE: int = 60
+    GEMINI_TOKENS_PER_MINUTE: int = 250_000
+    GEMINI_RATE_LIMIT_MAX_RETRIES: int = 4
+    GEMINI_BACKOFF_BASE_SECONDS: float = 1.0
+    GEMINI_BACKOFF_MAX_SECONDS: float = 60.0
+
+    # "local" swaps Gemini for the in-process stand-in model (load testing)
+    GEMINI_BACKEND: str = "google"
+    # Stand-in model behaviour: latency spec is fixed:MS, uniform:LO:HI or
+    # lognormal:MEDIAN_MS:SIGMA; 0 requests per minute means no upstream quota
+    LOCAL_MODEL_LATENCY: str = "lognormal:800:0.4"
+    LOCAL_MODEL_TOKENS_PER_SECOND: float = 80.0
+    LOCAL_MODEL_STREAM_CHUNK_TOKENS: int = 8
+    LOCAL_MODEL_ERROR_RATE: float = 0.0
+    LOCAL_MODEL_QUOTA_ERROR_RATE: float = 0.0
+    LOCAL_MODEL_REQUESTS_PER_MINUTE: int = 0
+    LOCAL_MODEL_SEED: int = 0
+
+    # Long-document summarization (map-reduce); token counts are estimates
+    SUMMARY_CHUNK_TOKENS: int = 8000
+    SUMMARY_PARTIAL_MAX_TOKENS: int = 512
+    SUMMARY_MAX_PARALLEL: int = 4
+
+    # AI result cache: in-process LRU (tier 1) backed by Postgres (tier 2)
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_MAX_ENTRIES: int = 1024
+    AI_CACHE_TTL_SECONDS: int = 3600
+    AI_CACHE_PERSISTENT: bool = True
+    AI_CACHE_PERSISTENT_TTL_SECONDS: int = 7 * 24 * 3600
+
+    # Background AI jobs (Postgres queue). 0 workers disables the in-process pool
+    JOB_WORKER_CONCURRENCY: int = 4
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_VISIBILITY_TIMEOUT_SECONDS: int = 300
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF_SECONDS: int = 5
+
+    # GET /sessions page size
+    SESSIONS_PAGE_SIZE: int = 20
+    SESSIONS_MAX_PAGE_SIZE: int = 100
+
+    # Retrieval index over extracted documents (focused quiz/summary prompts)
+    RETRIEVAL_CHUNK_TOKENS: int = 256
+    RETRIEVAL_TOP_K: int = 6
+    RETRIEVAL_INDEX_CACHE_SIZE: int = 32
+    # Total memory of cached indexes (text included), per worker
+    RETRIEVAL_INDEX_CACHE_MAX_MB: int = 256
 
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
@@ -1,18 +1,92 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import declarative_base
 
 from app.core.config import settings
+from app.core.db_pool import PoolMetrics, instrument_queries, instrumented_pool_class
+from app.core.metrics import CallbackMetric
+from app.core.registry import registry
+
+# Pool telemetry for the primary and (optional) read-replica engines
+pool_metrics = {"primary": PoolMetrics("primary"), "replica": PoolMetrics("replica")}
+
+CallbackMetric(
+    "db_pool_connections",
+    "Pooled database connections by state",
+    "gauge",
+    lambda: [state for m in pool_metrics.values() for state in m.connection_states()],
+    ("engine", "state"),
+)
+CallbackMetric(
+    "db_pool_checkout_timeouts_total",
+    "Connection checkouts that timed out waiting for the pool",
+    "counter",
+    lambda: [
+        ((m.name,), m.timeouts)
+        for m in pool_metrics.values()
+        if m.checkouts or m.timeouts
+    ],
+    ("engine",),
+)
 
-# Create the Async Engine
-# echo=True means it will log all SQL queries (great for debugging)
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
 
-# Create the Session Factory
-AsyncSessionLocal = async_sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autoflush=False,
+def _create_engine(url: str, metrics: PoolMetrics) -> AsyncEngine:
+    connect_args = {}
+    if url.startswith("postgresql+asyncpg"):
+        # 0 disables asyncpg's prepared statement cache (needed behind pgbouncer)
+        connect_args["statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+    async_engine = create_async_engine(
+        url,
+        # DB_ECHO logs every SQL statement: debugging only, it is synchronous
+        echo=settings.DB_ECHO,
+        poolclass=instrumented_pool_class(metrics),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+    instrument_queries(async_engine, metrics.name)
+    return async_engine
+
+
+# Create the Async Engine on first use (loading the asyncpg dialect is slow)
+engine = registry.register(
+    "db_engine",
+    lambda: _create_engine(settings.DATABASE_URL, pool_metrics["primary"]),
+)
+
+# Read-only queries go to the replica when one is configured
+read_engine = registry.register(
+    "db_read_engine",
+    lambda: (
+        _create_engine(settings.DATABASE_READ_REPLICA_URL, pool_metrics["replica"])
+        if settings.DATABASE_READ_REPLICA_URL
+        else engine.resolve()
+    ),
+)
+
+
+def _sessionmaker(bind: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(
+        bind=bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False,
+    )
+
+
+# Create the Session Factories
+AsyncSessionLocal = registry.register(
+    "db_sessionmaker", lambda: _sessionmaker(engine.resolve())
+)
+ReadSessionLocal = registry.register(
+    "db_read_sessionmaker", lambda: _sessionmaker(read_engine.resolve())
 )
 
 # Base class for our models
@@ -21,6 +95,14 @@ Base = declarative_base()
 # Dependency for FastAPI Routes
 async def get_db():
     async with AsyncSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+# Dependency for read-only routes; may lag the primary when a replica is used
+async def get_read_db():
+    async with ReadSessionLocal() as session:
         try:
             yield session
         finally:
@@ -0,0 +1,154 @@
+"""
+Connection pool telemetry.
+
+Engines are built with an instrumented ``AsyncAdaptedQueuePool`` that times
+every checkout (the time a request waits for a connection, including
+pre-ping and opening new connections) and counts overflow checkouts and pool
+timeouts. Together with the live in-use count, these show whether the pool
+is the bottleneck and how large it needs to be.
+
+``instrument_queries`` additionally times every statement an engine runs.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, Tuple, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.metrics import Counter, Histogram
+
+# Recent checkout waits kept per pool for percentiles
+_WAIT_SAMPLES = 1024
+
+_STATEMENT_TYPES = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE"})
+
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds",
+    "Statement execution time, from sending it to the cursor returning",
+    ("engine", "statement"),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors_total", "Statements that raised", ("engine", "statement")
+)
+
+
+class PoolMetrics:
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.max_in_use = 0
+        self._waits: Deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self._lock = threading.Lock()
+        self._pool: Any = None
+
+    def record_checkout(self, wait: float, in_use: int, overflow: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.overflow_checkouts += overflow
+            self.max_in_use = max(self.max_in_use, in_use)
+            self._waits.append(wait)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+        pool = self._pool
+        result: Dict[str, Any] = {
+            "checkouts": self.checkouts,
+            "overflow_checkouts": self.overflow_checkouts,
+            "timeouts": self.timeouts,
+            "max_in_use": self.max_in_use,
+        }
+        if pool is not None:
+            result.update(
+                pool_size=pool.size(),
+                in_use=pool.checkedout(),
+                idle=pool.checkedin(),
+                overflow=max(0, pool.overflow()),
+            )
+        if waits:
+            result["checkout_wait_ms"] = {
+                "avg": round(sum(waits) / len(waits) * 1000, 2),
+                "p95": round(
+                    waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 2
+                ),
+                "max": round(waits[-1] * 1000, 2),
+            }
+        return result
+
+    def connection_states(self) -> Iterator[Tuple[Tuple[str, str], int]]:
+        """In-use and idle connection counts, for the metrics endpoint."""
+        pool = self._pool
+        if pool is not None:
+            yield (self.name, "in_use"), pool.checkedout()
+            yield (self.name, "idle"), pool.checkedin()
+
+
+class _InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    metrics: PoolMetrics
+
+    def connect(self):
+        self.metrics._pool = self
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_checkout(
+            time.perf_counter() - started,
+            in_use=self.checkedout(),
+            overflow=self.overflow() > 0,
+        )
+        return connection
+
+
+def instrumented_pool_class(metrics: PoolMetrics) -> Type[AsyncAdaptedQueuePool]:
+    """
+    Returns a pool class that reports to ``metrics``.
+
+    A class (rather than an instance attribute) keeps the metrics attached
+    when SQLAlchemy recreates the pool, e.g. after ``engine.dispose()``.
+    """
+    return type(
+        "InstrumentedQueuePool", (_InstrumentedQueuePool,), {"metrics": metrics}
+    )
+
+
+def _statement_type(statement: str) -> str:
+    # All four verbs are six letters long
+    verb = statement.lstrip()[:6].upper()
+    return verb if verb in _STATEMENT_TYPES else "OTHER"
+
+
+def instrument_queries(engine: AsyncEngine, name: str) -> None:
+    """
+    Records the duration of every statement ``engine`` executes, by type.
+    """
+    target = engine.sync_engine
+
+    @event.listens_for(target, "before_cursor_execute")
+    def _started(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    @event.listens_for(target, "after_cursor_execute")
+    def _finished(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_metrics_started", None)
+        if started is not None:
+            DB_QUERY_SECONDS.labels(name, _statement_type(statement)).observe(
+                time.perf_counter() - started
+            )
+
+    @event.listens_for(target, "handle_error")
+    def _failed(context):
+        DB_QUERY_ERRORS.labels(name, _statement_type(context.statement or "")).inc()
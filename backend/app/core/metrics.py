@@ -0,0 +1,251 @@
+"""
+In-process metrics, served at ``/metrics`` in the Prometheus text format.
+
+Recording is cheap enough to stay on in production:
+
+* no locks: metrics are only recorded from the event loop thread, so an
+  increment is a plain attribute add;
+* a labelled series is created once, on first use, and is a single dict
+  lookup afterwards;
+* histogram buckets are preallocated; an observation is one bisect and one
+  increment, and cumulative counts are only computed when scraped.
+
+Values that a component already tracks (cache counters, pool state) are read
+at scrape time through ``CallbackMetric`` rather than recorded twice.
+"""
+import math
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; from a cached response up to a long model generation
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, LabelValues, float]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, int) or value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _CounterValue:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class _GaugeValue(_CounterValue):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # One slot per bucket plus +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: "MetricsRegistry" = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[LabelValues, object] = {}
+        if not self.labelnames:
+            self._default = self.labels()
+        (registry or metrics_registry).register(self)
+
+    def labels(self, *values: str):
+        """The series for these label values (in ``labelnames`` order)."""
+        series = self._series.get(values)
+        if series is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(
+                    f"{self.name} takes labels {self.labelnames}, got {values}"
+                )
+            series = self._series.setdefault(values, self._new_series())
+        return series
+
+    @abstractmethod
+    def _new_series(self):
+        """A fresh value holder for one label combination."""
+
+    def samples(self) -> Iterable[Sample]:
+        for values, series in list(self._series.items()):
+            yield self.name, values, series.value
+
+    def sample_labelnames(self, sample_name: str) -> Tuple[str, ...]:
+        return self.labelnames
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_series(self) -> _CounterValue:
+        return _CounterValue()
+
+    def inc(self, amount: float = 1) -> None:
+        self._default.inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_series(self) -> _GaugeValue:
+        return _GaugeValue()
+
+    def inc(self, amount: float = 1) -> None:
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1) -> None:
+        self._default.dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default.set(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        registry: "MetricsRegistry" = None,
+    ):
+        self.bounds = tuple(sorted(buckets))
+        self._le = [_format_value(b) for b in self.bounds] + ["+Inf"]
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_series(self) -> _HistogramValue:
+        return _HistogramValue(self.bounds)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def time(self):
+        return self._default.time()
+
+    def samples(self) -> Iterable[Sample]:
+        for values, series in list(self._series.items()):
+            cumulative = 0
+            for le, count in zip(self._le, series.counts):
+                cumulative += count
+                yield f"{self.name}_bucket", values + (le,), cumulative
+            yield f"{self.name}_sum", values, series.sum
+            yield f"{self.name}_count", values, cumulative
+
+    def sample_labelnames(self, sample_name: str) -> Tuple[str, ...]:
+        if sample_name.endswith("_bucket"):
+            return self.labelnames + ("le",)
+        return self.labelnames
+
+
+class CallbackMetric(_Metric):
+    """
+    A gauge or counter whose values are read from ``collect`` when scraped.
+
+    ``collect`` returns ``(label values, value)`` pairs.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        kind: str,
+        collect: Callable[[], Iterable[Tuple[LabelValues, float]]],
+        labelnames: Sequence[str] = (),
+        registry: "MetricsRegistry" = None,
+    ):
+        self.kind = kind
+        self.collect = collect
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_series(self) -> None:
+        return None
+
+    def samples(self) -> Iterable[Sample]:
+        for values, value in self.collect():
+            yield self.name, tuple(values), value
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> _Metric:
+        return self._metrics[name]
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, values, value in metric.samples():
+                names = metric.sample_labelnames(name)
+                if names:
+                    labels = ",".join(
+                        f'{key}="{_escape(str(v))}"' for key, v in zip(names, values)
+                    )
+                    lines.append(f"{name}{{{labels}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,168 @@
+import time
+from typing import Optional
+
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge, Histogram
+
+# Allowance for multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Rejects multipart uploads larger than MAX_UPLOAD_SIZE_MB while they arrive.
+
+    Requests announcing a larger Content-Length are refused before any of the
+    body is read; chunked or lying clients are cut off as soon as the received
+    byte count crosses the limit, instead of after the whole file is spooled.
+    The app then sees the body end early; whatever it answers to the
+    truncated form is replaced by the 413.
+    """
+
+    def __init__(self, app: ASGIApp, max_size_mb: Optional[int] = None):
+        self.app = app
+        self.max_size_mb = max_size_mb or settings.MAX_UPLOAD_SIZE_MB
+        self.max_bytes = self.max_size_mb * 1024 * 1024 + MULTIPART_OVERHEAD_BYTES
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._is_multipart(scope):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = self._header(scope, b"content-length")
+        if content_length and content_length.isdigit():
+            if int(content_length) > self.max_bytes:
+                await self._reject(scope, receive, send)
+                return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            if exceeded:
+                return {"type": "http.request", "body": b"", "more_body": False}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # End the body here rather than raising: form parsing
+                    # would turn an exception into its own 400.
+                    exceeded = True
+                    return {"type": "http.request", "body": b"", "more_body": False}
+            return message
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal response_started
+            if exceeded and not response_started:
+                # The app is answering a truncated body; the 413 replaces it
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except Exception:
+            if not exceeded or response_started:
+                raise
+        if exceeded and not response_started:
+            await self._reject(scope, receive, send)
+
+    @staticmethod
+    def _header(scope: Scope, name: bytes) -> str:
+        for key, value in scope.get("headers", []):
+            if key == name:
+                return value.decode("latin-1")
+        return ""
+
+    def _is_multipart(self, scope: Scope) -> bool:
+        return self._header(scope, b"content-type").startswith("multipart/form-data")
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send) -> None:
+        response = JSONResponse(
+            status_code=413,
+            content={
+                "success": False,
+                "error": {
+                    "code": "FILE_TOO_LARGE",
+                    "message": f"File exceeds maximum size of {self.max_size_mb}MB.",
+                },
+            },
+            headers={"Connection": "close"},
+        )
+        await response(scope, receive, send)
+
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests handled", ("method", "route", "status")
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start until the response body was sent",
+    ("method", "route"),
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests being handled", ("method", "route")
+)
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status and in-flight count per route template.
+
+    Labels use the route's path template (``/api/v1/sessions/{session_id}``)
+    so ids never create new series; paths that match no route share the
+    ``unmatched`` label. Streamed responses are timed until their last chunk.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self._route_template(scope)
+        in_flight = HTTP_IN_FLIGHT.labels(method, route)
+        status = 500
+
+        async def recording_send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, recording_send)
+        finally:
+            HTTP_REQUEST_SECONDS.labels(method, route).observe(
+                time.perf_counter() - started
+            )
+            HTTP_REQUESTS.labels(method, route, str(status)).inc()
+            in_flight.dec()
+
+    @staticmethod
+    def _route_template(scope: Scope) -> str:
+        app = scope.get("app")
+        router = getattr(app, "router", None)
+        if router is None:
+            return "unmatched"
+        partial = None
+        for candidate in router.routes:
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                return candidate.path
+            if match == Match.PARTIAL and partial is None:
+                # Right path, wrong method (answered with 405)
+                partial = candidate.path
+        return partial or "unmatched"
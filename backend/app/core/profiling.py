@@ -0,0 +1,333 @@
+"""
+Opt-in profiling of individual requests.
+
+With ``PROFILING_ENABLED``, ``ProfilingMiddleware`` profiles a request when
+it carries a valid signed ``X-Profile`` header, or at random with
+probability ``PROFILING_SAMPLE_RATE``. Each profile contains:
+
+* a sampling CPU profile: every ``PROFILING_INTERVAL_MS`` a background
+  thread records the Python stack of every busy thread (the event loop plus
+  the threads running blocking work such as PDF parsing). Stacks are
+  aggregated into folded form (``thread;outer;...;inner count``), which
+  flame graph tools and speedscope read directly;
+* the traced memory peak and the largest allocation sites, from a
+  ``tracemalloc`` snapshot taken as memory approached its peak.
+
+Profiles are written as JSON to ``PROFILING_DIR`` (the newest
+``PROFILING_MAX_PROFILES`` are kept) and served by ``/api/v1/profiles``.
+The response of a profiled request carries an ``X-Profile-Id`` header.
+
+Only one request is profiled at a time. The samples cover the whole process
+while it runs, so concurrent requests show up too, and tracing memory slows
+the profiled request down severalfold: compare stacks within a profile, not
+durations against unprofiled requests. Work sent to the PDF extraction
+process pool is not sampled; it appears as the event loop waiting.
+
+Requests to ``/api/v1/profiles`` itself are never profiled, so reading
+profiles does not push real ones out of the store.
+
+Requests that are not profiled pay for one header scan and, with a sample
+rate set, one random draw. With ``PROFILING_ENABLED`` off the middleware is
+not installed at all.
+
+Tokens are ``<expiry unix time>.<HMAC-SHA256 of the expiry>`` signed with
+``PROFILING_SECRET``; create one with ``python -m app.core.profiling``.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+# Tokens valid for longer than this are refused, even when correctly signed
+MAX_TOKEN_TTL_SECONDS = 24 * 3600
+# A new allocation snapshot is taken each time traced memory grows this much
+_SNAPSHOT_GROWTH = 1.2
+_SNAPSHOT_MIN_BYTES = 1024 * 1024
+_TOP_ALLOCATIONS = 25
+_TOP_FUNCTIONS = 25
+_SUMMARY_KEYS = ("id", "created_at", "method", "path", "status", "duration_ms")
+# Leaf frames of threads that are parked rather than working
+_IDLE_FILES = ("threading.py", "queue.py", "selectors.py")
+
+
+def sign_token(expires: int, secret: Optional[str] = None) -> str:
+    secret = secret if secret is not None else settings.PROFILING_SECRET
+    digest = hmac.new(secret.encode(), str(expires).encode(), hashlib.sha256)
+    return f"{expires}.{digest.hexdigest()}"
+
+
+def verify_token(token: Optional[str], secret: Optional[str] = None) -> bool:
+    secret = secret if secret is not None else settings.PROFILING_SECRET
+    if not secret or not token:
+        return False
+    expires, _, _ = token.partition(".")
+    if not expires.isdigit():
+        return False
+    now = time.time()
+    if not now <= int(expires) <= now + MAX_TOKEN_TTL_SECONDS:
+        return False
+    return hmac.compare_digest(token, sign_token(int(expires), secret))
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename.replace("\\", "/")
+    short = "/".join(filename.rsplit("/", 2)[-2:])
+    return f"{code.co_name} ({short}:{code.co_firstlineno})"
+
+
+class _Sampler(threading.Thread):
+    """Samples every thread's stack, and the traced memory, until stopped."""
+
+    def __init__(self, interval: float, loop_thread: int):
+        super().__init__(name="request-profiler", daemon=True)
+        self.interval = interval
+        self.loop_thread = loop_thread
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self._snapshot_at = 0
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+    def sample(self) -> None:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == self.ident:
+                continue
+            leaf = frame.f_code.co_filename
+            if thread_id != self.loop_thread and leaf.endswith(_IDLE_FILES):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, str(thread_id)))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+        current, _ = tracemalloc.get_traced_memory()
+        grown = current > self._snapshot_at * _SNAPSHOT_GROWTH
+        if current >= _SNAPSHOT_MIN_BYTES and grown:
+            self.snapshot = tracemalloc.take_snapshot()
+            self._snapshot_at = current
+
+
+class ProfileSession:
+    """CPU sampling and memory tracing around one request."""
+
+    def __init__(self, interval_ms: Optional[float] = None):
+        interval = (interval_ms or settings.PROFILING_INTERVAL_MS) / 1000
+        self._sampler = _Sampler(interval, threading.get_ident())
+        self._owns_tracing = False
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(settings.PROFILING_TRACEMALLOC_FRAMES)
+            self._owns_tracing = True
+        tracemalloc.reset_peak()
+        self._started = time.perf_counter()
+        self._sampler.start()
+
+    def stop(self) -> Dict[str, Any]:
+        self._sampler.stop()
+        duration = time.perf_counter() - self._started
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = self._sampler.snapshot or tracemalloc.take_snapshot()
+        if self._owns_tracing:
+            tracemalloc.stop()
+        return {
+            "duration_ms": round(duration * 1000, 1),
+            "cpu": self._cpu_profile(),
+            "memory": {
+                "peak_bytes": peak,
+                "end_bytes": current,
+                "top_allocations": _top_allocations(snapshot),
+            },
+        }
+
+    def _cpu_profile(self) -> Dict[str, Any]:
+        sampler = self._sampler
+        self_counts: Counter = Counter()
+        for stack, count in sampler.stacks.items():
+            self_counts[stack.rsplit(";", 1)[-1]] += count
+        total = sum(sampler.stacks.values()) or 1
+        return {
+            "interval_ms": round(sampler.interval * 1000, 2),
+            "samples": sampler.samples,
+            "top_self": [
+                {"frame": frame, "samples": count, "share": round(count / total, 4)}
+                for frame, count in self_counts.most_common(_TOP_FUNCTIONS)
+            ],
+            "folded": dict(sampler.stacks.most_common()),
+        }
+
+
+def _top_allocations(snapshot: tracemalloc.Snapshot) -> List[Dict[str, Any]]:
+    snapshot = snapshot.filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            tracemalloc.Filter(False, __file__),
+        )
+    )
+    return [
+        {
+            "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "size_bytes": stat.size,
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:_TOP_ALLOCATIONS]
+    ]
+
+
+class ProfileStore:
+    """Profiles as JSON files in one directory, newest ``max_profiles`` kept."""
+
+    def __init__(
+        self, directory: Optional[str] = None, max_profiles: Optional[int] = None
+    ):
+        self.directory = directory or settings.PROFILING_DIR
+        self.max_profiles = max_profiles or settings.PROFILING_MAX_PROFILES
+
+    def _path(self, profile_id: str) -> Optional[str]:
+        # Ids are generated hex strings; anything else never names a file
+        if not profile_id.isalnum():
+            return None
+        return os.path.join(self.directory, f"{profile_id}.json")
+
+    def save(self, profile: Dict[str, Any]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(profile["id"])
+        with open(path + ".tmp", "w") as f:
+            json.dump(profile, f)
+        os.replace(path + ".tmp", path)
+        for stale in self._paths()[self.max_profiles:]:
+            os.remove(stale)
+
+    def _paths(self) -> List[str]:
+        """Profile files, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        paths = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".json")
+        ]
+        return sorted(paths, key=os.path.getmtime, reverse=True)
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        path = self._path(profile_id)
+        if path is None or not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def list(self) -> List[Dict[str, Any]]:
+        summaries = []
+        for path in self._paths():
+            with open(path) as f:
+                profile = json.load(f)
+            summaries.append(
+                {key: profile[key] for key in _SUMMARY_KEYS}
+                | {"peak_bytes": profile["memory"]["peak_bytes"]}
+            )
+        return summaries
+
+
+profile_store = ProfileStore()
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests selected by a signed header or the sample rate.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: Optional[float] = None):
+        self.app = app
+        self.sample_rate = (
+            settings.PROFILING_SAMPLE_RATE if sample_rate is None else sample_rate
+        )
+        self.excluded_prefix = f"{settings.API_V1_STR}/profiles"
+        self._active = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._active or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        profile_id = uuid.uuid4().hex
+        status = 500
+
+        async def profiled_send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode())
+                ]
+            await send(message)
+
+        session = ProfileSession()
+        session.start()
+        try:
+            await self.app(scope, receive, profiled_send)
+        finally:
+            result = session.stop()
+            self._active = False
+            profile = {
+                "id": profile_id,
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status,
+                **result,
+            }
+            try:
+                await asyncio.to_thread(profile_store.save, profile)
+            except OSError as e:
+                logger.warning(f"Saving profile {profile_id} failed: {e}")
+
+    def _selected(self, scope: Scope) -> bool:
+        if scope["path"].startswith(self.excluded_prefix):
+            return False
+        for key, value in scope["headers"]:
+            if key == PROFILE_HEADER:
+                return verify_token(value.decode("latin-1"))
+        return bool(self.sample_rate) and random.random() < self.sample_rate
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Print an X-Profile header token")
+    parser.add_argument("--ttl", type=int, default=600, help="Validity in seconds")
+    args = parser.parse_args()
+    if not settings.PROFILING_SECRET:
+        sys.exit("PROFILING_SECRET is not set")
+    print(sign_token(int(time.time()) + args.ttl))
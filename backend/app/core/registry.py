@@ -0,0 +1,112 @@
+"""
+Lazily constructed application services.
+
+Heavy clients (Gemini SDK, Supabase, the database engine) are registered here
+instead of being built at import time. Each is exposed as a
+:class:`LazyService` proxy that builds the real object on first use, so
+importing the app stays cheap. The lifespan warms every registered service in
+a background thread once the server is already accepting requests.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_UNSET = object()
+
+
+class LazyService(Generic[T]):
+    """
+    Proxy that builds its target on first attribute access or call.
+
+    Attribute reads, writes and calls are forwarded to the target, so a
+    proxy can stand in for the module-level singleton it replaces.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], T], warm: bool = True):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_warm", warm)
+        object.__setattr__(self, "_instance", _UNSET)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    @property
+    def initialized(self) -> bool:
+        return self._instance is not _UNSET
+
+    def resolve(self) -> T:
+        instance = self._instance
+        if instance is _UNSET:
+            # Warmup runs in a thread; first use may race it
+            with self._lock:
+                instance = self._instance
+                if instance is _UNSET:
+                    started = time.perf_counter()
+                    instance = self._factory()
+                    object.__setattr__(self, "_instance", instance)
+                    logger.info(
+                        f"Initialized {self._name} in "
+                        f"{(time.perf_counter() - started) * 1000:.0f} ms"
+                    )
+        return instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.resolve(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self.resolve(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(self.resolve(), name)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        state = "initialized" if self.initialized else "pending"
+        return f"<LazyService {self._name} ({state})>"
+
+
+class ServiceRegistry:
+    def __init__(self):
+        self._services: Dict[str, LazyService] = {}
+
+    def register(
+        self, name: str, factory: Callable[[], T], warm: bool = True
+    ) -> LazyService[T]:
+        """
+        Registers ``factory`` under ``name`` and returns its lazy proxy.
+
+        Services with ``warm=False`` are only built on first use.
+        """
+        service = LazyService(name, factory, warm)
+        self._services[name] = service
+        return service
+
+    def get(self, name: str) -> Any:
+        return self._services[name].resolve()
+
+    async def warmup(self) -> None:
+        """
+        Builds every warmable service that is not built yet, off the event loop.
+
+        A failing service is logged and left lazy; it is retried on first use.
+        """
+        for name, service in list(self._services.items()):
+            if service.initialized or not service._warm:
+                continue
+            try:
+                await asyncio.to_thread(service.resolve)
+            except Exception as e:
+                logger.warning(f"Warmup of {name} failed: {e}")
+
+    def stats(self) -> Dict[str, bool]:
+        return {name: s.initialized for name, s in self._services.items()}
+
+
+registry = ServiceRegistry()
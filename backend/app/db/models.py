@@ -0,0 +1,114 @@
+"""
+ORM models for shared (non-feature) tables.
+
+Feature-owned tables live in ``app/api/v1/features/<name>/models.py``.
+"""
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Column, Computed, DateTime, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
+from sqlalchemy.orm import deferred
+
+from app.core.database import Base
+
+
+class AIResultCacheEntry(Base):
+    """
+    Persistent tier of the AI result cache, shared by every worker.
+    """
+    __tablename__ = "ai_result_cache"
+
+    cache_key = Column(String(64), primary_key=True)
+    operation = Column(String(32), nullable=False)
+    model_name = Column(String(100), nullable=False)
+    prompt_version = Column(String(32), nullable=False, index=True)
+    result = Column(JSONB, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=True, index=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"<AIResultCacheEntry(operation='{self.operation}', "
+            f"key='{self.cache_key}')>"
+        )
+
+
+class AIJob(Base):
+    """
+    Queued AI generation, claimed by workers with ``FOR UPDATE SKIP LOCKED``.
+
+    A ``running`` job whose ``locked_until`` has passed is treated as
+    abandoned (its worker died) and can be claimed again.
+    """
+    __tablename__ = "ai_jobs"
+    __table_args__ = (Index("ix_ai_jobs_status_run_after", "status", "run_after"),)
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Owner of the source text; only they can read the result
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    operation = Column(String(32), nullable=False)
+    payload = Column(JSONB, nullable=False)
+
+    # queued | running | succeeded | failed
+    status = Column(String(16), nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    run_after = Column(DateTime, default=datetime.utcnow, nullable=False)
+    locked_until = Column(DateTime, nullable=True)
+    locked_by = Column(String(64), nullable=True)
+
+    result = Column(JSONB, nullable=True)
+    error = Column(JSONB, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"<AIJob(id={self.id}, operation='{self.operation}', "
+            f"status='{self.status}')>"
+        )
+
+
+class StudySession(Base):
+    """
+    A user's study session: the uploaded or pasted source text and its file.
+    """
+    __tablename__ = "sessions"
+    # Serves "this user's sessions, newest first" and keyset pages over
+    # (created_at, id) without touching other users' rows
+    __table_args__ = (
+        Index("ix_sessions_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_sessions_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    title = Column(String(255), nullable=False)
+    original_text = Column(Text, nullable=True)
+    file_name = Column(String(255), nullable=True)
+    file_url = Column(String, nullable=True)
+    # Maintained by Postgres; capped like extraction_documents.search_vector
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "to_tsvector('english', title || ' ' || "
+                "left(coalesce(original_text, ''), 500000))",
+                persisted=True,
+            ),
+        )
+    )
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<StudySession(id={self.id}, title='{self.title}')>"
@@ -1,33 +1,88 @@
-from typing import List, Optional
-from uuid import UUID, uuid4
+import base64
 from datetime import datetime
-from app.schemas.sessions import SessionCreate, SessionResponse
+from typing import List, Optional, Tuple
+from uuid import UUID
 
-# Mock In-Memory Store for MVP/Testing if DB fails
-MOCK_SESSIONS = []
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import defer
+
+from app.core.database import AsyncSessionLocal
+from app.core.errors import APIError
+from app.db.models import StudySession
+from app.schemas.sessions import SessionCreate, SessionResponse, SessionSummary
+
+
+def encode_cursor(session: StudySession) -> str:
+    raw = f"{session.created_at.isoformat()}|{session.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, session_id = raw.split("|")
+        return datetime.fromisoformat(created_at), UUID(session_id)
+    except ValueError:
+        raise APIError(
+            code="INVALID_CURSOR", message="Invalid pagination cursor", status_code=400
+        )
 
 class SessionsRepo:
-    async def create(self, session_in: SessionCreate, user_id: UUID, file_url: str = None, text: str = None) -> SessionResponse:
-        session = SessionResponse(
-            id=uuid4(),
+    async def create(
+        self,
+        session_in: SessionCreate,
+        user_id: UUID,
+        file_url: str = None,
+        text: str = None,
+        file_name: str = None,
+    ) -> SessionResponse:
+        session = StudySession(
             user_id=user_id,
             title=session_in.title,
             original_text=text,
-            file_name=None, # In real app, extract filename
+            file_name=file_name,
             file_url=file_url,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
         )
-        MOCK_SESSIONS.append(session)
-        return session
+        async with AsyncSessionLocal() as db:
+            db.add(session)
+            await db.commit()
+        return SessionResponse.model_validate(session)
+
+    async def list_page(
+        self, user_id: UUID, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[SessionSummary], Optional[str]]:
+        """
+        Returns one page of the user's sessions, newest first, and the next cursor.
 
-    async def get_all(self, user_id: UUID) -> List[SessionResponse]:
-        return [s for s in MOCK_SESSIONS if s.user_id == user_id]
+        Keyset pagination on (created_at, id): each page is an index range
+        scan from the cursor, however deep the page. The source text is never
+        loaded; fetch it through get_by_id.
+        """
+        stmt = (
+            select(StudySession)
+            .options(defer(StudySession.original_text, raiseload=True))
+            .where(StudySession.user_id == user_id)
+            .order_by(StudySession.created_at.desc(), StudySession.id.desc())
+            # One extra row tells whether another page exists
+            .limit(limit + 1)
+        )
+        if cursor:
+            stmt = stmt.where(
+                tuple_(StudySession.created_at, StudySession.id)
+                < tuple_(*decode_cursor(cursor))
+            )
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(stmt)).scalars().all()
+        next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return [SessionSummary.model_validate(s) for s in rows[:limit]], next_cursor
 
-    async def get_by_id(self, session_id: UUID, user_id: UUID) -> Optional[SessionResponse]:
-        for s in MOCK_SESSIONS:
-            if s.id == session_id and s.user_id == user_id:
-                return s
-        return None
+    async def get_by_id(
+        self, session_id: UUID, user_id: UUID
+    ) -> Optional[SessionResponse]:
+        # Primary-key lookup; the user check keeps sessions private
+        async with AsyncSessionLocal() as db:
+            session = await db.get(StudySession, session_id)
+        if session is None or session.user_id != user_id:
+            return None
+        return SessionResponse.model_validate(session)
 
 sessions_repo = SessionsRepo()
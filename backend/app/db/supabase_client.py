@@ -1,25 +1,45 @@
-from supabase import create_client, Client
-from app.core.config import settings
 import logging
+from typing import TYPE_CHECKING
+
+from app.core.config import settings
+from app.core.registry import registry
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 logger = logging.getLogger(__name__)
 
+def _create_client() -> "Client":
+    # Imported here: the supabase SDK takes a noticeable share of startup time
+    from supabase import create_client
+
+    if not settings.SUPABASE_URL or not settings.SUPABASE_SERVICE_KEY:
+        logger.warning("Supabase credentials not set. Database operations will fail.")
+        # We return a dummy or raise error depending on strategy. 
+        # For runnable scaffold, we'll log warning.
+    try:
+        return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+    except Exception as e:
+        logger.error(f"Failed to initialize Supabase client: {e}")
+        raise
+
+_client = registry.register(
+    "supabase",
+    _create_client,
+    # Without credentials creation fails; leave that to first use
+    warm=bool(settings.SUPABASE_URL and settings.SUPABASE_SERVICE_KEY),
+)
+
 class SupabaseClientWrapper:
-    _client: Client = None
+    @property
+    def configured(self) -> bool:
+        return bool(settings.SUPABASE_URL and settings.SUPABASE_SERVICE_KEY)
 
     @property
-    def client(self) -> Client:
-        if self._client is None:
-            if not settings.SUPABASE_URL or not settings.SUPABASE_SERVICE_KEY:
-                logger.warning("Supabase credentials not set. Database operations will fail.")
-                # We return a dummy or raise error depending on strategy. 
-                # For runnable scaffold, we'll log warning.
-            try:
-                self._client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
-            except Exception as e:
-                logger.error(f"Failed to initialize Supabase client: {e}")
-                raise
-        return self._client
+    def client(self) -> "Client":
+        return _client.resolve()
 
 supabase = SupabaseClientWrapper()
-mnemonics = {} # Mock DB for minimal runnability if Supabase fails? No, simpler to stick to Supabase.
+# Mock DB for minimal runnability if Supabase fails? No, simpler to stick
+# to Supabase.
+mnemonics = {}
@@ -5,24 +5,72 @@ Application entrypoint.
 - Configures middleware
 - Registers routers
 - Sets up global exception handlers
-- Provides health and root endpoints
+- Provides health, metrics and root endpoints
+- Warms lazily built services in the background after startup
 """
 
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 
+from app.api.v1.api import api_router
+from app.api.v1.router import api_router as features_router
 from app.core.config import settings
+from app.core.database import engine
 from app.core.errors import APIError
 from app.core.logging import setup_logging
-from app.api.v1.api import api_router
-
+from app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from app.core.metrics import metrics_registry
+from app.core.middleware import MetricsMiddleware, UploadSizeLimitMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.registry import registry
+from app.core.schemas.responses import ErrorDetails, ErrorResponse
+from app.services.ai_jobs import ai_job_workers
+from app.services.cache_service import ai_cache
+from app.services.gemini_service import PROMPT_VERSION, gemini_service
+from app.services.pdf_engine import pdf_engine
 
 # ------------------------------------------------------------
 # Logging Setup
 # ------------------------------------------------------------
 
 setup_logging()
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------
+# Lifespan
+# ------------------------------------------------------------
+
+async def warm_up():
+    """
+    Builds heavy services after the server is already answering requests,
+    then starts the work that depends on them.
+    """
+    await registry.warmup()
+    # Results from older prompt templates can never be hit again
+    if gemini_service.model:
+        await ai_cache.invalidate_prompt_versions(PROMPT_VERSION)
+    ai_job_workers.start()
+    logger.info("Warmup complete")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup_task = asyncio.create_task(warm_up())
+    yield
+    warmup_task.cancel()
+    await asyncio.gather(warmup_task, return_exceptions=True)
+    await ai_job_workers.stop()
+    pdf_engine.shutdown()
+    # Only tear down what was actually built
+    if gemini_service.initialized and gemini_service.client:
+        gemini_service.client.shutdown()
+    if engine.initialized:
+        await engine.dispose()
 
 
 # ------------------------------------------------------------
@@ -31,11 +79,38 @@ setup_logging()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"/openapi.json"
+    openapi_url="/openapi.json",
+    lifespan=lifespan,
+    # orjson encodes several times faster than the standard json module
+    default_response_class=ORJSONResponse,
 )
 
-# Include the main V1 router (currently empty)
+# Reject oversize uploads while the body is still arriving
+app.add_middleware(UploadSizeLimitMiddleware)
+
+# Outermost, so rejected uploads are counted too
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Not installed at all unless enabled, so it costs nothing when off
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Include the main V1 router and the feature-module aggregator
 app.include_router(api_router, prefix="/api/v1")
+app.include_router(features_router, prefix="/api/v1")
+
+
+@app.exception_handler(APIError)
+async def api_error_handler(request: Request, exc: APIError):
+    error = ErrorDetails(
+        code=exc.code, message=exc.message, details=exc.details or None
+    )
+    return JSONResponse(
+        status_code=exc.status_code,
+        content=ErrorResponse(error=error).model_dump(),
+    )
+
 
 @app.get("/")
 async def root():
@@ -48,4 +123,11 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    if not settings.METRICS_ENABLED:
+        return JSONResponse(status_code=404, content={"detail": "Not Found"})
+    return Response(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
\ No newline at end of file
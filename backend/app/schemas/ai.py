@@ -1,12 +1,46 @@
-from pydantic import BaseModel
-from typing import List, Optional, Any
+from typing import Any, Dict, List, Literal, Optional, Tuple
+from uuid import UUID
 
-class SummarizeRequest(BaseModel):
-    content: str
+from pydantic import BaseModel, Field, model_validator
+
+from app.schemas.common import ErrorDetail
+
+
+class RetrievalOptions(BaseModel):
+    """
+    Source text for a generation: raw ``content`` or a stored document.
+
+    With ``focus`` and/or a page range only the ``top_k`` most relevant
+    chunks are sent to the model instead of the whole text.
+    """
+    content: Optional[str] = None
+    document_id: Optional[UUID] = None
+    focus: Optional[str] = Field(None, max_length=500)
+    page_start: Optional[int] = Field(None, ge=1)
+    page_end: Optional[int] = Field(None, ge=1)
+    top_k: Optional[int] = Field(None, ge=1, le=50)
+
+    @model_validator(mode="after")
+    def check_retrieval(self):
+        if (self.content is None) == (self.document_id is None):
+            raise ValueError("Provide exactly one of content or document_id")
+        if self.page_start is not None or self.page_end is not None:
+            if self.document_id is None:
+                raise ValueError("A page range requires document_id")
+            if self.page_start and self.page_end and self.page_end < self.page_start:
+                raise ValueError("page_end must not be before page_start")
+        return self
+
+    @property
+    def page_range(self) -> Optional[Tuple[int, int]]:
+        if self.page_start is None and self.page_end is None:
+            return None
+        return self.page_start or 1, self.page_end or 2**31 - 1
+
+class SummarizeRequest(RetrievalOptions):
     style: str = "standard"
 
-class QuizRequest(BaseModel):
-    content: str
+class QuizRequest(RetrievalOptions):
     question_count: int = 5
     difficulty: str = "medium"
 
@@ -38,3 +72,30 @@ class DiagramResponse(BaseModel):
     image_url: Optional[str] = None
     mermaid_code: Optional[str] = None
     explanation: Optional[str] = None
+
+StudyPackArtifact = Literal["summary", "quiz", "diagram"]
+
+class StudyPackRequest(BaseModel):
+    content: Optional[str] = None
+    session_id: Optional[UUID] = None
+    artifacts: List[StudyPackArtifact] = Field(
+        default_factory=lambda: ["summary", "quiz", "diagram"], min_length=1
+    )
+    style: str = "standard"
+    question_count: int = 5
+    difficulty: str = "medium"
+    diagram_type: str = "flowchart"
+
+    @model_validator(mode="after")
+    def check_source(self):
+        if (self.content is None) == (self.session_id is None):
+            raise ValueError("Provide exactly one of content or session_id")
+        # Keep the requested order but generate each artifact once
+        self.artifacts = list(dict.fromkeys(self.artifacts))
+        return self
+
+class StudyPackResponse(BaseModel):
+    summary: Optional[SummaryResponse] = None
+    quiz: Optional[QuizResponse] = None
+    diagram: Optional[DiagramResponse] = None
+    errors: Dict[str, ErrorDetail] = Field(default_factory=dict)
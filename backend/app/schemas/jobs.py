@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pydantic import UUID4, BaseModel
+
+
+class JobResponse(BaseModel):
+    id: UUID4
+    operation: str
+    status: str
+    attempts: int
+    max_attempts: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[Dict[str, Any]] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+         from_attributes = True
@@ -1,7 +1,8 @@
 from datetime import datetime
-from typing import Optional, List
-from pydantic import BaseModel, UUID4
-from app.schemas.common import ResponseBase
+from typing import List, Optional
+
+from pydantic import UUID4, BaseModel
+
 
 class SessionBase(BaseModel):
     title: str
@@ -21,6 +22,19 @@ class SessionResponse(SessionBase):
     class Config:
          from_attributes = True
 
+class SessionSummary(SessionBase):
+    """List projection of a session: everything except the source text."""
+    id: UUID4
+    user_id: UUID4
+    file_name: Optional[str] = None
+    file_url: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+         from_attributes = True
+
 class SessionListResponse(BaseModel):
-    sessions: List[SessionResponse]
-    total: int
+    sessions: List[SessionSummary]
+    # Opaque cursor for the next page; None on the last page
+    next_cursor: Optional[str] = None
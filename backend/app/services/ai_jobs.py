@@ -0,0 +1,49 @@
+"""
+Background AI generation jobs: operation handlers and the worker pool.
+
+Payloads are the original requests. Text from a stored document is loaded
+(and focus/page selection applied) when the job runs, so it is not copied
+into the queue table.
+"""
+from uuid import UUID
+
+from app.schemas.ai import QuizRequest, SummarizeRequest
+from app.services.gemini_service import gemini_service
+from app.services.job_queue import JobHandler, JobWorkerPool, job_queue
+from app.services.rate_limiter import BACKGROUND, priority
+from app.services.retrieval_service import retrieval_service
+
+
+def _background(handler: JobHandler) -> JobHandler:
+    # Queued jobs yield the Gemini quota to interactive requests
+    async def run(payload: dict, user_id: UUID) -> dict:
+        with priority(BACKGROUND):
+            return await handler(payload, user_id)
+    return run
+
+
+async def _summarize(payload: dict, user_id: UUID) -> dict:
+    req = SummarizeRequest.model_validate(payload)
+    content = await retrieval_service.select_for(req, user_id)
+    return await gemini_service.summarize(content, req.style)
+
+
+async def _quiz(payload: dict, user_id: UUID) -> dict:
+    req = QuizRequest.model_validate(payload)
+    content = await retrieval_service.select_for(req, user_id)
+    return await gemini_service.generate_quiz(
+        content, req.question_count, req.difficulty
+    )
+
+
+AI_JOB_HANDLERS = {
+    "summarize": _background(_summarize),
+    "quiz": _background(_quiz),
+    "diagram": _background(
+        lambda p, user_id: gemini_service.generate_diagram(
+            p["content"], p["diagram_type"]
+        )
+    ),
+}
+
+ai_job_workers = JobWorkerPool(job_queue, AI_JOB_HANDLERS)
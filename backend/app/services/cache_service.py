@@ -0,0 +1,296 @@
+"""
+Two-tier cache for AI generation results.
+
+Tier 1 is a bounded in-process LRU with a TTL. Tier 2 is the
+``ai_result_cache`` Postgres table, so results survive restarts and are shared
+across workers. Keys cover everything that changes the output: the content
+hash, the operation and its parameters, the model name and the prompt
+template version.
+"""
+import copy
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, ReadSessionLocal
+from app.core.metrics import CallbackMetric
+from app.db.models import AIResultCacheEntry
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class TTLCache:
+    """
+    Bounded LRU mapping whose entries expire ``ttl_seconds`` after insertion.
+
+    With ``max_bytes`` and a ``sizeof`` function the total size of the values
+    is bounded too; a value larger than ``max_bytes`` on its own is not cached.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def lookup_counts(self) -> Dict[str, int]:
+        return {"hit": self.hits, "miss": self.misses}
+
+    def set(self, key: str, value: Any) -> None:
+        if key in self._data:
+            self._remove(key)
+        if self.max_bytes is not None:
+            size = self.sizeof(value)
+            if size > self.max_bytes:
+                return
+            self._sizes[key] = size
+            self.nbytes += size
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+        while len(self._data) > self.max_entries or (
+            self.max_bytes is not None and self.nbytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._data)))
+
+    def _remove(self, key: str) -> None:
+        del self._data[key]
+        self.nbytes -= self._sizes.pop(key, 0)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._sizes.clear()
+        self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class AIResultCache:
+    def __init__(self):
+        self.enabled = settings.AI_CACHE_ENABLED
+        self.persistent = settings.AI_CACHE_PERSISTENT
+        self.memory = TTLCache(
+            max_entries=settings.AI_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.AI_CACHE_TTL_SECONDS,
+        )
+        self.counters: Dict[str, int] = {
+            "memory_hits": 0,
+            "persistent_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "errors": 0,
+        }
+
+    @staticmethod
+    def make_key(
+        operation: str,
+        content_digest: str,
+        params: Dict[str, Any],
+        model_name: str,
+        prompt_version: str,
+    ) -> str:
+        payload = json.dumps(
+            [operation, content_digest, params, model_name, prompt_version],
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+
+        value = self.memory.get(key)
+        if value is not None:
+            self.counters["memory_hits"] += 1
+            return copy.deepcopy(value)
+
+        if self.persistent:
+            value = await self._get_persistent(key)
+            if value is not None:
+                self.counters["persistent_hits"] += 1
+                self.memory.set(key, value)
+                return copy.deepcopy(value)
+
+        self.counters["misses"] += 1
+        return None
+
+    async def set(
+        self,
+        key: str,
+        value: dict,
+        operation: str,
+        model_name: str,
+        prompt_version: str,
+    ) -> None:
+        if not self.enabled:
+            return
+        self.memory.set(key, copy.deepcopy(value))
+        self.counters["writes"] += 1
+        if self.persistent:
+            await self._set_persistent(
+                key, value, operation, model_name, prompt_version
+            )
+
+    async def _get_persistent(self, key: str) -> Optional[dict]:
+        try:
+            # A lagging replica only costs an occasional miss
+            async with ReadSessionLocal() as db:
+                stmt = select(AIResultCacheEntry.result).where(
+                    AIResultCacheEntry.cache_key == key,
+                    or_(
+                        AIResultCacheEntry.expires_at.is_(None),
+                        AIResultCacheEntry.expires_at > datetime.utcnow(),
+                    ),
+                )
+                return (await db.execute(stmt)).scalar_one_or_none()
+        except Exception as e:
+            # The cache must never fail a request
+            self.counters["errors"] += 1
+            logger.warning(f"AI cache read failed: {e}")
+            return None
+
+    async def _set_persistent(
+        self,
+        key: str,
+        value: dict,
+        operation: str,
+        model_name: str,
+        prompt_version: str,
+    ) -> None:
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=settings.AI_CACHE_PERSISTENT_TTL_SECONDS)
+        stmt = insert(AIResultCacheEntry).values(
+            cache_key=key,
+            operation=operation,
+            model_name=model_name,
+            prompt_version=prompt_version,
+            result=value,
+            created_at=now,
+            expires_at=expires_at,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AIResultCacheEntry.cache_key],
+            set_={"result": value, "created_at": now, "expires_at": expires_at},
+        )
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(stmt)
+                await db.commit()
+        except Exception as e:
+            self.counters["errors"] += 1
+            logger.warning(f"AI cache write failed: {e}")
+
+    async def invalidate_prompt_versions(self, current_version: str) -> int:
+        """
+        Drops every entry written for a prompt template other than the current one.
+
+        Stale entries can never be hit (the version is part of the key), so
+        this only reclaims space; it runs at startup after a prompt change.
+        Returns the number of persistent rows removed.
+        """
+        self.memory.clear()
+        if not (self.enabled and self.persistent):
+            return 0
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    delete(AIResultCacheEntry).where(
+                        AIResultCacheEntry.prompt_version != current_version
+                    )
+                )
+                await db.commit()
+                return result.rowcount or 0
+        except Exception as e:
+            self.counters["errors"] += 1
+            logger.warning(f"AI cache invalidation failed: {e}")
+            return 0
+
+    def lookup_counts(self) -> Dict[str, int]:
+        return {
+            "memory_hit": self.counters["memory_hits"],
+            "persistent_hit": self.counters["persistent_hits"],
+            "miss": self.counters["misses"],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = (
+            self.counters["memory_hits"]
+            + self.counters["persistent_hits"]
+            + self.counters["misses"]
+        )
+        hits = self.counters["memory_hits"] + self.counters["persistent_hits"]
+        return {
+            **self.counters,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+        }
+
+
+ai_cache = AIResultCache()
+
+# Caches reported by the metrics endpoint; each has ``lookup_counts()``
+_tracked_caches: Dict[str, Any] = {"ai_result": ai_cache}
+
+
+def track_cache(name: str, cache: Any) -> None:
+    _tracked_caches[name] = cache
+
+
+def _lookups() -> Iterator[Tuple[Tuple[str, str], int]]:
+    for name, cache in _tracked_caches.items():
+        for result, count in cache.lookup_counts().items():
+            yield (name, result), count
+
+
+def _hit_ratios() -> Iterator[Tuple[Tuple[str], float]]:
+    for name, cache in _tracked_caches.items():
+        counts = cache.lookup_counts()
+        total = sum(counts.values())
+        if total:
+            yield (name,), round(1 - counts["miss"] / total, 4)
+
+
+CallbackMetric(
+    "cache_lookups_total", "Cache lookups by result", "counter", _lookups,
+    ("cache", "result"),
+)
+CallbackMetric(
+    "cache_hit_ratio", "Share of lookups served from the cache", "gauge",
+    _hit_ratios, ("cache",),
+)
@@ -0,0 +1,269 @@
+"""
+Non-blocking access to the Gemini model.
+
+``GenerativeModel.generate_content`` is a blocking network call. The client
+uses the model's async API when it has one and otherwise runs the blocking
+call on a dedicated, bounded thread pool, so a slow generation never freezes
+the event loop. A global semaphore caps in-flight calls, and concurrent
+identical requests are coalesced into a single upstream call. Every call is
+admitted by the outbound rate limiter first and retried after a cooldown
+when the API reports an exhausted quota.
+
+Each upstream call is recorded in the metrics under the operation set in
+``ai_operation`` by the caller.
+"""
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional
+
+from app.core.config import settings
+from app.core.metrics import Counter, Histogram
+from app.services.rate_limiter import RateLimiter, is_quota_error
+from app.services.text_chunker import CHARS_PER_TOKEN, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# What the current task is generating (summarize, quiz, ...), for metrics
+ai_operation: ContextVar[str] = ContextVar("ai_operation", default="other")
+
+GEMINI_CALL_SECONDS = Histogram(
+    "gemini_call_duration_seconds",
+    "Upstream model call time, per attempt; streams until the last chunk",
+    ("operation", "outcome"),
+)
+GEMINI_PROMPT_TOKENS = Counter(
+    "gemini_prompt_tokens_total", "Estimated prompt tokens sent", ("operation",)
+)
+GEMINI_RESPONSE_TOKENS = Counter(
+    "gemini_response_tokens_total", "Estimated response tokens received", ("operation",)
+)
+GEMINI_ERRORS = Counter(
+    "gemini_errors_total", "Failed model calls, per attempt", ("operation", "kind")
+)
+
+
+@contextmanager
+def operation_scope(operation: str) -> Iterator[None]:
+    """Labels the model calls made inside the block with ``operation``."""
+    token = ai_operation.set(operation)
+    try:
+        yield
+    finally:
+        try:
+            ai_operation.reset(token)
+        except ValueError:
+            # An abandoned async generator is closed from another context
+            pass
+
+
+def _record_call(started: float, prompt_tokens: int, error: Optional[Exception]) -> str:
+    operation = ai_operation.get()
+    if error is None:
+        outcome = "ok"
+        GEMINI_PROMPT_TOKENS.labels(operation).inc(prompt_tokens)
+    else:
+        outcome = "quota" if is_quota_error(error) else "error"
+        GEMINI_ERRORS.labels(operation, outcome).inc()
+    elapsed = time.perf_counter() - started
+    GEMINI_CALL_SECONDS.labels(operation, outcome).observe(elapsed)
+    return operation
+
+
+def _response_text(response: Any) -> str:
+    try:
+        text = getattr(response, "text", None)
+    except ValueError:
+        # Blocked responses have no text
+        return ""
+    return text if isinstance(text, str) else ""
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; concurrent callers share its result.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(functools.partial(self._forget, key))
+        else:
+            self.coalesced += 1
+        # One waiter being cancelled must not cancel the shared call
+        return await asyncio.shield(future)
+
+    def _forget(self, key: str, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            # Mark the exception as retrieved even if every waiter went away
+            future.exception()
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+
+class GeminiClient:
+    def __init__(
+        self,
+        model: Any,
+        max_concurrency: Optional[int] = None,
+        executor_workers: Optional[int] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        self.model = model
+        self.max_concurrency = max_concurrency or settings.GEMINI_MAX_CONCURRENCY
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=executor_workers or settings.GEMINI_EXECUTOR_WORKERS,
+            thread_name_prefix="gemini",
+        )
+        self._singleflight = SingleFlight()
+        self.use_async_api = settings.GEMINI_USE_ASYNC_API and hasattr(
+            model, "generate_content_async"
+        )
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_quota_retries = settings.GEMINI_RATE_LIMIT_MAX_RETRIES
+
+    @staticmethod
+    def request_key(prompt: Any, kwargs: Dict[str, Any]) -> str:
+        payload = json.dumps([prompt, kwargs], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def generate(self, prompt: Any, **kwargs: Any) -> Any:
+        """
+        Returns the model response for ``prompt``.
+
+        Identical concurrent requests (same prompt and options) share one
+        upstream call.
+        """
+        key = self.request_key(prompt, kwargs)
+        return await self._singleflight.do(key, lambda: self._call(prompt, **kwargs))
+
+    async def _call(self, prompt: Any, **kwargs: Any) -> Any:
+        tokens = estimate_tokens(str(prompt))
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire(tokens)
+            try:
+                async with self._semaphore:
+                    # Time upstream, not the wait for a concurrency slot
+                    started = time.perf_counter()
+                    response = await self._send(prompt, **kwargs)
+            except Exception as e:
+                _record_call(started, tokens, e)
+                if not self._should_retry(e, attempt):
+                    raise
+                attempt += 1
+                continue
+            operation = _record_call(started, tokens, None)
+            GEMINI_RESPONSE_TOKENS.labels(operation).inc(
+                estimate_tokens(_response_text(response))
+            )
+            self.rate_limiter.record_success()
+            return response
+
+    async def _send(self, prompt: Any, **kwargs: Any) -> Any:
+        if self.use_async_api:
+            return await self.model.generate_content_async(prompt, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            functools.partial(self.model.generate_content, prompt, **kwargs),
+        )
+
+    def _should_retry(self, exc: Exception, attempt: int) -> bool:
+        if not is_quota_error(exc):
+            return False
+        # Slow everyone down even when this caller is out of retries
+        delay = self.rate_limiter.record_quota_error()
+        if attempt >= self.max_quota_retries:
+            return False
+        logger.warning(
+            f"Gemini quota exhausted, retrying in {delay:.1f}s "
+            f"(attempt {attempt + 1}/{self.max_quota_retries})"
+        )
+        return True
+
+    async def generate_stream(self, prompt: Any, **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Yields response text chunks as the model produces them.
+
+        Streams are never coalesced; the concurrency slot is held until the
+        stream is exhausted or closed. A quota error is retried only before
+        the first chunk has been sent.
+        """
+        tokens = estimate_tokens(str(prompt))
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire(tokens)
+            started = False
+            response_chars = 0
+            try:
+                async with self._semaphore:
+                    call_started = time.perf_counter()
+                    async for text in self._send_stream(prompt, **kwargs):
+                        started = True
+                        response_chars += len(text)
+                        yield text
+            except Exception as e:
+                _record_call(call_started, tokens, e)
+                if started or not self._should_retry(e, attempt):
+                    raise
+                attempt += 1
+                continue
+            operation = _record_call(call_started, tokens, None)
+            GEMINI_RESPONSE_TOKENS.labels(operation).inc(
+                -(-response_chars // CHARS_PER_TOKEN)
+            )
+            self.rate_limiter.record_success()
+            return
+
+    async def _send_stream(self, prompt: Any, **kwargs: Any) -> AsyncIterator[str]:
+        if self.use_async_api:
+            response = await self.model.generate_content_async(
+                prompt, stream=True, **kwargs
+            )
+            async for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+            return
+
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(
+            self._executor,
+            functools.partial(
+                self.model.generate_content, prompt, stream=True, **kwargs
+            ),
+        )
+        chunks = iter(response)
+        while True:
+            chunk = await loop.run_in_executor(self._executor, next, chunks, None)
+            if chunk is None:
+                break
+            if chunk.text:
+                yield chunk.text
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": len(self._singleflight),
+            "coalesced": self._singleflight.coalesced,
+            "rate_limiter": self.rate_limiter.stats(),
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
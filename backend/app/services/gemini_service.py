@@ -1,45 +1,293 @@
-import google.generativeai as genai
-from app.core.config import settings
-from app.core.errors import APIError
+import asyncio
 import json
 import logging
+import re
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from app.core.config import settings
+from app.core.errors import APIError
+from app.core.registry import registry
+from app.services.cache_service import ai_cache, content_hash
+from app.services.gemini_client import GeminiClient, operation_scope
+from app.services.rate_limiter import is_quota_error
+from app.services.summarization_engine import (
+    STREAM_FINAL_PROMPT,
+    MapReduceSummarizer,
+    parse_sectioned_summary,
+)
+from app.services.text_chunker import chunk_text
 
 logger = logging.getLogger(__name__)
 
+MODEL_NAME = "gemini-flash-latest"
+LOCAL_MODEL_NAME = "local-stand-in"
+# Bump whenever a prompt template below changes: cached results are keyed on it
+PROMPT_VERSION = "3"
+
+STUDY_PACK_ARTIFACTS = ("summary", "quiz", "diagram")
+
+_JSON_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+QUIZ_PROMPT = (
+    "Write a {difficulty} multiple-choice quiz of {count} questions on the "
+    "following study content. Each question has four options and its "
+    "correct_answer is one of them. Respond with JSON only: "
+    '{{"title": str, "questions": [{{"question": str, "options": [str], '
+    '"correct_answer": str, "explanation": str}}]}}.\n\n{content}'
+)
+
+DIAGRAM_PROMPT = (
+    "Draw a {diagram_type} of the main concepts in the following study "
+    "content as Mermaid code. Respond with JSON only: "
+    '{{"title": str, "mermaid_code": str, "explanation": str}}.\n\n{content}'
+)
+
+
+def _ai_error(exc: Exception) -> APIError:
+    if is_quota_error(exc):
+        return APIError(
+            code="AI_RATE_LIMITED",
+            message="AI quota exhausted, please retry shortly",
+            status_code=429,
+        )
+    return APIError(
+        code="AI_ERROR", message=f"Gemini Error: {str(exc)}", status_code=500
+    )
+
+
+def _malformed(artifact: str) -> APIError:
+    # Raised rather than returned, so a bad answer is never cached
+    return APIError(
+        code="AI_ERROR",
+        message=f"Gemini returned a malformed {artifact}",
+        status_code=500,
+    )
+
+
+def _load_json(text: str) -> Any:
+    try:
+        return json.loads(_JSON_FENCE.sub("", text.strip()))
+    except ValueError:
+        return None
+
+
+def parse_quiz_json(text: str) -> dict:
+    """
+    Parses the answer to QUIZ_PROMPT, skipping questions without a question.
+    """
+    data = _load_json(text)
+    items = data.get("questions") if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        raise _malformed("quiz")
+    questions = [
+        {
+            "id": f"q{i}",
+            "type": "multiple-choice",
+            "question": item["question"],
+            "options": [str(o) for o in item.get("options") or []],
+            "correct_answer": item.get("correct_answer"),
+            "explanation": item.get("explanation"),
+        }
+        for i, item in enumerate(
+            (q for q in items if isinstance(q, dict) and q.get("question")), 1
+        )
+    ]
+    if not questions:
+        raise _malformed("quiz")
+    return {
+        "title": str(data.get("title") or "Quiz"),
+        "questions": questions,
+        "total_questions": len(questions),
+    }
+
+
+def parse_diagram_json(text: str) -> dict:
+    """Parses the answer to DIAGRAM_PROMPT."""
+    data = _load_json(text)
+    if not isinstance(data, dict) or not data.get("mermaid_code"):
+        raise _malformed("diagram")
+    return {
+        "title": str(data.get("title") or "Diagram"),
+        "image_url": None,
+        "mermaid_code": str(data["mermaid_code"]),
+        "explanation": data.get("explanation"),
+    }
+
+
+@dataclass
+class PreparedContent:
+    """
+    Document text preprocessed once and shared by every artifact built from it.
+    """
+    text: str
+    digest: str
+    chunks: List[str]
+    # Map-reduce condensation of long text, run once for all artifacts
+    condensed: Optional["asyncio.Future[str]"] = field(default=None, repr=False)
+
+
 class GeminiService:
     def __init__(self):
-        if settings.GEMINI_API_KEY:
+        self.model_name = MODEL_NAME
+        if settings.GEMINI_BACKEND == "local":
+            from app.services.local_model import LocalModel
+
+            logger.warning("GEMINI_BACKEND=local: using the local stand-in model.")
+            # Own name, so stand-in results never share cache keys with Gemini's
+            self.model_name = LOCAL_MODEL_NAME
+            self.model = LocalModel()
+        elif settings.GEMINI_API_KEY:
+            # The SDK import alone takes most of a second; it happens here,
+            # on first use or during warmup, rather than at app import
+            import google.generativeai as genai
+
             genai.configure(api_key=settings.GEMINI_API_KEY)
-            self.model = genai.GenerativeModel('gemini-flash-latest')
-            for m in genai.list_models():
-                print(m.name, m.supported_generation_methods)
+            self.model = genai.GenerativeModel(self.model_name)
         else:
             logger.warning("GEMINI_API_KEY not set. AI features will return mock data.")
             self.model = None
+        # Non-blocking, concurrency-limited access to the model
+        self.client = GeminiClient(self.model) if self.model else None
+        # Long documents are summarized map-reduce style, chunk by chunk
+        self.summarizer = MapReduceSummarizer(self._generate_text)
+
+    def prepare(self, content: Union[str, PreparedContent]) -> PreparedContent:
+        """Hashes and chunks ``content`` once for any number of generations."""
+        if isinstance(content, PreparedContent):
+            return content
+        return PreparedContent(
+            text=content,
+            digest=content_hash(content),
+            chunks=chunk_text(content, self.summarizer.chunk_tokens),
+        )
 
-    async def summarize(self, content: str, style: str) -> dict:
+    async def _cached(
+        self,
+        operation: str,
+        prepared: PreparedContent,
+        params: Dict[str, Any],
+        generate: Callable[[], Awaitable[dict]],
+    ) -> dict:
+        """Serves a model call from the result cache, filling it on a miss."""
+        key = ai_cache.make_key(
+            operation, prepared.digest, params, self.model_name, PROMPT_VERSION
+        )
+        cached = await ai_cache.get(key)
+        if cached is not None:
+            return cached
+        with operation_scope(operation):
+            result = await generate()
+        await ai_cache.set(key, result, operation, self.model_name, PROMPT_VERSION)
+        return result
+
+    async def summarize(
+        self, content: Union[str, PreparedContent], style: str
+    ) -> dict:
         if not self.model:
+             text = content.text if isinstance(content, PreparedContent) else content
              return {
-                "summary": "Mock summary: " + content[:50] + "...",
+                "summary": "Mock summary: " + text[:50] + "...",
                 "key_points": ["Mock Point 1", "Mock Point 2"],
                 "topics": ["Mock Topic"],
-                "word_count": len(content.split())
+                "word_count": len(text.split())
              }
-        
-        prompt = f"Summarize the following content in '{style}' style:\n\n{content}"
+        prepared = self.prepare(content)
+        return await self._cached(
+            "summarize", prepared, {"style": style},
+            lambda: self._summarize(prepared, style),
+        )
+
+    async def summarize_stream(
+        self, content: str, style: str
+    ) -> AsyncIterator[dict]:
+        """
+        Streams a summary as it is generated.
+
+        Yields ``{"type": "token", "text": ...}`` events while the model is
+        producing output, then one ``{"type": "done", "data": ...}`` event with
+        the structured summary fields. Long content is condensed map-reduce
+        style first; only the final call is streamed.
+        """
+        if not self.model:
+            result = await self.summarize(content, style)
+            for word in result["summary"].split(" "):
+                yield {"type": "token", "text": word + " "}
+            yield {"type": "done", "data": result}
+            return
+
+        params = {"style": style}
+        key = ai_cache.make_key(
+            "summarize", content_hash(content), params, self.model_name, PROMPT_VERSION
+        )
+        cached = await ai_cache.get(key)
+        if cached is not None:
+            yield {"type": "token", "text": cached["summary"]}
+            yield {"type": "done", "data": cached}
+            return
+
+        parts = []
+        with operation_scope("summarize_stream"):
+            condensed = await self.summarizer.condense(content)
+            prompt = STREAM_FINAL_PROMPT.format(style=style, content=condensed)
+            try:
+                async for text in self.client.generate_stream(prompt):
+                    parts.append(text)
+                    yield {"type": "token", "text": text}
+            except Exception as e:
+                 raise _ai_error(e)
+
+        result = parse_sectioned_summary("".join(parts))
+        result["word_count"] = len(result["summary"].split())
+        # Same key as summarize(): a later non-streamed request is a cache hit
+        await ai_cache.set(key, result, "summarize", self.model_name, PROMPT_VERSION)
+        yield {"type": "done", "data": result}
+
+    async def _generate_text(
+        self, prompt: str, max_output_tokens: Optional[int] = None
+    ) -> str:
+        kwargs = {}
+        if max_output_tokens:
+            kwargs["generation_config"] = {"max_output_tokens": max_output_tokens}
         try:
-            response = self.model.generate_content(prompt)
-            # Simple simulation of structured return
-            return {
-                "summary": response.text,
-                "key_points": ["Extracted point 1", "Extracted point 2"], # Real impl needs structured IO or parsing
-                "topics": ["General"],
-                "word_count": len(response.text.split())
-            }
+            response = await self.client.generate(prompt, **kwargs)
+            return response.text
         except Exception as e:
-             raise APIError(code="AI_ERROR", message=f"Gemini Error: {str(e)}", status_code=500)
+             raise _ai_error(e)
+
+    async def _condense(self, prepared: PreparedContent) -> str:
+        """
+        Shortens ``prepared`` to fit one prompt, at most once.
+
+        Artifacts generated concurrently from the same content share the
+        map-reduce calls instead of each running their own.
+        """
+        if prepared.condensed is None:
+            prepared.condensed = asyncio.ensure_future(
+                self.summarizer.condense(prepared.text, prepared.chunks)
+            )
+        # One cancelled artifact must not cancel the others' condensation
+        return await asyncio.shield(prepared.condensed)
 
-    async def generate_quiz(self, content: str, count: int, difficulty: str) -> dict:
+    async def _summarize(self, prepared: PreparedContent, style: str) -> dict:
+        # Fits-in-one-prompt content takes a single call; longer content is
+        # chunked, summarized concurrently and reduced hierarchically
+        return await self.summarizer.summarize(await self._condense(prepared), style)
+
+    async def generate_quiz(
+        self, content: Union[str, PreparedContent], count: int, difficulty: str
+    ) -> dict:
         if not self.model:
             return {
                 "title": "Mock Quiz",
@@ -55,26 +303,87 @@ class GeminiService:
                 ],
                 "total_questions": 1
             }
-        # In real code, enforce JSON mode or parse text
-        return {
-                "title": "Generated Quiz",
-                "questions": [], 
-                "total_questions": 0
-            }
+        prepared = self.prepare(content)
+        return await self._cached(
+            "quiz", prepared, {"count": count, "difficulty": difficulty},
+            lambda: self._generate_quiz(prepared, count, difficulty),
+        )
+
+    async def _generate_quiz(
+        self, prepared: PreparedContent, count: int, difficulty: str
+    ) -> dict:
+        # Long documents are condensed map-reduce style to fit one prompt
+        content = await self._condense(prepared)
+        prompt = QUIZ_PROMPT.format(
+            difficulty=difficulty, count=count, content=content
+        )
+        return parse_quiz_json(await self._generate_text(prompt))
 
-    async def generate_diagram(self, content: str, diagram_type: str) -> dict:
+    async def generate_diagram(
+        self, content: Union[str, PreparedContent], diagram_type: str
+    ) -> dict:
         if not self.model:
             return {
                 "title": "Mock Diagram",
-                "image_url": "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNk+A8AAQUBAScY42YAAAAASUVORK5CYII=",
+                "image_url": (
+                    "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1"
+                    "HAwCAAAAC0lEQVR42mNk+A8AAQUBAScY42YAAAAASUVORK5CYII="
+                ),
                 "explanation": "A mock red dot diagram."
             }
-        # Logic to get mermaid code or image
-        return {
-            "title": "Generated Diagram",
-             "image_url": "", # Gemini returns text, frontend renders mermaid. Or we generate image.
-             # Architecture doc said image_url, but also text. Let's return mock.
-             "explanation": "Logic pending."
+        prepared = self.prepare(content)
+        return await self._cached(
+            "diagram", prepared, {"diagram_type": diagram_type},
+            lambda: self._generate_diagram(prepared, diagram_type),
+        )
+
+    async def _generate_diagram(
+        self, prepared: PreparedContent, diagram_type: str
+    ) -> dict:
+        # The model writes Mermaid code; the frontend renders it
+        content = await self._condense(prepared)
+        prompt = DIAGRAM_PROMPT.format(diagram_type=diagram_type, content=content)
+        return parse_diagram_json(await self._generate_text(prompt))
+
+    async def iter_study_pack(
+        self,
+        content: str,
+        artifacts: Sequence[str],
+        style: str = "standard",
+        question_count: int = 5,
+        difficulty: str = "medium",
+        diagram_type: str = "flowchart",
+    ) -> AsyncIterator[Tuple[str, Optional[dict], Optional[APIError]]]:
+        """
+        Generates several artifacts for one document concurrently.
+
+        The content is hashed, chunked and (if long) condensed once and shared
+        by every generation.
+        Yields ``(artifact, result, error)`` in completion order, so total
+        time tracks the slowest artifact rather than the sum of all of them.
+        """
+        prepared = self.prepare(content)
+        calls = {
+            "summary": lambda: self.summarize(prepared, style),
+            "quiz": lambda: self.generate_quiz(prepared, question_count, difficulty),
+            "diagram": lambda: self.generate_diagram(prepared, diagram_type),
         }
 
-gemini_service = GeminiService()
+        async def run(artifact: str):
+            try:
+                return artifact, await calls[artifact](), None
+            except APIError as e:
+                return artifact, None, e
+
+        tasks = [asyncio.ensure_future(run(a)) for a in artifacts]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # A client that disconnects mid-stream stops the remaining calls
+            for task in tasks:
+                task.cancel()
+            if prepared.condensed is not None:
+                prepared.condensed.cancel()
+
+gemini_service = registry.register("gemini", GeminiService)
@@ -0,0 +1,264 @@
+"""
+Durable background jobs backed by a Postgres table.
+
+Workers claim jobs with ``SELECT ... FOR UPDATE SKIP LOCKED``, so any number
+of workers, in any number of processes, can poll the same table without
+blocking each other or running a job twice. A claimed job is leased until
+``locked_until``; if its worker dies the lease expires and another worker
+picks the job up again. Failures are retried with exponential backoff until
+``max_attempts`` is reached.
+"""
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, or_, select, update
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.errors import APIError
+from app.db.models import AIJob
+
+logger = logging.getLogger(__name__)
+
+# (payload, id of the user who queued the job) -> result
+JobHandler = Callable[[Dict[str, Any], UUID], Awaitable[dict]]
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobQueue:
+    def __init__(
+        self,
+        visibility_timeout_seconds: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        retry_backoff_seconds: Optional[int] = None,
+    ):
+        self.visibility_timeout = timedelta(
+            seconds=visibility_timeout_seconds
+            or settings.JOB_VISIBILITY_TIMEOUT_SECONDS
+        )
+        self.max_attempts = max_attempts or settings.JOB_MAX_ATTEMPTS
+        self.retry_backoff_seconds = (
+            retry_backoff_seconds or settings.JOB_RETRY_BACKOFF_SECONDS
+        )
+
+    async def enqueue(
+        self, operation: str, payload: Dict[str, Any], user_id: UUID
+    ) -> AIJob:
+        job = AIJob(
+            user_id=user_id,
+            operation=operation,
+            payload=payload,
+            status=QUEUED,
+            attempts=0,
+            max_attempts=self.max_attempts,
+            run_after=datetime.utcnow(),
+        )
+        async with AsyncSessionLocal() as db:
+            db.add(job)
+            await db.commit()
+        return job
+
+    async def get(self, job_id: UUID, user_id: UUID) -> Optional[AIJob]:
+        """The job, or None if it does not exist or belongs to another user."""
+        async with AsyncSessionLocal() as db:
+            job = await db.get(AIJob, job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job
+
+    async def claim(self, worker_id: str) -> Optional[AIJob]:
+        """
+        Leases the next runnable job to ``worker_id``, or returns None.
+
+        Runnable means queued and due, or running with an expired lease.
+        """
+        async with AsyncSessionLocal() as db:
+            while True:
+                now = datetime.utcnow()
+                stmt = (
+                    select(AIJob)
+                    .where(
+                        or_(
+                            and_(AIJob.status == QUEUED, AIJob.run_after <= now),
+                            and_(AIJob.status == RUNNING, AIJob.locked_until < now),
+                        )
+                    )
+                    .order_by(AIJob.run_after)
+                    .limit(1)
+                    .with_for_update(skip_locked=True)
+                )
+                job = (await db.execute(stmt)).scalar_one_or_none()
+                if job is None:
+                    return None
+
+                if job.attempts >= job.max_attempts:
+                    # Its last attempt's worker died without reporting back
+                    job.status = FAILED
+                    job.error = {
+                        "code": "JOB_TIMEOUT",
+                        "message": "Job did not finish within its visibility timeout",
+                    }
+                    job.finished_at = now
+                    job.locked_until = None
+                    await db.commit()
+                    continue
+
+                job.status = RUNNING
+                job.attempts += 1
+                job.locked_by = worker_id
+                job.locked_until = now + self.visibility_timeout
+                await db.commit()
+                return job
+
+    async def complete(self, job: AIJob, worker_id: str, result: dict) -> bool:
+        return await self._finish(
+            job,
+            worker_id,
+            status=SUCCEEDED,
+            result=result,
+            error=None,
+            finished_at=datetime.utcnow(),
+        )
+
+    async def fail(
+        self, job: AIJob, worker_id: str, error: dict, retry: bool = True
+    ) -> bool:
+        """
+        Records a failed attempt, re-queueing the job with backoff if allowed.
+        """
+        now = datetime.utcnow()
+        if retry and job.attempts < job.max_attempts:
+            delay = self.retry_backoff_seconds * 2 ** (job.attempts - 1)
+            return await self._finish(
+                job,
+                worker_id,
+                status=QUEUED,
+                error=error,
+                run_after=now + timedelta(seconds=delay),
+            )
+        return await self._finish(
+            job, worker_id, status=FAILED, error=error, finished_at=now
+        )
+
+    async def _finish(self, job: AIJob, worker_id: str, **values: Any) -> bool:
+        # Only the current lease holder may report; a worker whose lease
+        # expired (and whose job was re-claimed) is ignored
+        stmt = (
+            update(AIJob)
+            .where(
+                AIJob.id == job.id,
+                AIJob.status == RUNNING,
+                AIJob.locked_by == worker_id,
+            )
+            .values(locked_until=None, updated_at=datetime.utcnow(), **values)
+        )
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(stmt)
+            await db.commit()
+        if not result.rowcount:
+            logger.warning(f"Job {job.id} lease lost before {worker_id} finished it")
+            return False
+        return True
+
+
+def _error_payload(exc: Exception) -> dict:
+    if isinstance(exc, APIError):
+        return {"code": exc.code, "message": exc.message}
+    if isinstance(exc, asyncio.TimeoutError):
+        return {"code": "JOB_TIMEOUT", "message": "Job exceeded its visibility timeout"}
+    return {"code": "JOB_ERROR", "message": str(exc)}
+
+
+class JobWorkerPool:
+    """
+    Runs ``concurrency`` polling workers in the current event loop.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, JobHandler],
+        concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = (
+            settings.JOB_WORKER_CONCURRENCY if concurrency is None else concurrency
+        )
+        self.poll_interval = poll_interval or settings.JOB_POLL_INTERVAL_SECONDS
+        self._tasks: List[asyncio.Task] = []
+        self._prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        for i in range(self.concurrency):
+            worker_id = f"{self._prefix}:{i}"
+            self._tasks.append(asyncio.create_task(self._run(worker_id)))
+        logger.info(f"Started {self.concurrency} job workers")
+
+    async def stop(self) -> None:
+        # Interrupted jobs are picked up again once their lease expires
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self, worker_id: str) -> None:
+        while True:
+            try:
+                job = await self.queue.claim(worker_id)
+                if job is None:
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                await self.execute(job, worker_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Database hiccups must not kill the worker
+                logger.error(f"Job worker {worker_id} error: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def execute(self, job: AIJob, worker_id: str) -> None:
+        handler = self.handlers.get(job.operation)
+        try:
+            if handler is None:
+                raise APIError(
+                    code="UNKNOWN_JOB",
+                    message=f"No handler for job operation '{job.operation}'",
+                    status_code=400,
+                )
+            # Stop before the lease runs out so no other worker starts a duplicate
+            result = await asyncio.wait_for(
+                handler(job.payload, job.user_id),
+                timeout=self.queue.visibility_timeout.total_seconds(),
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Client errors (bad input, unknown operation) will not succeed on
+            # retry; rate limiting (429) will
+            retry = not (
+                isinstance(e, APIError)
+                and e.status_code < 500
+                and e.status_code != 429
+            )
+            logger.warning(
+                f"Job {job.id} attempt {job.attempts}/{job.max_attempts} failed: {e}"
+            )
+            await self.queue.fail(job, worker_id, _error_payload(e), retry=retry)
+        else:
+            await self.queue.complete(job, worker_id, result)
+
+
+job_queue = JobQueue()
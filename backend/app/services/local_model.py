@@ -0,0 +1,270 @@
+"""
+Deterministic local stand-in for the Gemini model, for load tests.
+
+Selected with ``GEMINI_BACKEND=local``. It implements the parts of the
+``GenerativeModel`` interface that GeminiClient uses (``generate_content``
+and ``generate_content_async``, streamed or not) and behaves like a remote
+model under load:
+
+* each call waits for a latency drawn from a configurable distribution,
+  plus output length divided by the generation speed;
+* streamed calls send the first chunk after that latency and the rest at
+  the generation speed;
+* calls can fail at random with a server error or a quota error, and an
+  upstream requests-per-minute quota can be simulated;
+* the text is a function of the prompt and seed only, and has the shape
+  each prompt asks for (JSON or sectioned text), so parsing works as with
+  the real model.
+
+Latencies and injected errors come from one seeded generator, so a run that
+sends the same requests in the same order sees the same timings and
+failures.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from app.core.config import settings
+
+_WORD = re.compile(r"[A-Za-z][A-Za-z'-]{3,}")
+_QUESTION_COUNT = re.compile(r"quiz of (\d+) questions")
+
+
+class ResourceExhausted(Exception):
+    """Quota error; named like the SDK's so ``is_quota_error`` treats it alike."""
+
+    code = 429
+
+
+class LocalModelError(Exception):
+    code = 500
+
+
+@dataclass
+class LatencyDistribution:
+    """
+    Time to first token, parsed from a spec (milliseconds):
+
+    ``fixed:MS``, ``uniform:LOW:HIGH`` or ``lognormal:MEDIAN:SIGMA``.
+    """
+    kind: str
+    a: float
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        kind, *values = spec.split(":")
+        try:
+            numbers = [float(v) for v in values]
+            if kind == "fixed" and len(numbers) == 1:
+                return cls(kind, numbers[0])
+            if kind in ("uniform", "lognormal") and len(numbers) == 2:
+                return cls(kind, numbers[0], numbers[1])
+        except ValueError:
+            pass
+        raise ValueError(f"Invalid latency distribution: {spec!r}")
+
+    def sample(self, rng: random.Random) -> float:
+        """One draw, in seconds."""
+        if self.kind == "fixed":
+            ms = self.a
+        elif self.kind == "uniform":
+            ms = rng.uniform(self.a, self.b)
+        else:
+            ms = rng.lognormvariate(math.log(self.a), self.b)
+        return max(0.0, ms) / 1000
+
+
+@dataclass
+class _Response:
+    text: str
+
+
+class _AsyncStream:
+    def __init__(self, chunks: AsyncIterator[_Response]):
+        self._chunks = chunks
+
+    def __aiter__(self) -> AsyncIterator[_Response]:
+        return self._chunks
+
+
+class LocalModel:
+    def __init__(
+        self,
+        latency: Optional[str] = None,
+        tokens_per_second: Optional[float] = None,
+        stream_chunk_tokens: Optional[int] = None,
+        error_rate: Optional[float] = None,
+        quota_error_rate: Optional[float] = None,
+        requests_per_minute: Optional[int] = None,
+        seed: Optional[int] = None,
+    ):
+        self.latency = LatencyDistribution.parse(
+            latency or settings.LOCAL_MODEL_LATENCY
+        )
+        self.tokens_per_second = (
+            tokens_per_second or settings.LOCAL_MODEL_TOKENS_PER_SECOND
+        )
+        self.stream_chunk_tokens = (
+            stream_chunk_tokens or settings.LOCAL_MODEL_STREAM_CHUNK_TOKENS
+        )
+        self.error_rate = (
+            settings.LOCAL_MODEL_ERROR_RATE if error_rate is None else error_rate
+        )
+        self.quota_error_rate = (
+            settings.LOCAL_MODEL_QUOTA_ERROR_RATE
+            if quota_error_rate is None
+            else quota_error_rate
+        )
+        self.requests_per_minute = (
+            settings.LOCAL_MODEL_REQUESTS_PER_MINUTE
+            if requests_per_minute is None
+            else requests_per_minute
+        )
+        self.seed = settings.LOCAL_MODEL_SEED if seed is None else seed
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+        self._window: List[float] = []
+        self.counters = {"calls": 0, "errors": 0, "quota_errors": 0}
+
+    # -- behaviour ---------------------------------------------------------
+
+    def _admit(self) -> float:
+        """Counts the call, injects failures and returns its first-token delay."""
+        with self._lock:
+            self.counters["calls"] += 1
+            if self.requests_per_minute:
+                now = time.monotonic()
+                self._window = [t for t in self._window if now - t < 60]
+                if len(self._window) >= self.requests_per_minute:
+                    self.counters["quota_errors"] += 1
+                    raise ResourceExhausted("429 Local model quota exceeded")
+                self._window.append(now)
+            draw = self._rng.random()
+            if draw < self.quota_error_rate:
+                self.counters["quota_errors"] += 1
+                raise ResourceExhausted("429 Injected quota error")
+            if draw < self.quota_error_rate + self.error_rate:
+                self.counters["errors"] += 1
+                raise LocalModelError("500 Injected model error")
+            return self.latency.sample(self._rng)
+
+    def _chunks(self, text: str) -> List[str]:
+        words = text.split(" ")
+        size = self.stream_chunk_tokens
+        return [
+            " ".join(words[i:i + size]) + (" " if i + size < len(words) else "")
+            for i in range(0, len(words), size)
+        ]
+
+    def _generation_time(self, text: str) -> float:
+        return len(text.split()) / self.tokens_per_second
+
+    # -- GenerativeModel interface ------------------------------------------
+
+    def generate_content(self, prompt: Any, stream: bool = False, **kwargs: Any):
+        delay = self._admit()
+        text = respond(str(prompt), self.seed, _max_tokens(kwargs))
+        if stream:
+            return self._stream_sync(text, delay)
+        time.sleep(delay + self._generation_time(text))
+        return _Response(text)
+
+    def _stream_sync(self, text: str, delay: float) -> Iterator[_Response]:
+        time.sleep(delay)
+        for i, chunk in enumerate(self._chunks(text)):
+            if i:
+                time.sleep(self.stream_chunk_tokens / self.tokens_per_second)
+            yield _Response(chunk)
+
+    async def generate_content_async(
+        self, prompt: Any, stream: bool = False, **kwargs: Any
+    ):
+        delay = self._admit()
+        text = respond(str(prompt), self.seed, _max_tokens(kwargs))
+        if stream:
+            return _AsyncStream(self._stream_async(text, delay))
+        await asyncio.sleep(delay + self._generation_time(text))
+        return _Response(text)
+
+    async def _stream_async(self, text: str, delay: float) -> AsyncIterator[_Response]:
+        await asyncio.sleep(delay)
+        for i, chunk in enumerate(self._chunks(text)):
+            if i:
+                await asyncio.sleep(self.stream_chunk_tokens / self.tokens_per_second)
+            yield _Response(chunk)
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self.counters)
+
+
+def _max_tokens(kwargs: Dict[str, Any]) -> Optional[int]:
+    config = kwargs.get("generation_config") or {}
+    return config.get("max_output_tokens") if isinstance(config, dict) else None
+
+
+def respond(prompt: str, seed: int = 0, max_tokens: Optional[int] = None) -> str:
+    """
+    Deterministic answer to ``prompt`` in the format the prompt asks for.
+    """
+    rng = random.Random(hashlib.sha256(f"{seed}:{prompt}".encode()).digest())
+    vocabulary = sorted(set(_WORD.findall(prompt))) or ["content"]
+    words = max_tokens or 120
+
+    def sentence(length: int) -> str:
+        text = " ".join(rng.choice(vocabulary) for _ in range(length))
+        return text.capitalize() + "."
+
+    summary = " ".join(sentence(rng.randint(8, 16)) for _ in range(max(1, words // 14)))
+    key_points = [sentence(rng.randint(5, 9)) for _ in range(rng.randint(3, 5))]
+    topics = rng.sample(vocabulary, min(len(vocabulary), 3))
+
+    if '"questions"' in prompt:
+        match = _QUESTION_COUNT.search(prompt)
+        return json.dumps(
+            {
+                "title": sentence(3),
+                "questions": [
+                    _question(rng, vocabulary, sentence)
+                    for _ in range(int(match.group(1)) if match else 5)
+                ],
+            }
+        )
+    if '"mermaid_code"' in prompt:
+        nodes = rng.sample(vocabulary, min(len(vocabulary), 4))
+        edges = [f"    N{i} --> N{i + 1}" for i in range(len(nodes) - 1)]
+        labels = [f"    N{i}[{node}]" for i, node in enumerate(nodes)]
+        return json.dumps(
+            {
+                "title": sentence(3),
+                "mermaid_code": "\n".join(["flowchart TD", *labels, *edges]),
+                "explanation": sentence(rng.randint(8, 16)),
+            }
+        )
+    if "Respond with JSON" in prompt:
+        return json.dumps(
+            {"summary": summary, "key_points": key_points, "topics": topics}
+        )
+    if "KEY POINTS:" in prompt:
+        points = "\n".join(f"- {point}" for point in key_points)
+        return f"{summary}\n\nKEY POINTS:\n{points}\n\nTOPICS: {', '.join(topics)}"
+    return summary
+
+
+def _question(
+    rng: random.Random, vocabulary: List[str], sentence: Callable[[int], str]
+) -> Dict[str, Any]:
+    options = [rng.choice(vocabulary) for _ in range(4)]
+    return {
+        "question": sentence(rng.randint(6, 12))[:-1] + "?",
+        "options": options,
+        "correct_answer": rng.choice(options),
+        "explanation": sentence(rng.randint(5, 9)),
+    }
@@ -0,0 +1,413 @@
+"""
+PDF page extraction engine.
+
+Extraction is tiered. Every page first goes through a fast, text-only
+backend (PyPDF2). Only pages whose fast result looks broken (empty, garbled,
+or fragmented the way multi-column layouts come out) are extracted again
+with the layout-aware backend (pdfplumber), which is much slower because it
+computes layout for every character. Each document gets an
+:class:`ExtractionReport` saying which path every page took and how long
+each backend spent.
+
+Extraction is CPU bound, so it never runs on the event loop. Small documents
+are handled in a worker thread; large documents are split into contiguous
+page ranges that are extracted in parallel on a process pool and merged back
+in page order.
+"""
+import asyncio
+import importlib
+import io
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import (
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from app.core.config import settings
+from app.core.registry import registry
+
+logger = logging.getLogger(__name__)
+
+# A PDF source is either the raw bytes or a path to a file on disk.
+# Paths are preferred for the process pool: only the path is pickled.
+PDFSource = Union[bytes, str]
+
+FAST = "fast"
+LAYOUT = "layout"
+
+# Both backends are imported on first use or during warmup
+registry.register("PyPDF2", lambda: importlib.import_module("PyPDF2"))
+registry.register("pdfplumber", lambda: importlib.import_module("pdfplumber"))
+
+# Below this many non-space characters a page counts as empty
+_MIN_PAGE_CHARS = 20
+_GARBAGE = re.compile(r"\ufffd|\(cid:\d+\)|[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+class PageResult(NamedTuple):
+    text: str
+    backend: str
+    # Why the fast result was rejected (None when it was kept)
+    reason: Optional[str]
+    seconds: float
+
+
+@dataclass
+class ExtractionReport:
+    """
+    Quality and speed summary of one extracted document.
+    """
+    page_count: int = 0
+    fast_pages: int = 0
+    layout_pages: int = 0
+    fallback_reasons: Dict[str, int] = field(default_factory=dict)
+    fast_seconds: float = 0.0
+    layout_seconds: float = 0.0
+    total_seconds: float = 0.0
+
+    @classmethod
+    def from_pages(
+        cls, pages: List[PageResult], total_seconds: float
+    ) -> "ExtractionReport":
+        report = cls(page_count=len(pages), total_seconds=total_seconds)
+        for page in pages:
+            if page.backend == FAST:
+                report.fast_pages += 1
+                report.fast_seconds += page.seconds
+            else:
+                report.layout_pages += 1
+                report.layout_seconds += page.seconds
+        report.fallback_reasons = dict(
+            Counter(page.reason for page in pages if page.reason)
+        )
+        return report
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "page_count": self.page_count,
+            "fast_pages": self.fast_pages,
+            "layout_pages": self.layout_pages,
+            "fallback_reasons": self.fallback_reasons,
+            "fast_ms": round(self.fast_seconds * 1000, 1),
+            "layout_ms": round(self.layout_seconds * 1000, 1),
+            "total_ms": round(self.total_seconds * 1000, 1),
+        }
+
+
+def assess_page_text(text: str) -> Optional[str]:
+    """
+    Returns why a fast-path page text looks broken, or None if it looks fine.
+
+    Reasons: ``empty`` (no real text), ``garbled`` (replacement characters,
+    unmapped glyphs, or mostly non-letters), ``spaced`` (letters separated by
+    spaces), ``run_together`` (missing word spaces) and ``fragmented``
+    (mostly tiny lines, typical of interleaved columns).
+    """
+    visible = "".join(text.split())
+    if len(visible) < _MIN_PAGE_CHARS:
+        return "empty"
+    if len(_GARBAGE.findall(text)) > len(visible) * 0.01:
+        return "garbled"
+    if sum(c.isalpha() for c in visible) < len(visible) * 0.5:
+        return "garbled"
+    words = text.split()
+    if len(words) >= 10 and sum(len(w) == 1 for w in words) > len(words) * 0.4:
+        return "spaced"
+    if len(visible) / len(words) > 15:
+        return "run_together"
+    lines = [line for line in text.splitlines() if line.strip()]
+    short_lines = sum(len(line.strip()) <= 3 for line in lines)
+    if len(lines) >= 10 and short_lines > len(lines) * 0.5:
+        return "fragmented"
+    return None
+
+
+def _open_fast(source: PDFSource):
+    import PyPDF2
+
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    return PyPDF2.PdfReader(source)
+
+
+def _open_source(source: PDFSource):
+    import pdfplumber
+
+    if isinstance(source, (bytes, bytearray)):
+        return pdfplumber.open(io.BytesIO(source))
+    return pdfplumber.open(source)
+
+
+def count_pages(source: PDFSource) -> int:
+    try:
+        return len(_open_fast(source).pages)
+    except Exception:
+        with _open_source(source) as pdf:
+            return len(pdf.pages)
+
+
+def _layout_page_text(pdf, index: int) -> str:
+    page = pdf.pages[index]
+    text = page.extract_text() or ""
+    # Drop the cached layout objects as soon as the page is done
+    page.close()
+    return text
+
+
+def iter_page_results(
+    source: PDFSource, start: int, end: int, fast_path: bool = True
+) -> Iterator[PageResult]:
+    """
+    Yields the extraction result of pages [start, end) of a PDF, one at a time.
+
+    Pages without text are yielded as empty strings to keep positions stable.
+    A document the fast backend cannot open at all is extracted entirely
+    with the layout backend.
+    """
+    reader = None
+    if fast_path:
+        try:
+            reader = _open_fast(source)
+            len(reader.pages)
+        except Exception as e:
+            logger.debug(f"Fast PDF backend cannot read document: {e}")
+            reader = None
+
+    pdf = None
+    try:
+        for index in range(start, end):
+            started = time.perf_counter()
+            reason = "unreadable" if fast_path else None
+            if reader is not None:
+                try:
+                    text = reader.pages[index].extract_text() or ""
+                    reason = assess_page_text(text)
+                except Exception:
+                    reason = "unreadable"
+                if reason is None:
+                    yield PageResult(text, FAST, None, time.perf_counter() - started)
+                    continue
+            if pdf is None:
+                # Opened lazily: a clean range never loads pdfplumber's layout
+                pdf = _open_source(source)
+            layout_started = time.perf_counter()
+            layout_text = _layout_page_text(pdf, index)
+            fast_readable = reader is not None and reason != "unreadable"
+            if fast_readable and not layout_text.strip():
+                # Both came back empty-ish; keep whatever the fast path found
+                layout_text = text
+            layout_seconds = time.perf_counter() - layout_started
+            yield PageResult(layout_text, LAYOUT, reason, layout_seconds)
+    finally:
+        if pdf is not None:
+            pdf.close()
+
+
+def extract_page_range(
+    source: PDFSource, start: int, end: int, fast_path: bool = True
+) -> List[PageResult]:
+    """
+    Extracts pages [start, end) of a PDF.
+
+    Runs inside pool workers, so it must stay a module-level function.
+    """
+    return list(iter_page_results(source, start, end, fast_path))
+
+
+def split_page_ranges(
+    page_count: int, workers: int, min_pages_per_task: int
+) -> List[Tuple[int, int]]:
+    """
+    Splits ``page_count`` pages into contiguous [start, end) ranges.
+
+    Produces at most ``workers`` ranges of at least ``min_pages_per_task``
+    pages each (the last range may be shorter), sized as evenly as possible.
+    """
+    if page_count <= 0:
+        return []
+    tasks = max(1, min(workers, page_count // max(1, min_pages_per_task)))
+    base, extra = divmod(page_count, tasks)
+    ranges = []
+    start = 0
+    for i in range(tasks):
+        end = start + base + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+class PDFExtractionEngine:
+    """
+    Extracts per-page text from PDFs without blocking the event loop.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        min_pages_per_task: Optional[int] = None,
+        inline_page_limit: Optional[int] = None,
+        fast_path: Optional[bool] = None,
+    ):
+        pool_size = (
+            max_workers
+            if max_workers is not None
+            else settings.EXTRACTION_POOL_SIZE
+        )
+        self.max_workers = pool_size or os.cpu_count() or 1
+        self.min_pages_per_task = (
+            min_pages_per_task or settings.EXTRACTION_MIN_PAGES_PER_TASK
+        )
+        self.inline_page_limit = (
+            inline_page_limit
+            if inline_page_limit is not None
+            else settings.EXTRACTION_INLINE_PAGE_LIMIT
+        )
+        self.fast_path = (
+            settings.EXTRACTION_FAST_PATH if fast_path is None else fast_path
+        )
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._totals: Counter = Counter()
+        self._reasons: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            logger.info(
+                "Starting PDF extraction pool with %d workers", self.max_workers
+            )
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    async def extract_document(
+        self, source: PDFSource
+    ) -> Tuple[List[str], ExtractionReport]:
+        """
+        Returns the text of every page, in page order, and the document's report.
+        """
+        started = time.perf_counter()
+        page_count = await asyncio.to_thread(count_pages, source)
+
+        if page_count <= self.inline_page_limit or self.max_workers <= 1:
+            results = await asyncio.to_thread(
+                extract_page_range, source, 0, page_count, self.fast_path
+            )
+        else:
+            ranges = split_page_ranges(
+                page_count, self.max_workers, self.min_pages_per_task
+            )
+            loop = asyncio.get_running_loop()
+            pool = self._get_pool()
+            chunks = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        pool, extract_page_range, source, start, end, self.fast_path
+                    )
+                    for start, end in ranges
+                )
+            )
+            results = [result for chunk in chunks for result in chunk]
+
+        report = ExtractionReport.from_pages(results, time.perf_counter() - started)
+        self.record(report)
+        return [result.text for result in results], report
+
+    async def extract_pages(self, source: PDFSource) -> List[str]:
+        """
+        Returns the text of every page, in page order.
+        """
+        pages, _ = await self.extract_document(source)
+        return pages
+
+    async def iter_results(
+        self, source: PDFSource
+    ) -> AsyncIterator[Tuple[int, PageResult]]:
+        """
+        Yields ``(page_number, result)`` pairs in page order as pages complete.
+
+        Page numbers are 1-based. Large documents are cut into small ranges so
+        the first pages come back while later ranges are still on the pool.
+        """
+        page_count = await asyncio.to_thread(count_pages, source)
+
+        if page_count <= self.inline_page_limit or self.max_workers <= 1:
+            pages = iter_page_results(source, 0, page_count, self.fast_path)
+            try:
+                page_number = 0
+                while (
+                    result := await asyncio.to_thread(next, pages, None)
+                ) is not None:
+                    page_number += 1
+                    yield page_number, result
+            finally:
+                pages.close()
+            return
+
+        step = self.min_pages_per_task
+        ranges = split_page_ranges(page_count, -(-page_count // step), step)
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        futures = [
+            loop.run_in_executor(
+                pool, extract_page_range, source, start, end, self.fast_path
+            )
+            for start, end in ranges
+        ]
+        try:
+            for (start, _), future in zip(ranges, futures):
+                for offset, result in enumerate(await future):
+                    yield start + offset + 1, result
+        finally:
+            for future in futures:
+                future.cancel()
+
+    async def iter_pages(self, source: PDFSource) -> AsyncIterator[Tuple[int, str]]:
+        """
+        Yields ``(page_number, text)`` pairs in page order as pages complete.
+        """
+        async for page_number, result in self.iter_results(source):
+            yield page_number, result.text
+
+    def record(self, report: ExtractionReport) -> None:
+        """Adds a document's report to the running totals."""
+        with self._lock:
+            self._totals["documents"] += 1
+            self._totals["pages"] += report.page_count
+            self._totals["fast_pages"] += report.fast_pages
+            self._totals["layout_pages"] += report.layout_pages
+            self._reasons.update(report.fallback_reasons)
+        logger.info(f"Extracted PDF: {report.to_dict()}")
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            totals = dict(self._totals)
+            reasons = dict(self._reasons)
+        pages = totals.get("pages", 0)
+        return {
+            "fast_path": self.fast_path,
+            **totals,
+            "fast_page_ratio": (
+                round(totals.get("fast_pages", 0) / pages, 3) if pages else None
+            ),
+            "fallback_reasons": reasons,
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+pdf_engine = PDFExtractionEngine()
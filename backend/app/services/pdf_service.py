@@ -1,17 +1,22 @@
-import PyPDF2
-from io import BytesIO
+from typing import Union
+
 from app.core.errors import APIError
+from app.services.pdf_engine import pdf_engine
+
 
 class PDFService:
     @staticmethod
-    async def extract_text(file_content: bytes) -> str:
+    async def extract_text(source: Union[bytes, str]) -> str:
+        """Extracts text from PDF bytes or a file path, off the event loop."""
         try:
-            reader = PyPDF2.PdfReader(BytesIO(file_content))
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            return text.strip()
+            pages = await pdf_engine.extract_pages(source)
         except Exception as e:
-            raise APIError(code="EXTRACTION_FAILED", message="Failed to extract text from PDF", details={"error": str(e)}, status_code=500)
+            raise APIError(
+                code="EXTRACTION_FAILED",
+                message="Failed to extract text from PDF",
+                details={"error": str(e)},
+                status_code=500,
+            )
+        return "\n".join(pages).strip()
 
 pdf_service = PDFService()
@@ -0,0 +1,210 @@
+"""
+Outbound rate control for Gemini calls.
+
+Every call first takes a permit from :class:`RateLimiter`, which enforces a
+requests-per-minute and a tokens-per-minute token bucket. Callers that cannot
+be served yet wait in a priority queue, so interactive requests overtake
+queued background jobs. Quota errors from the API put the limiter into a
+jittered exponential cooldown and cut its send rate in half; each success
+raises the rate again a little (AIMD), so the limiter settles just under the
+real quota instead of oscillating into error storms.
+
+The buckets live in process memory. Every uvicorn worker or job worker
+process has its own, so N processes together may send up to N times the
+configured RPM/TPM; set the limits to the account quota divided by N.
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import random
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from app.core.config import settings
+
+INTERACTIVE = 0
+BACKGROUND = 10
+
+# Priority of Gemini calls made from the current task (lower runs first)
+request_priority: contextvars.ContextVar[int] = contextvars.ContextVar(
+    "request_priority", default=INTERACTIVE
+)
+
+_MIN_RATE_FACTOR = 0.1
+_RATE_FACTOR_STEP = 0.05
+
+
+@contextmanager
+def priority(level: int) -> Iterator[None]:
+    token = request_priority.set(level)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+def is_quota_error(exc: BaseException) -> bool:
+    """True for HTTP 429 / ``ResourceExhausted`` from the Gemini API."""
+    return getattr(exc, "code", None) == 429 or (
+        type(exc).__name__ == "ResourceExhausted"
+    )
+
+
+class TokenBucket:
+    """
+    Refills continuously at ``rate_per_minute``, holding at most one minute's worth.
+
+    A rate of 0 means unlimited.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.rate_per_minute = rate_per_minute
+        self.capacity = rate_per_minute
+        self.tokens = rate_per_minute
+        self._updated = time.monotonic()
+
+    def _refill(self, factor: float) -> None:
+        now = time.monotonic()
+        rate = self.rate_per_minute * factor / 60
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * rate)
+        self._updated = now
+
+    def time_until(self, amount: float, factor: float = 1.0) -> float:
+        """Seconds until ``amount`` tokens are available (0 if they are now)."""
+        if not self.rate_per_minute:
+            return 0.0
+        self._refill(factor)
+        # Requests bigger than the bucket are let through once it is full
+        missing = min(amount, self.capacity) - self.tokens
+        if missing <= 0:
+            return 0.0
+        return missing / (self.rate_per_minute * factor / 60)
+
+    def consume(self, amount: float) -> None:
+        if self.rate_per_minute:
+            self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """
+    Per-process RPM/TPM limiter; see the module docstring for multi-process use.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+    ):
+        self.requests = TokenBucket(
+            settings.GEMINI_REQUESTS_PER_MINUTE
+            if requests_per_minute is None
+            else requests_per_minute
+        )
+        self.tokens = TokenBucket(
+            settings.GEMINI_TOKENS_PER_MINUTE
+            if tokens_per_minute is None
+            else tokens_per_minute
+        )
+        self.backoff_base = backoff_base or settings.GEMINI_BACKOFF_BASE_SECONDS
+        self.backoff_max = backoff_max or settings.GEMINI_BACKOFF_MAX_SECONDS
+        self.rate_factor = 1.0
+
+        self._waiters: List[list] = []
+        self._seq = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._cooldown_until = 0.0
+        self._consecutive_quota_errors = 0
+        self.counters = {"granted": 0, "queued": 0, "quota_errors": 0}
+
+    async def acquire(self, tokens: int = 0, level: Optional[int] = None) -> None:
+        """
+        Waits for a permit to send one request of about ``tokens`` tokens.
+        """
+        if level is None:
+            level = request_priority.get()
+        future = asyncio.get_running_loop().create_future()
+        # The last field records whether this request has been counted as queued
+        entry = [level, next(self._seq), tokens, future, False]
+        heapq.heappush(self._waiters, entry)
+        self._ensure_dispatcher()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if entry in self._waiters:
+                # Still queued: drop it so it does not consume a permit
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+    def _ensure_dispatcher(self) -> None:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        while self._waiters:
+            entry = self._waiters[0]
+            level, _, tokens, future, counted = entry
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            wait = max(
+                self._cooldown_until - time.monotonic(),
+                self.requests.time_until(1, self.rate_factor),
+                self.tokens.time_until(tokens, self.rate_factor),
+            )
+            if wait > 0:
+                if not counted:
+                    # Once per waiting request, not once per wakeup
+                    entry[4] = True
+                    self.counters["queued"] += 1
+                # A new, higher-priority waiter or a rate change wakes us early
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._waiters)
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            self.counters["granted"] += 1
+            future.set_result(None)
+
+    def record_success(self) -> None:
+        self._consecutive_quota_errors = 0
+        self.rate_factor = min(1.0, self.rate_factor + _RATE_FACTOR_STEP)
+
+    def record_quota_error(self) -> float:
+        """
+        Halves the send rate and starts a cooldown; returns its length.
+        """
+        self.counters["quota_errors"] += 1
+        self._consecutive_quota_errors += 1
+        self.rate_factor = max(_MIN_RATE_FACTOR, self.rate_factor / 2)
+        ceiling = min(
+            self.backoff_max,
+            self.backoff_base * 2 ** (self._consecutive_quota_errors - 1),
+        )
+        # Equal jitter: at least half the backoff, with the rest random so
+        # retries from every waiting caller are spread apart
+        delay = random.uniform(ceiling / 2, ceiling)
+        self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+        return delay
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            **self.counters,
+            "waiting": len(self._waiters),
+            "rate_factor": round(self.rate_factor, 3),
+            "cooldown_seconds": round(
+                max(0.0, self._cooldown_until - time.monotonic()), 3
+            ),
+        }
@@ -0,0 +1,225 @@
+"""
+Local retrieval over document chunks with hashed TF-IDF vectors.
+
+Documents are cut into small chunks (a few hundred tokens) whose terms are
+hashed into a fixed number of buckets, so no vocabulary has to be stored and
+nothing leaves the process. A chunk is persisted as a sparse vector of
+sublinear term frequencies; IDF weights are derived from those vectors when a
+document's index is loaded. In memory the vectors stay sparse (CSR-style
+bucket and weight arrays, about 6 bytes per distinct term of a chunk), and
+search is one gather and scatter-add over them followed by ``argpartition``.
+"""
+import bisect
+import re
+import sys
+import zlib
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.text_chunker import CHARS_PER_TOKEN
+
+VECTOR_DIM = 2048
+
+# Sparse on-disk form: bucket index and weight per non-zero term
+_SPARSE_DTYPE = np.dtype([("index", "<u2"), ("weight", "<f2")])
+
+_TOKEN = re.compile(r"[a-z0-9]{2,}")
+_STOPWORDS = frozenset(
+    "a an and are as at be been but by can for from had has have he her his "
+    "if in into is it its not of on or our she so such than that the their "
+    "them then there these they this those to was we were what when which "
+    "who will with would you your".split()
+)
+
+
+@dataclass
+class Chunk:
+    start: int
+    end: int
+    page_start: int
+    page_end: int
+
+
+def _cut_point(text: str, start: int, max_chars: int) -> int:
+    """End of the chunk starting at ``start``, preferring natural breaks."""
+    limit = start + max_chars
+    if limit >= len(text):
+        return len(text)
+    # Only look for a break in the second half so chunks stay reasonably full
+    floor = start + max_chars // 2
+    for separator in ("\n\n", "\n", ". ", " "):
+        cut = text.rfind(separator, floor, limit)
+        if cut != -1:
+            return cut + len(separator)
+    return limit
+
+
+def chunk_pages(pages: Sequence[str], max_tokens: int) -> List[Chunk]:
+    """
+    Splits the document text into chunks of at most ``max_tokens`` tokens.
+
+    Offsets refer to the text as stored (non-empty pages joined with a
+    newline). Each chunk records the 1-based range of pages it covers.
+    """
+    page_numbers: List[int] = []
+    page_offsets: List[int] = []
+    offset = 0
+    for number, page in enumerate(pages, start=1):
+        if not page:
+            continue
+        page_numbers.append(number)
+        page_offsets.append(offset)
+        offset += len(page) + 1
+    text = "\n".join(page for page in pages if page)
+
+    def page_at(position: int) -> int:
+        return page_numbers[bisect.bisect_right(page_offsets, position) - 1]
+
+    chunks: List[Chunk] = []
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    position = 0
+    while position < len(text):
+        # Skip whitespace left over from the previous cut
+        while position < len(text) and text[position].isspace():
+            position += 1
+        if position == len(text):
+            break
+        end = _cut_point(text, position, max_chars)
+        stripped_end = len(text[position:end].rstrip()) + position
+        chunks.append(
+            Chunk(position, stripped_end, page_at(position), page_at(stripped_end - 1))
+        )
+        position = end
+    return chunks
+
+
+def _term_weights(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    tokens = [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+    if not tokens:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    hashes = np.fromiter(
+        (zlib.crc32(t.encode()) for t in tokens), dtype=np.uint32, count=len(tokens)
+    )
+    buckets, counts = np.unique(hashes % VECTOR_DIM, return_counts=True)
+    # Sublinear tf: a term repeated 10x is not 10x as relevant
+    return buckets.astype(np.int64), (1.0 + np.log(counts)).astype(np.float32)
+
+
+def encode_vector(text: str) -> bytes:
+    """Sparse term-frequency vector of ``text``, L2-normalized, as bytes."""
+    buckets, weights = _term_weights(text)
+    norm = np.linalg.norm(weights)
+    sparse = np.empty(len(buckets), dtype=_SPARSE_DTYPE)
+    sparse["index"] = buckets
+    sparse["weight"] = weights / norm if norm else weights
+    return sparse.tobytes()
+
+
+def _concatenate(vectors: Sequence[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    """The stored vectors as one sparse array plus each entry's row."""
+    sparse = np.frombuffer(b"".join(vectors), dtype=_SPARSE_DTYPE)
+    lengths = [len(blob) // _SPARSE_DTYPE.itemsize for blob in vectors]
+    rows = np.repeat(np.arange(len(vectors), dtype=np.int32), lengths)
+    return sparse, rows
+
+
+class ChunkIndex:
+    """
+    In-memory index over one document's chunks.
+    """
+
+    def __init__(self, text: str, chunks: Sequence[Chunk], vectors: Sequence[bytes]):
+        self.text = text
+        self.spans = np.array([(c.start, c.end) for c in chunks], dtype=np.int64)
+        self.pages = np.array(
+            [(c.page_start, c.page_end) for c in chunks], dtype=np.int32
+        ).reshape(-1, 2)
+        sparse, rows = _concatenate(vectors)
+        self.indices = sparse["index"].astype(np.uint16)
+        # Smoothed IDF over this document's chunks; a bucket occurs at most
+        # once per chunk, so its count is its document frequency
+        document_frequency = np.bincount(self.indices, minlength=VECTOR_DIM)
+        self.idf = (
+            np.log((1 + len(chunks)) / (1 + document_frequency)) + 1
+        ).astype(np.float32)
+        values = sparse["weight"].astype(np.float32) * self.idf[self.indices]
+        norms = np.sqrt(np.bincount(rows, weights=values**2, minlength=len(chunks)))
+        norms[norms == 0] = 1.0
+        self.values = (values / norms[rows]).astype(np.float32)
+        self.indptr = np.zeros(len(chunks) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(chunks)), out=self.indptr[1:])
+
+    @classmethod
+    def build(cls, pages: Sequence[str], max_tokens: int) -> "ChunkIndex":
+        """Chunks and vectorizes a document that is not persisted."""
+        text = "\n".join(page for page in pages if page)
+        chunks = chunk_pages(pages, max_tokens)
+        vectors = [encode_vector(text[c.start:c.end]) for c in chunks]
+        return cls(text, chunks, vectors)
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the index, including the text."""
+        arrays = (
+            self.spans, self.pages, self.idf, self.indices, self.values, self.indptr
+        )
+        return sys.getsizeof(self.text) + sum(a.nbytes for a in arrays)
+
+    def _scores(self, query: str) -> np.ndarray:
+        """Cosine similarity of every chunk to ``query`` (up to a constant)."""
+        buckets, weights = _term_weights(query)
+        q = np.zeros(VECTOR_DIM, dtype=np.float32)
+        q[buckets] = weights * self.idf[buckets]
+        # Scatter-add each chunk's products; the appended zero lets reduceat
+        # start a segment at the very end, and empty chunks score zero
+        products = np.append(self.values * q[self.indices], np.float32(0))
+        starts = self.indptr[:-1]
+        scores = np.add.reduceat(products, starts)
+        scores[starts == self.indptr[1:]] = 0
+        return scores
+
+    def chunk_text(self, i: int) -> str:
+        start, end = self.spans[i]
+        return self.text[start:end]
+
+    def search(
+        self,
+        query: Optional[str],
+        k: int,
+        page_range: Optional[Tuple[int, int]] = None,
+    ) -> List[int]:
+        """
+        Returns the indices of the ``k`` chunks most similar to ``query``, in
+        document order.
+
+        ``page_range`` (inclusive, 1-based) restricts the candidates to chunks
+        that overlap those pages. Without a query, every chunk in the range is
+        returned.
+        """
+        candidates = np.arange(len(self))
+        if page_range is not None:
+            first, last = page_range
+            overlaps = (self.pages[:, 1] >= first) & (self.pages[:, 0] <= last)
+            candidates = candidates[overlaps]
+        if not query or len(candidates) <= k:
+            return candidates.tolist()
+
+        scores = self._scores(query)[candidates]
+        top = np.argpartition(-scores, k - 1)[:k]
+        return np.sort(candidates[top]).tolist()
+
+    def select(
+        self,
+        query: Optional[str],
+        k: int,
+        page_range: Optional[Tuple[int, int]] = None,
+    ) -> str:
+        """The text of :meth:`search` results, joined in document order."""
+        return "\n\n".join(
+            self.chunk_text(i) for i in self.search(query, k, page_range)
+        )
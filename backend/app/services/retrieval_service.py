@@ -0,0 +1,194 @@
+"""
+Selects the parts of a document that an AI prompt actually needs.
+
+Extracted documents are chunked and vectorized once, at ingest. A quiz or
+summary request can then name a focus topic and/or a page range, and only
+the top-k matching chunks are sent to the model instead of the whole text.
+"""
+import asyncio
+import logging
+from typing import List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.features.extraction.crud import (
+    create_document_chunks,
+    get_document_chunks,
+    get_document_pages,
+    user_owns_document,
+)
+from app.api.v1.features.extraction.models import ExtractionDocument
+from app.core.config import settings
+from app.core.database import ReadSessionLocal
+from app.core.errors import APIError
+from app.schemas.ai import RetrievalOptions
+from app.services.cache_service import TTLCache, track_cache
+from app.services.retrieval_index import Chunk, ChunkIndex, chunk_pages, encode_vector
+
+logger = logging.getLogger(__name__)
+
+# Documents never change once stored, so indexes only leave the cache by LRU
+_INDEX_TTL_SECONDS = 24 * 3600
+
+
+def _vectorize(pages: Sequence[str]) -> Tuple[List[Chunk], List[bytes]]:
+    text = "\n".join(page for page in pages if page)
+    chunks = chunk_pages(pages, settings.RETRIEVAL_CHUNK_TOKENS)
+    return chunks, [encode_vector(text[c.start:c.end]) for c in chunks]
+
+
+class RetrievalService:
+    def __init__(self):
+        self._indexes = TTLCache(
+            settings.RETRIEVAL_INDEX_CACHE_SIZE,
+            _INDEX_TTL_SECONDS,
+            max_bytes=settings.RETRIEVAL_INDEX_CACHE_MAX_MB * 1024 * 1024,
+            sizeof=lambda entry: entry[0].nbytes,
+        )
+        track_cache("retrieval_index", self._indexes)
+
+    async def index_document(
+        self, db: AsyncSession, document: ExtractionDocument, pages: Sequence[str]
+    ) -> None:
+        """
+        Chunks and stores vectors for a newly extracted document.
+
+        Failures are logged, not raised: the upload itself has succeeded, and
+        documents without stored chunks are indexed in memory on demand.
+        """
+        try:
+            chunks, vectors = await asyncio.to_thread(_vectorize, pages)
+            await create_document_chunks(db, document.id, chunks, vectors)
+        except Exception as e:
+            await db.rollback()
+            logger.warning(f"Indexing document {document.id} failed: {e}")
+
+    async def _check_owner(
+        self, db: AsyncSession, document_id: UUID, user_id: UUID
+    ) -> None:
+        if not await user_owns_document(db, document_id, user_id):
+            raise APIError(
+                code="DOCUMENT_NOT_FOUND",
+                message="Document not found",
+                status_code=404,
+            )
+
+    async def check_access(self, document_id: UUID, user_id: UUID) -> None:
+        """Raises DOCUMENT_NOT_FOUND unless ``user_id`` owns the document."""
+        async with ReadSessionLocal() as db:
+            await self._check_owner(db, document_id, user_id)
+
+    async def get_document_text(self, document_id: UUID, user_id: UUID) -> str:
+        async with ReadSessionLocal() as db:
+            await self._check_owner(db, document_id, user_id)
+            document = await db.get(ExtractionDocument, document_id)
+        return document.content
+
+    async def get_page_text(
+        self, document_id: UUID, user_id: UUID, page_range: Tuple[int, int]
+    ) -> Optional[str]:
+        """
+        Text of a page range read from per-page rows, or None if there are none.
+        """
+        async with ReadSessionLocal() as db:
+            await self._check_owner(db, document_id, user_id)
+            pages = await get_document_pages(db, document_id, *page_range)
+        if not pages:
+            return None
+        return "\n".join(page.text for page in pages if page.text)
+
+    async def get_index(
+        self, document_id: UUID, user_id: UUID
+    ) -> Tuple[ChunkIndex, bool]:
+        """
+        Loads the index of a document owned by ``user_id``.
+
+        Returns:
+            The index and whether it has page numbers (documents stored before
+            chunking existed are indexed from their text alone).
+        """
+        async with ReadSessionLocal() as db:
+            await self._check_owner(db, document_id, user_id)
+            cached = self._indexes.get(str(document_id))
+            if cached is not None:
+                return cached
+            document = await db.get(ExtractionDocument, document_id)
+            rows = await get_document_chunks(db, document_id)
+
+        if rows:
+            chunks = [
+                Chunk(r.char_start, r.char_end, r.page_start, r.page_end) for r in rows
+            ]
+            vectors = [r.vector for r in rows]
+            index = await asyncio.to_thread(
+                ChunkIndex, document.content, chunks, vectors
+            )
+        else:
+            index = await asyncio.to_thread(
+                ChunkIndex.build, [document.content], settings.RETRIEVAL_CHUNK_TOKENS
+            )
+        entry = (index, bool(rows))
+        self._indexes.set(str(document_id), entry)
+        return entry
+
+    async def select_context(
+        self,
+        user_id: UUID,
+        content: Optional[str] = None,
+        document_id: Optional[UUID] = None,
+        focus: Optional[str] = None,
+        page_range: Optional[Tuple[int, int]] = None,
+        top_k: Optional[int] = None,
+    ) -> str:
+        """
+        Returns the text to send to the model.
+
+        Without a focus this is the whole content or document, or just the
+        pages in ``page_range``. With a focus it is the ``top_k`` chunks that
+        best match it (within ``page_range``), in document order.
+        """
+        top_k = top_k or settings.RETRIEVAL_TOP_K
+        if document_id is None:
+            if not focus:
+                return content
+            index = await asyncio.to_thread(
+                ChunkIndex.build, [content], settings.RETRIEVAL_CHUNK_TOKENS
+            )
+            return index.select(focus, top_k)
+
+        if not focus:
+            if page_range is None:
+                return await self.get_document_text(document_id, user_id)
+            text = await self.get_page_text(document_id, user_id, page_range)
+            if text:
+                return text
+        index, paged = await self.get_index(document_id, user_id)
+        if page_range is not None and not paged:
+            raise APIError(
+                code="PAGE_RANGE_UNAVAILABLE",
+                message="This document has no page index; use focus instead",
+                status_code=400,
+            )
+        selected = index.select(focus, top_k, page_range)
+        if not selected:
+            raise APIError(
+                code="EMPTY_SELECTION",
+                message="No document text in the requested pages",
+                status_code=400,
+            )
+        return selected
+
+    async def select_for(self, options: RetrievalOptions, user_id: UUID) -> str:
+        """``select_context`` for the source fields of a generation request."""
+        return await self.select_context(
+            user_id,
+            content=options.content,
+            document_id=options.document_id,
+            focus=options.focus,
+            page_range=options.page_range,
+            top_k=options.top_k,
+        )
+
+
+retrieval_service = RetrievalService()
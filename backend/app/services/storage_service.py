@@ -1,26 +1,63 @@
-from app.db.supabase_client import supabase
+import asyncio
+import logging
 import uuid
+from typing import Optional, Union
+
+from app.db.supabase_client import supabase
+
+logger = logging.getLogger(__name__)
 
 class StorageService:
     BUCKET_NAME = "uploads"
 
-    async def upload_file(self, file_content: bytes, filename: str, content_type: str) -> str:
-        # If no client, return mock URL
-        if not supabase.client:
+    def new_path(self, filename: str) -> str:
+        return f"{uuid.uuid4()}/{filename}"
+
+    async def upload_file(
+        self,
+        file_content: Union[bytes, str],
+        filename: str,
+        content_type: str,
+        path: Optional[str] = None,
+    ) -> str:
+        # file_content is either raw bytes or a path to a spooled file on disk.
+        # supabase-py is synchronous, so the upload runs in a worker thread
+        path = path or self.new_path(filename)
+        return await asyncio.to_thread(
+            self._upload_sync, file_content, filename, content_type, path
+        )
+
+    def _upload_sync(
+        self,
+        file_content: Union[bytes, str],
+        filename: str,
+        content_type: str,
+        path: str,
+    ) -> str:
+        # If storage is not configured, return mock URL
+        if not supabase.configured:
            return f"https://mock-storage.com/{uuid.uuid4()}/{filename}"
 
-        path = f"{uuid.uuid4()}/{filename}"
         try:
-             # Sync call in async wrapper potentially needed with run_in_executor if blocking
-             # supabase-py is sync by default unless using async client. keeping simple for MVP.
              supabase.client.storage.from_(self.BUCKET_NAME).upload(
                  path=path,
                  file=file_content,
                  file_options={"content-type": content_type}
              )
              return supabase.client.storage.from_(self.BUCKET_NAME).get_public_url(path)
-        except Exception as e:
+        except Exception:
             # Fallback for dev without configured storage
             return f"https://mock-storage-error/{filename}"
 
+    async def delete_file(self, path: str) -> None:
+        """Removes an uploaded object; failures are logged, not raised."""
+        try:
+            await asyncio.to_thread(self._delete_sync, path)
+        except Exception as e:
+            logger.warning(f"Failed to delete uploaded file {path}: {e}")
+
+    def _delete_sync(self, path: str) -> None:
+        if supabase.configured:
+            supabase.client.storage.from_(self.BUCKET_NAME).remove([path])
+
 storage_service = StorageService()
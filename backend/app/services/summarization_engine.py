@@ -0,0 +1,229 @@
+"""
+Map-reduce summarization for documents larger than one prompt.
+
+The text is cut into token-budgeted chunks that are summarized concurrently
+(map). Partial summaries are then grouped, as many per prompt as the budget
+allows, and summarized again level by level until one remains (reduce). The
+number of sequential model round trips grows with log(chunks), and no single
+prompt exceeds the chunk budget.
+"""
+import asyncio
+import json
+import logging
+import re
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.text_chunker import CHARS_PER_TOKEN, chunk_text, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# (prompt, max_output_tokens) -> response text
+GenerateFn = Callable[[str, int], Awaitable[str]]
+
+_JSON_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+MAP_PROMPT = (
+    "You are summarizing part {index} of {total} of a longer study document.\n"
+    "Summarize this part in at most {words} words. Respond with JSON only: "
+    '{{"summary": str, "key_points": [str], "topics": [str]}}.\n\n{content}'
+)
+
+REDUCE_PROMPT = (
+    "Combine these partial summaries of consecutive sections of one study "
+    "document into a single summary of at most {words} words. Respond with "
+    'JSON only: {{"summary": str, "key_points": [str], "topics": [str]}}.\n\n'
+    "{content}"
+)
+
+FINAL_PROMPT = (
+    "Summarize the following content in '{style}' style. Respond with JSON "
+    'only: {{"summary": str, "key_points": [str], "topics": [str]}}.\n\n{content}'
+)
+
+# Streamed output is shown to the user as it arrives, so it is plain text
+# with labelled sections rather than JSON
+STREAM_FINAL_PROMPT = (
+    "Summarize the following content in '{style}' style. Write the summary as "
+    "prose first. Then write a line 'KEY POINTS:' followed by one '- ' bullet "
+    "per key point, and finally a line 'TOPICS:' followed by a comma-separated "
+    "list of topics.\n\n{content}"
+)
+
+_KEY_POINTS_HEADER = re.compile(
+    r"^\s*\**key points:?\**\s*$", re.IGNORECASE | re.MULTILINE
+)
+_TOPICS_HEADER = re.compile(r"^\s*\**topics:?\**", re.IGNORECASE | re.MULTILINE)
+
+
+def parse_summary_json(text: str) -> Dict[str, List[str]]:
+    """
+    Parses the model's JSON answer, falling back to treating it as plain text.
+    """
+    try:
+        data = json.loads(_JSON_FENCE.sub("", text.strip()))
+        if isinstance(data, dict) and isinstance(data.get("summary"), str):
+            return {
+                "summary": data["summary"],
+                "key_points": [str(p) for p in data.get("key_points") or []],
+                "topics": [str(t) for t in data.get("topics") or []],
+            }
+    except ValueError:
+        pass
+    return {"summary": text.strip(), "key_points": [], "topics": []}
+
+
+def parse_sectioned_summary(text: str) -> Dict[str, List[str]]:
+    """
+    Parses output of STREAM_FINAL_PROMPT into summary, key points and topics.
+    """
+    topics: List[str] = []
+    topics_match = _TOPICS_HEADER.search(text)
+    if topics_match:
+        topics = [
+            t.strip(" .*")
+            for t in text[topics_match.end():].replace("\n", ",").split(",")
+            if t.strip(" .*")
+        ]
+        text = text[: topics_match.start()]
+
+    key_points: List[str] = []
+    points_match = _KEY_POINTS_HEADER.search(text)
+    if points_match:
+        key_points = [
+            line.strip().lstrip("-*• ").strip()
+            for line in text[points_match.end():].splitlines()
+            if line.strip().lstrip("-*• ").strip()
+        ]
+        text = text[: points_match.start()]
+
+    return {"summary": text.strip(), "key_points": key_points, "topics": topics}
+
+
+def _format_partial(index: int, partial: Dict[str, List[str]]) -> str:
+    points = "\n".join(f"- {p}" for p in partial["key_points"])
+    return f"Section {index}:\n{partial['summary']}\n{points}".strip()
+
+
+class MapReduceSummarizer:
+    def __init__(
+        self,
+        generate: GenerateFn,
+        chunk_tokens: Optional[int] = None,
+        partial_max_tokens: Optional[int] = None,
+        max_parallel: Optional[int] = None,
+    ):
+        self.generate = generate
+        self.chunk_tokens = chunk_tokens or settings.SUMMARY_CHUNK_TOKENS
+        self.partial_max_tokens = (
+            partial_max_tokens or settings.SUMMARY_PARTIAL_MAX_TOKENS
+        )
+        self.max_parallel = max_parallel or settings.SUMMARY_MAX_PARALLEL
+
+    async def summarize(
+        self, content: str, style: str, chunks: Optional[List[str]] = None
+    ) -> dict:
+        """
+        Returns ``summary``, ``key_points``, ``topics`` and ``word_count``.
+
+        ``chunks`` may be passed when the caller has already chunked the text
+        with the same budget.
+        """
+        condensed = await self.condense(content, chunks)
+        result = await self._final(condensed, style)
+        result["word_count"] = len(result["summary"].split())
+        return result
+
+    async def condense(self, content: str, chunks: Optional[List[str]] = None) -> str:
+        """
+        Runs the map and reduce levels until the input fits a single prompt.
+
+        Content that already fits is returned unchanged. The result is the
+        input for the final, style-specific summary call, which callers may
+        issue themselves (e.g. as a streamed call).
+        """
+        if chunks is None:
+            chunks = chunk_text(content, self.chunk_tokens)
+        if len(chunks) <= 1:
+            return content
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        partials = await asyncio.gather(
+            *(
+                self._map(semaphore, i, len(chunks), chunk)
+                for i, chunk in enumerate(chunks, 1)
+            )
+        )
+        return await self._reduce(semaphore, partials)
+
+    async def _map(
+        self, semaphore: asyncio.Semaphore, index: int, total: int, chunk: str
+    ) -> Dict[str, List[str]]:
+        prompt = MAP_PROMPT.format(
+            index=index, total=total, words=self._partial_words, content=chunk
+        )
+        async with semaphore:
+            text = await self.generate(prompt, self.partial_max_tokens)
+        return parse_summary_json(text)
+
+    async def _reduce(
+        self,
+        semaphore: asyncio.Semaphore,
+        partials: List[Dict[str, List[str]]],
+    ) -> str:
+        level = 0
+        while True:
+            sections = [_format_partial(i, p) for i, p in enumerate(partials, 1)]
+            groups = self._group(sections)
+            logger.debug(
+                "Summary reduce level %d: %d partials in %d groups",
+                level, len(partials), len(groups),
+            )
+            if len(groups) == 1:
+                return "\n\n".join(groups[0])
+
+            async def combine(group: List[str]) -> Dict[str, List[str]]:
+                prompt = REDUCE_PROMPT.format(
+                    words=self._partial_words, content="\n\n".join(group)
+                )
+                async with semaphore:
+                    text = await self.generate(prompt, self.partial_max_tokens)
+                return parse_summary_json(text)
+
+            partials = await asyncio.gather(*(combine(g) for g in groups))
+            level += 1
+
+    def _group(self, sections: List[str]) -> List[List[str]]:
+        """
+        Packs consecutive sections into groups that fit one prompt's budget.
+
+        Groups hold at least two sections (except possibly the last), so each
+        level shrinks the input; a section larger than half the budget is
+        truncated so any two sections always fit together.
+        """
+        half_budget_chars = self.chunk_tokens * CHARS_PER_TOKEN // 2
+        groups: List[List[str]] = []
+        current: List[str] = []
+        tokens = 0
+        for section in sections:
+            section = section[:half_budget_chars]
+            section_tokens = estimate_tokens(section)
+            if len(current) >= 2 and tokens + section_tokens > self.chunk_tokens:
+                groups.append(current)
+                current, tokens = [], 0
+            current.append(section)
+            tokens += section_tokens
+        if len(current) == 1 and groups and len(groups[-1]) > 2:
+            # Pair a trailing single section with the previous group's last one
+            current.insert(0, groups[-1].pop())
+        if current:
+            groups.append(current)
+        return groups
+
+    async def _final(self, content: str, style: str) -> Dict[str, List[str]]:
+        prompt = FINAL_PROMPT.format(style=style, content=content)
+        return parse_summary_json(await self.generate(prompt, None))
+
+    @property
+    def _partial_words(self) -> int:
+        # Roughly 0.75 words per token, with headroom for the JSON wrapping
+        return int(self.partial_max_tokens * 0.6)
@@ -0,0 +1,74 @@
+"""
+Token-budgeted, paragraph-aware text chunking.
+
+Token counts are estimated (about four characters per token for English),
+which is accurate enough to keep every prompt well inside the model's
+context window without a tokenizer round trip.
+"""
+import re
+from typing import List
+
+CHARS_PER_TOKEN = 4
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _split_oversize(paragraph: str, max_chars: int) -> List[str]:
+    """Splits one paragraph that exceeds the budget on sentence boundaries."""
+    pieces: List[str] = []
+    current = ""
+    for sentence in _SENTENCE_END.split(paragraph):
+        # A single run-on "sentence" longer than the budget is hard-split
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_text(text: str, max_tokens: int) -> List[str]:
+    """
+    Packs paragraphs greedily into chunks of at most ``max_tokens`` tokens.
+
+    Paragraph boundaries are kept whenever possible; only paragraphs larger
+    than the budget are split, first by sentence and then by length.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks: List[str] = []
+    current: List[str] = []
+    current_len = 0
+
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        pieces = (
+            _split_oversize(paragraph, max_chars)
+            if len(paragraph) > max_chars
+            else [paragraph]
+        )
+        for piece in pieces:
+            # +2 for the blank line that rejoins paragraphs within a chunk
+            if current and current_len + 2 + len(piece) > max_chars:
+                chunks.append("\n\n".join(current))
+                current, current_len = [], 0
+            current.append(piece)
+            current_len += len(piece) + (2 if current_len else 0)
+
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
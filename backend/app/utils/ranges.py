@@ -0,0 +1,55 @@
+"""
+Byte ranges for partial responses (RFC 9110, single ranges only).
+"""
+from typing import Optional, Tuple
+
+
+class RangeNotSatisfiable(ValueError):
+    """The requested range starts beyond the end of the representation."""
+
+
+def parse_range_header(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parses a ``Range: bytes=...`` header into a ``(start, end)`` slice.
+
+    ``end`` is exclusive and clamped to ``size``. Returns None for headers a
+    server may ignore (other units, several ranges, malformed), in which case
+    the whole representation is sent.
+
+    Raises:
+        RangeNotSatisfiable: If the range selects no bytes at all.
+    """
+    unit, _, spec = header.strip().partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = (part.strip() for part in spec.partition("-"))
+    if not dash or not (first or last):
+        return None
+    if (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        return max(0, size - suffix), size
+    start = int(first)
+    end = int(last) + 1 if last else size
+    if last and end <= start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    return start, min(end, size)
+
+
+def offset_range(offset: int, length: Optional[int], size: int) -> Tuple[int, int]:
+    """
+    The ``(start, end)`` slice for ``offset``/``length`` query parameters.
+
+    Raises:
+        RangeNotSatisfiable: If ``offset`` is at or past the end.
+    """
+    if offset >= size:
+        raise RangeNotSatisfiable(f"offset {offset}")
+    end = size if length is None else min(size, offset + length)
+    return offset, end
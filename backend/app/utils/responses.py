@@ -0,0 +1,45 @@
+"""
+Fast JSON responses.
+
+The app renders ordinary responses with orjson (``ORJSONResponse`` is the
+default response class). Routes that return large documents use
+``ModelResponse`` instead: the already-validated model is serialized
+straight to JSON bytes by pydantic's serializer, and FastAPI sends a
+returned ``Response`` as-is. That skips the ``response_model`` round trip
+(dump to a dict, validate it again, convert it to JSON-compatible values,
+encode), each step of which walks the multi-megabyte document text.
+
+Declare ``response_model`` on such routes anyway: it still documents the
+response in the OpenAPI schema.
+"""
+from typing import Mapping, Optional, Union
+
+import pydantic_core
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+
+
+class ModelResponse(Response):
+    """
+    JSON response from a pydantic model, or from bytes that already hold JSON.
+
+    Models are serialized as ``response_model`` would (by alias, unset fields
+    included). Pass bytes for a body that was serialized earlier.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Union[BaseModel, bytes],
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        background: Optional[BackgroundTask] = None,
+    ):
+        super().__init__(content, status_code, headers, background=background)
+
+    def render(self, content: Union[BaseModel, bytes]) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return pydantic_core.to_json(content, by_alias=True)
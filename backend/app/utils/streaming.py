@@ -0,0 +1,37 @@
+import json
+from typing import Any, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+# Headers that stop proxies (nginx in particular) from buffering the stream
+STREAMING_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def ndjson_line(payload: Any) -> bytes:
+    return (json.dumps(jsonable_encoder(payload)) + "\n").encode("utf-8")
+
+
+def sse_event(payload: Any, event: Optional[str] = None) -> bytes:
+    message = ""
+    if event:
+        message += f"event: {event}\n"
+    message += f"data: {json.dumps(jsonable_encoder(payload))}\n\n"
+    return message.encode("utf-8")
+
+
+def stream_frame(payload: dict, stream_format: str) -> bytes:
+    """
+    Encodes one stream message as an NDJSON line or an SSE event.
+
+    For SSE the payload's ``type`` field doubles as the event name.
+    """
+    if stream_format == "sse":
+        return sse_event(payload, event=payload.get("type"))
+    return ndjson_line(payload)
+
+
+def stream_media_type(stream_format: str) -> str:
+    return SSE_MEDIA_TYPE if stream_format == "sse" else NDJSON_MEDIA_TYPE
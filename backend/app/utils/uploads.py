@@ -0,0 +1,75 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import UploadFile
+
+from app.core.config import settings
+from app.utils.validators import validate_file_size
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
+
+@dataclass
+class SpooledUpload:
+    """
+    An uploaded file copied to a named temp file on disk.
+
+    Extractors and storage clients read from ``path`` so the upload is never
+    held in memory as a single bytes object. ``sha256`` is the hex digest of
+    the file bytes, computed while spooling.
+    """
+    path: str
+    filename: Optional[str]
+    content_type: Optional[str]
+    size: int
+    sha256: str
+
+    def cleanup(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+async def spool_upload(
+    file: UploadFile, max_size_mb: Optional[int] = None
+) -> SpooledUpload:
+    """
+    Streams an UploadFile into a temp file chunk by chunk.
+
+    The size limit is enforced while copying, so an oversize file is rejected
+    as soon as it crosses the limit. The caller owns the returned temp file
+    and must call ``cleanup()`` when done.
+
+    Raises:
+        APIError: FILE_TOO_LARGE if the upload exceeds ``max_size_mb``.
+    """
+    max_size_mb = max_size_mb or settings.MAX_UPLOAD_SIZE_MB
+    suffix = os.path.splitext(file.filename or "")[1]
+    fd, path = tempfile.mkstemp(prefix="upload-", suffix=suffix)
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                validate_file_size(size, max_size_mb)
+                digest.update(chunk)
+                await asyncio.to_thread(out.write, chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    finally:
+        await file.seek(0)
+
+    return SpooledUpload(
+        path=path,
+        filename=file.filename,
+        content_type=file.content_type,
+        size=size,
+        sha256=digest.hexdigest(),
+    )
@@ -0,0 +1,27 @@
+"""
+Standalone job worker: ``python -m app.worker``.
+
+Runs the AI job worker pool without the HTTP server, so generation capacity
+can be scaled separately from the API. Set ``JOB_WORKER_CONCURRENCY=0`` on
+the API processes to leave all jobs to dedicated workers.
+"""
+import asyncio
+import logging
+
+from app.core.logging import setup_logging
+from app.services.ai_jobs import ai_job_workers
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    ai_job_workers.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await ai_job_workers.stop()
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(main())
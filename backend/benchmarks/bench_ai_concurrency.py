@@ -0,0 +1,109 @@
+"""
+Shows that AI calls no longer stall the event loop.
+
+Drives the real ASGI app with a stubbed Gemini model that blocks for
+``--delay`` seconds per call. While ``--concurrency`` distinct summarize
+requests are in flight, ``/health`` is polled every 50 ms. With the old
+inline ``generate_content`` call the loop is frozen for each model call, so
+health checks stall (large ``health_max_gap_ms``); through GeminiClient
+they keep completing on schedule.
+
+Usage (from backend/):
+    python -m benchmarks.bench_ai_concurrency --delay 1.0 --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from types import SimpleNamespace
+
+# Keep the benchmark self-contained: no Postgres-backed cache tier
+os.environ.setdefault("AI_CACHE_ENABLED", "false")
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.services.gemini_client import GeminiClient  # noqa: E402
+from app.services.gemini_service import gemini_service  # noqa: E402
+
+
+class SlowStubModel:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def generate_content(self, prompt):
+        time.sleep(self.delay)
+        return SimpleNamespace(text="stub summary " * 20)
+
+
+class InlineClient:
+    """The pre-GeminiClient behaviour: the blocking call runs on the loop."""
+
+    def __init__(self, model):
+        self.model = model
+
+    async def generate(self, prompt, **kwargs):
+        return self.model.generate_content(prompt, **kwargs)
+
+
+async def run(client_impl, concurrency: int, delay: float) -> dict:
+    model = SlowStubModel(delay)
+    gemini_service.model = model
+    gemini_service.client = client_impl(model)
+
+    health_latencies = []
+    completions = []
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as c:
+
+        async def summarize(i: int):
+            content = f"Distinct study notes number {i}. " * 10
+            body = {"content": content, "style": "brief"}
+            await c.post("/api/v1/ai/summarize", json=body)
+
+        async def poll_health(stop: asyncio.Event):
+            while not stop.is_set():
+                started = time.perf_counter()
+                await c.get("/health")
+                health_latencies.append((time.perf_counter() - started) * 1000)
+                completions.append(time.perf_counter())
+                await asyncio.sleep(0.05)
+
+        stop = asyncio.Event()
+        poller = asyncio.create_task(poll_health(stop))
+        started = time.perf_counter()
+        completions.append(started)
+        await asyncio.gather(*(summarize(i) for i in range(concurrency)))
+        wall = time.perf_counter() - started
+        completions.append(time.perf_counter())
+        stop.set()
+        await poller
+
+    return {
+        "ai_wall_s": round(wall, 3),
+        "health_checks": len(health_latencies),
+        "health_p50_ms": round(statistics.median(health_latencies), 2),
+        "health_max_ms": round(max(health_latencies), 2),
+        "health_max_gap_ms": round(
+            max(b - a for a, b in zip(completions, completions[1:])) * 1000, 2
+        ),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--delay", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    results = {
+        "inline_blocking": await run(InlineClient, args.concurrency, args.delay),
+        "gemini_client": await run(GeminiClient, args.concurrency, args.delay),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""
+Measures cold start: importing ``app.main`` and process start to first
+healthy ``/health``.
+
+Each run is a fresh interpreter, so nothing is cached in-process. The
+time-to-healthy run starts uvicorn and polls ``/health`` every 10 ms until it
+answers 200. Heavy clients (Gemini SDK, Supabase, DB engine, PDF libraries)
+are built lazily or warmed after startup, so neither number includes them.
+
+Usage (from backend/):
+    python -m benchmarks.bench_cold_start --runs 5
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def import_time() -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def time_to_healthy(timeout: float = 30.0) -> float:
+    port = free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--port", str(port), "--log-level", "warning",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client() as client:
+            while time.perf_counter() - started < timeout:
+                if proc.poll() is not None:
+                    raise RuntimeError("uvicorn exited before becoming healthy")
+                try:
+                    if client.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                        return time.perf_counter() - started
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+        raise TimeoutError("server did not become healthy")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def summarize(samples) -> dict:
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    # The server must not try to reach Postgres or Gemini while warming up
+    os.environ.setdefault("AI_CACHE_ENABLED", "false")
+    os.environ.setdefault("JOB_WORKER_CONCURRENCY", "0")
+
+    imports = [import_time() for _ in range(args.runs)]
+    healthy = [time_to_healthy() for _ in range(args.runs)]
+    print(json.dumps(
+        {
+            "runs": args.runs,
+            "import_app_main": summarize(imports),
+            "start_to_healthy": summarize(healthy),
+        },
+        indent=2,
+    ))
+
+
+if __name__ == "__main__":
+    main()
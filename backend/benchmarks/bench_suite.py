@@ -0,0 +1,408 @@
+"""
+Benchmark suite for ingestion and AI endpoints on synthetic corpora.
+
+Scenarios:
+
+* ``extraction``: ``pdf_engine.extract_document`` on synthetic PDFs of each
+  kind and size. Reports pages/sec and the share of pages that took the
+  fast path. Peak memory is measured in a second, inline pass under
+  ``tracemalloc`` so the timed pass is not slowed down by tracing.
+* ``upload``: ``POST /api/v1/extraction/upload`` end to end through the
+  ASGI app, so it includes spooling, extraction, persistence and indexing.
+  Each repeat uploads different bytes to avoid the dedup fast path.
+* ``sessions``: ``POST /api/v1/sessions`` with a PDF end to end.
+* ``ai``: ``/ai/summarize``, ``/ai/quiz`` and ``/ai/study-pack`` against a
+  stub model that answers instantly, i.e. the app's own per-request
+  overhead.
+* ``serialization``: the upload response (``SuccessResponse[ExtractionData]``
+  with one document's text) sent through FastAPI's ``response_model`` path
+  and through ``ModelResponse``, for each document size. Needs no database,
+  unlike ``upload``, whose numbers include the same response.
+
+HTTP scenarios report wall-clock latency and the process CPU time per
+request.
+
+``upload`` and ``sessions`` need Postgres (e.g. ``docker compose up db``);
+they are reported as skipped when it cannot be reached. Results are written
+as JSON. With ``--baseline`` every metric is compared against an earlier
+results file, and the run exits with status 1 if any regressed by more than
+``--tolerance``.
+
+Usage (from backend/):
+    python -m benchmarks.bench_suite --output bench.json
+    python -m benchmarks.bench_suite --sizes 10 100 --scenarios extraction ai \\
+        --baseline bench.json --output bench-new.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+from uuid import uuid4
+
+# Results must not come from the AI cache, and no job workers should run
+os.environ.setdefault("AI_CACHE_ENABLED", "false")
+os.environ.setdefault("JOB_WORKER_CONCURRENCY", "0")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.api.v1.features.extraction.schemas import (  # noqa: E402
+    ExtractionData,
+    ExtractionMetadata,
+)
+from app.core.database import engine  # noqa: E402
+from app.core.schemas.responses import MetaData, SuccessResponse  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.gemini_client import GeminiClient  # noqa: E402
+from app.services.gemini_service import gemini_service  # noqa: E402
+from app.services.pdf_engine import PDFExtractionEngine, pdf_engine  # noqa: E402
+from app.services.rate_limiter import RateLimiter  # noqa: E402
+from app.utils.responses import ModelResponse  # noqa: E402
+from benchmarks.synthetic_pdfs import KINDS, make_pdf  # noqa: E402
+
+SCENARIOS = ("extraction", "upload", "sessions", "ai", "serialization")
+DEFAULT_SIZES = (10, 100, 1000)
+
+# Metric name suffix -> True when higher is better
+_DIRECTIONS = {"_per_sec": True, "_ratio": True, "_ms": False, "_mb": False}
+
+
+def latency_stats(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return {
+        "median_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(p95 * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+class StubModel:
+    """Answers every prompt instantly with a valid summary payload."""
+
+    def generate_content(self, prompt, **kwargs):
+        return SimpleNamespace(
+            text=json.dumps(
+                {"summary": "Stub summary.", "key_points": ["a", "b"], "topics": ["t"]}
+            )
+        )
+
+
+async def database_available() -> Optional[str]:
+    """None if Postgres answers, otherwise the reason it does not."""
+    try:
+        async with engine.connect() as conn:
+            await asyncio.wait_for(conn.execute(text("SELECT 1")), timeout=5)
+    except Exception as e:
+        return f"database unavailable: {type(e).__name__}: {e}"
+    return None
+
+
+async def bench_extraction(corpus: Dict[str, str], args) -> Dict[str, Any]:
+    results = {}
+    for name, path in corpus.items():
+        pages, report = await pdf_engine.extract_document(path)
+        seconds = report.total_seconds
+
+        # Inline so every allocation happens in this (traced) process
+        tracemalloc.start()
+        await PDFExtractionEngine(max_workers=1).extract_document(path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[name] = {
+            "pages": len(pages),
+            "total_ms": round(seconds * 1000, 1),
+            "pages_per_sec": round(len(pages) / seconds, 1),
+            "fast_page_ratio": round(report.fast_pages / max(1, report.page_count), 3),
+            "peak_traced_mb": round(peak / 2**20, 1),
+        }
+    return results
+
+
+async def _post_repeatedly(
+    client: AsyncClient, repeats: int, request: Callable[[str], Any]
+) -> Dict[str, Any]:
+    samples = []
+    cpu = 0.0
+    for _ in range(repeats):
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        response = await request(uuid.uuid4().hex)
+        cpu += time.process_time() - cpu_started
+        elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            return {"error": f"HTTP {response.status_code}: {response.text[:200]}"}
+        samples.append(elapsed)
+    # Includes worker threads, not the extraction process pool
+    cpu_ms = round(cpu / repeats * 1000, 2)
+    return {**latency_stats(samples), "cpu_per_request_ms": cpu_ms}
+
+
+async def bench_upload(client: AsyncClient, args) -> Dict[str, Any]:
+    results = {}
+    for kind in args.kinds:
+        for pages in args.sizes:
+            async def upload(salt: str):
+                pdf = make_pdf(kind, pages, salt=salt)
+                files = {"file": (f"{kind}.pdf", pdf, "application/pdf")}
+                return await client.post("/api/v1/extraction/upload", files=files)
+
+            results[f"{kind}-{pages}"] = await _post_repeatedly(
+                client, args.repeat, upload
+            )
+    return results
+
+
+async def bench_sessions(client: AsyncClient, args) -> Dict[str, Any]:
+    results = {}
+    for kind in args.kinds:
+        for pages in args.sizes:
+            async def create(salt: str):
+                pdf = make_pdf(kind, pages, salt=salt)
+                files = {"file": (f"{kind}.pdf", pdf, "application/pdf")}
+                return await client.post(
+                    "/api/v1/sessions", data={"title": f"bench {salt}"}, files=files
+                )
+
+            results[f"{kind}-{pages}"] = await _post_repeatedly(
+                client, args.repeat, create
+            )
+    return results
+
+
+async def bench_ai(client: AsyncClient, args) -> Dict[str, Any]:
+    model = StubModel()
+    gemini_service.model = model
+    gemini_service.client = GeminiClient(
+        model, rate_limiter=RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+    )
+    endpoints = {
+        "summarize": ("/api/v1/ai/summarize", {"style": "brief"}),
+        "quiz": ("/api/v1/ai/quiz", {"question_count": 5}),
+        "study_pack": ("/api/v1/ai/study-pack", {}),
+    }
+    results = {}
+    for name, (path, params) in endpoints.items():
+        async def call(salt: str):
+            # Distinct content per request: nothing is coalesced or cached
+            content = f"Study notes {salt}. " + "Cells divide by mitosis. " * 300
+            return await client.post(path, json={"content": content, **params})
+
+        await call("warmup")
+        results[name] = await _post_repeatedly(client, args.ai_requests, call)
+    return results
+
+
+def serialization_app(payload: SuccessResponse) -> FastAPI:
+    """The upload response through both response paths."""
+    bench_app = FastAPI()
+
+    @bench_app.get(
+        "/standard",
+        response_model=SuccessResponse[ExtractionData],
+        response_class=JSONResponse,
+    )
+    async def standard():
+        return payload
+
+    @bench_app.get("/fast", response_model=SuccessResponse[ExtractionData])
+    async def fast():
+        return ModelResponse(payload)
+
+    return bench_app
+
+
+async def bench_serialization(corpus: Dict[str, str], args) -> Dict[str, Any]:
+    results = {}
+    for name, path in corpus.items():
+        pages, _ = await pdf_engine.extract_document(path)
+        text = "\n".join(pages)
+        payload = SuccessResponse(
+            data=ExtractionData(
+                id=uuid4(),
+                filename=f"{name}.pdf",
+                text=text,
+                metadata=ExtractionMetadata(
+                    page_count=len(pages), word_count=len(text.split())
+                ),
+                created_at=datetime.now(timezone.utc),
+            ),
+            meta=MetaData(extra={"deduplicated": False}),
+        )
+        async with AsyncClient(
+            transport=ASGITransport(app=serialization_app(payload)), base_url="http://bench"
+        ) as client:
+            size_mb = round(len(text.encode()) / 2**20, 2)
+            entry: Dict[str, Any] = {"response_mb": size_mb}
+            for variant in ("standard", "fast"):
+                async def get(salt: str):
+                    return await client.get(f"/{variant}")
+
+                await get("warmup")
+                entry[variant] = await _post_repeatedly(
+                    client, args.serialization_requests, get
+                )
+            standard_cpu = entry["standard"].get("cpu_per_request_ms")
+            fast_cpu = entry["fast"].get("cpu_per_request_ms")
+            if standard_cpu and fast_cpu:
+                entry["cpu_speedup_ratio"] = round(standard_cpu / fast_cpu, 2)
+        results[name] = entry
+    return results
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float
+) -> List[str]:
+    """Returns one line per metric that regressed by more than ``tolerance``."""
+    regressions = []
+    now, before = flatten(current), flatten(baseline)
+    for name, value in sorted(now.items()):
+        old = before.get(name)
+        direction = next(
+            (up for suffix, up in _DIRECTIONS.items() if name.endswith(suffix)), None
+        )
+        if old in (None, 0) or direction is None:
+            continue
+        change = (value - old) / old
+        worse = change < -tolerance if direction else change > tolerance
+        if worse:
+            regressions.append(f"{name}: {old} -> {value} ({change:+.1%})")
+    return regressions
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            check=True, capture_output=True, text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = {}
+        for kind in args.kinds:
+            for pages in args.sizes:
+                path = os.path.join(tmp, f"{kind}-{pages}.pdf")
+                with open(path, "wb") as f:
+                    f.write(make_pdf(kind, pages))
+                corpus[f"{kind}-{pages}"] = path
+
+        if "extraction" in args.scenarios:
+            results["extraction"] = await bench_extraction(corpus, args)
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://bench", timeout=None
+        ) as client:
+            db_error = None
+            if {"upload", "sessions"} & set(args.scenarios):
+                db_error = await database_available()
+            for name, bench in (("upload", bench_upload), ("sessions", bench_sessions)):
+                if name in args.scenarios:
+                    results[name] = (
+                        {"skipped": db_error} if db_error else await bench(client, args)
+                    )
+            if "ai" in args.scenarios:
+                results["ai"] = await bench_ai(client, args)
+
+        if "serialization" in args.scenarios:
+            results["serialization"] = await bench_serialization(corpus, args)
+
+    pdf_engine.shutdown()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS)
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES))
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    parser.add_argument("--repeat", type=int, default=3, help="Uploads per document")
+    parser.add_argument(
+        "--ai-requests", type=int, default=50, help="Requests per AI endpoint"
+    )
+    parser.add_argument(
+        "--serialization-requests",
+        type=int,
+        default=20,
+        help="Responses per size and path",
+    )
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.10,
+        help="Allowed regression (0.10 = 10%%)",
+    )
+    args = parser.parse_args()
+    # One INFO line per request would drown the results
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    started = time.perf_counter()
+    results = asyncio.run(run(args))
+    document = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "duration_s": round(time.perf_counter() - started, 1),
+            "args": {
+                k: v
+                for k, v in vars(args).items()
+                if k not in ("output", "baseline")
+            },
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(document, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"Wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
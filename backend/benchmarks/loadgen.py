@@ -0,0 +1,293 @@
+"""
+Open-loop async load generator for the AI routes.
+
+Sends requests at a fixed target rate (Poisson arrivals by default) whether
+or not earlier ones have finished, so a saturated server shows up as growing
+latency instead of a quietly reduced request rate. Latency is measured from
+each request's scheduled start, which includes any time the generator itself
+fell behind (no coordinated omission).
+
+By default the app is driven in-process through ASGITransport with
+``GEMINI_BACKEND=local``, the deterministic stand-in model, so no quota is
+spent. ``--url`` targets a running server instead. Stepping through
+several ``--rps`` values reports, per step and per route, p50/p95/p99
+latency, throughput and error rates, and the first step where the app
+saturated.
+
+Usage (from backend/):
+    python -m benchmarks.loadgen --rps 2 5 10 20 --duration 20
+    LOCAL_MODEL_LATENCY=uniform:200:600 LOCAL_MODEL_QUOTA_ERROR_RATE=0.05 \\
+        python -m benchmarks.loadgen --rps 10 --mix summarize=1 quiz=1
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+os.environ.setdefault("GEMINI_BACKEND", "local")
+os.environ.setdefault("AI_CACHE_ENABLED", "false")
+os.environ.setdefault("JOB_WORKER_CONCURRENCY", "0")
+
+import httpx  # noqa: E402
+
+# Route name -> (path, request body for some content)
+ROUTES = {
+    "summarize": ("/api/v1/ai/summarize", lambda c: {"content": c, "style": "brief"}),
+    "summarize_stream": (
+        "/api/v1/ai/summarize/stream", lambda c: {"content": c, "style": "brief"}
+    ),
+    "quiz": ("/api/v1/ai/quiz", lambda c: {"content": c, "question_count": 5}),
+    "study_pack": ("/api/v1/ai/study-pack", lambda c: {"content": c}),
+}
+DEFAULT_MIX = {"summarize": 4, "summarize_stream": 2, "quiz": 2, "study_pack": 2}
+
+_PARAGRAPH = (
+    "Cells divide by mitosis into two identical daughter cells. Meiosis halves "
+    "the chromosome number and produces gametes. "
+)
+
+
+@dataclass
+class RouteStats:
+    latencies: List[float] = field(default_factory=list)
+    first_byte: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+
+    def summary(self, duration: float) -> Dict[str, Any]:
+        total = sum(self.statuses.values())
+        ok = sum(n for status, n in self.statuses.items() if status == 200)
+        result: Dict[str, Any] = {
+            "requests": total,
+            "throughput_rps": round(ok / duration, 2),
+            "error_rate": round(1 - ok / total, 4) if total else 0.0,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items(), key=str)},
+        }
+        if self.latencies:
+            result["latency_ms"] = percentiles(self.latencies)
+        if self.first_byte:
+            result["first_byte_ms"] = percentiles(self.first_byte)
+        return result
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000, 1)
+
+    return {
+        "p50": round(statistics.median(ordered) * 1000, 1),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": round(ordered[-1] * 1000, 1),
+    }
+
+
+async def fire(
+    client: httpx.AsyncClient,
+    route: str,
+    scheduled: float,
+    seq: int,
+    stats: Dict[str, RouteStats],
+    timeout: float,
+) -> None:
+    path, body = ROUTES[route]
+    # Unique content: no request is served by the cache or coalesced
+    content = f"Request {seq}. " + _PARAGRAPH * 40
+    record = stats[route]
+    try:
+        async with client.stream(
+            "POST", path, json=body(content), timeout=timeout
+        ) as response:
+            first = None
+            failed = False
+            async for chunk in response.aiter_bytes():
+                if first is None:
+                    first = time.perf_counter() - scheduled
+                # Streams fail after the 200 status line, with an error event
+                failed = failed or b"event: error" in chunk
+            status = "stream_error" if failed else response.status_code
+    except httpx.TimeoutException:
+        status = "timeout"
+    except httpx.TransportError as e:
+        status = type(e).__name__
+    else:
+        if first is not None and route.endswith("_stream"):
+            record.first_byte.append(first)
+    record.statuses[status] += 1
+    if status == 200:
+        record.latencies.append(time.perf_counter() - scheduled)
+
+
+async def run_step(
+    client: httpx.AsyncClient,
+    rps: float,
+    duration: float,
+    mix: Dict[str, float],
+    rng: random.Random,
+    args,
+) -> Dict[str, Any]:
+    stats: Dict[str, RouteStats] = defaultdict(RouteStats)
+    routes, weights = zip(*mix.items())
+    tasks = set()
+    dropped = 0
+    started = time.perf_counter()
+    next_at = started
+    seq = 0
+    while next_at < started + duration:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(tasks) >= args.max_in_flight:
+            # The generator's own limit, not the server's: reported separately
+            dropped += 1
+        else:
+            route = rng.choices(routes, weights)[0]
+            task = asyncio.create_task(
+                fire(client, route, next_at, seq, stats, args.timeout)
+            )
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        seq += 1
+        gap = rng.expovariate(rps) if args.arrivals == "poisson" else 1 / rps
+        next_at += gap
+    sent_for = time.perf_counter() - started
+    if tasks:
+        await asyncio.wait(tasks)
+    elapsed = time.perf_counter() - started
+
+    routes_summary = {name: s.summary(elapsed) for name, s in sorted(stats.items())}
+    total = RouteStats()
+    for s in stats.values():
+        total.latencies += s.latencies
+        total.statuses.update(s.statuses)
+    overall = total.summary(elapsed)
+    return {
+        "target_rps": rps,
+        "offered_rps": round(seq / sent_for, 2),
+        "duration_s": round(elapsed, 2),
+        "dropped_by_generator": dropped,
+        "overall": overall,
+        "routes": routes_summary,
+    }
+
+
+def saturated(step: Dict[str, Any], args) -> Optional[str]:
+    overall = step["overall"]
+    if step["dropped_by_generator"]:
+        return "generator in-flight limit reached"
+    if overall["error_rate"] > args.max_error_rate:
+        return f"error rate {overall['error_rate']:.1%}"
+    p99 = overall.get("latency_ms", {}).get("p99")
+    if p99 is not None and p99 > args.slo_p99_ms:
+        return f"p99 {p99} ms over the {args.slo_p99_ms} ms SLO"
+    # Against the offered rate: Poisson arrivals rarely hit the target exactly
+    if overall["throughput_rps"] < step["offered_rps"] * 0.9:
+        return f"throughput {overall['throughput_rps']} rps below offered load"
+    return None
+
+
+def parse_mix(items: Optional[List[str]]) -> Dict[str, float]:
+    if not items:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for item in items:
+        name, _, weight = item.partition("=")
+        if name not in ROUTES:
+            raise SystemExit(f"Unknown route {name!r}; choose from {', '.join(ROUTES)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def make_client(args) -> Tuple[httpx.AsyncClient, Any]:
+    limits = httpx.Limits(max_connections=args.max_in_flight)
+    if args.url:
+        return httpx.AsyncClient(base_url=args.url, limits=limits), None
+
+    from app.main import app
+
+    return (
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://loadgen",
+            limits=limits,
+        ),
+        app,
+    )
+
+
+async def main_async(args) -> Dict[str, Any]:
+    mix = parse_mix(args.mix)
+    rng = random.Random(args.seed)
+    client, app = make_client(args)
+    steps = []
+    saturation = None
+    async with client:
+        for rps in args.rps:
+            step = await run_step(client, rps, args.duration, mix, rng, args)
+            reason = saturated(step, args)
+            step["saturated"] = reason
+            steps.append(step)
+            overall = step["overall"]
+            print(
+                f"{rps:>7.1f} rps  throughput {overall['throughput_rps']:>7.2f}  "
+                f"p50 {overall.get('latency_ms', {}).get('p50', '-'):>8}  "
+                f"p99 {overall.get('latency_ms', {}).get('p99', '-'):>8}  "
+                f"errors {overall['error_rate']:.2%}"
+                + (f"  SATURATED: {reason}" if reason else "")
+            )
+            if reason and saturation is None:
+                saturation = {"rps": rps, "reason": reason}
+                if args.stop_at_saturation:
+                    break
+
+    result: Dict[str, Any] = {"steps": steps, "saturation": saturation}
+    if app is not None:
+        from app.services.gemini_service import gemini_service
+
+        if gemini_service.client:
+            result["gemini_client"] = gemini_service.client.stats()
+        if hasattr(gemini_service.model, "stats"):
+            result["model"] = gemini_service.model.stats()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rps", nargs="+", type=float, default=[1, 2, 5, 10])
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per step")
+    parser.add_argument(
+        "--mix", nargs="+", help="route=weight, e.g. summarize=3 quiz=1"
+    )
+    parser.add_argument("--arrivals", choices=("poisson", "uniform"), default="poisson")
+    parser.add_argument(
+        "--url", help="Target a running server instead of the in-process app"
+    )
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--slo-p99-ms", type=float, default=5000.0)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--stop-at-saturation", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the full report to this JSON file")
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    result = asyncio.run(main_async(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Wrote {args.output}")
+    else:
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Deterministic synthetic PDFs for benchmarks.
+
+Writes minimal PDF files directly (no PDF library needed) in two shapes:
+
+* ``text``: dense prose, ~45 lines of running text per page.
+* ``table``: a ruled grid of short cells per page, the layout that is
+  hardest for text-only extractors.
+
+The same ``(kind, pages, seed)`` always produces the same text; ``salt``
+changes only a trailing comment so repeated uploads are not deduplicated.
+"""
+import random
+from typing import List
+
+KINDS = ("text", "table")
+
+_WORDS = (
+    "analysis cell energy enzyme equation evidence function gradient growth "
+    "history hypothesis integral language membrane method model molecule "
+    "network organism pressure protein reaction revolution sample society "
+    "structure system theory velocity volume wave"
+).split()
+
+_PAGE_WIDTH = 612
+_PAGE_HEIGHT = 792
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _text_page(rng: random.Random, number: int) -> bytes:
+    lines = [f"BT /F1 14 Tf 50 750 Td (Chapter {number}) Tj ET"]
+    for row in range(45):
+        words = " ".join(rng.choice(_WORDS) for _ in range(12))
+        y = 725 - row * 15
+        lines.append(f"BT /F1 10 Tf 50 {y} Td ({_escape(words.capitalize())}.) Tj ET")
+    return "\n".join(lines).encode()
+
+
+def _table_page(rng: random.Random, number: int) -> bytes:
+    columns, rows = 5, 30
+    left, top, width, height = 50, 740, 100, 22
+    ops = [f"BT /F1 12 Tf 50 760 Td (Table {number}) Tj ET", "0.5 w"]
+    for r in range(rows + 1):
+        y = top - r * height
+        ops.append(f"{left} {y} m {left + columns * width} {y} l S")
+    for c in range(columns + 1):
+        x = left + c * width
+        ops.append(f"{x} {top} m {x} {top - rows * height} l S")
+    for r in range(rows):
+        for c in range(columns):
+            cell = rng.choice(_WORDS) if c else f"{rng.randint(1, 9999)}"
+            x = left + c * width + 4
+            y = top - (r + 1) * height + 7
+            ops.append(f"BT /F1 9 Tf {x} {y} Td ({cell}) Tj ET")
+    return "\n".join(ops).encode()
+
+
+def make_pdf(kind: str, pages: int, seed: int = 0, salt: str = "") -> bytes:
+    if kind not in KINDS:
+        raise ValueError(f"kind must be one of {KINDS}")
+    rng = random.Random(f"{kind}:{pages}:{seed}")
+    render = _text_page if kind == "text" else _table_page
+
+    page_ids = [4 + 2 * i for i in range(pages)]
+    objects: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        (
+            f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] "
+            f"/Count {pages} >>"
+        ).encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i in range(pages):
+        stream = render(rng, i + 1)
+        objects.append(
+            (
+                f"<< /Type /Page /Parent 2 0 R "
+                f"/MediaBox [0 0 {_PAGE_WIDTH} {_PAGE_HEIGHT}] "
+                f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>"
+            ).encode()
+        )
+        objects.append(
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    if salt:
+        out += f"% {salt}\n".encode()
+    return bytes(out)
@@ -1,6 +1,18 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
 from fastapi.testclient import TestClient
+
 from app.main import app
-from unittest.mock import patch, AsyncMock
+from app.services.cache_service import AIResultCache
+from app.services.gemini_client import GeminiClient
+from app.services.gemini_service import GeminiService, gemini_service
+from app.services.local_model import LocalModel
+from app.services.summarization_engine import MapReduceSummarizer
 
 client = TestClient(app)
 
@@ -13,7 +25,9 @@ def test_summarize_mock(mock_summarize):
         "word_count": 2
     }
     
-    response = client.post("/api/v1/ai/summarize", json={"content": "Test content", "style": "brief"})
+    response = client.post(
+        "/api/v1/ai/summarize", json={"content": "Test content", "style": "brief"}
+    )
     assert response.status_code == 200
     assert response.json()["data"]["summary"] == "Test Summary"
 
@@ -21,3 +35,181 @@ def test_summarize_validation_error():
     # Test missing content
     response = client.post("/api/v1/ai/summarize", json={"style": "brief"})
     assert response.status_code == 422 
+
+def test_summarize_stream_sends_tokens_then_done():
+    async def fake_stream(content, style):
+        yield {"type": "token", "text": "Test "}
+        yield {"type": "token", "text": "Summary"}
+        yield {
+            "type": "done",
+            "data": {
+                "summary": "Test Summary",
+                "key_points": [],
+                "topics": [],
+                "word_count": 2,
+            },
+        }
+
+    with patch(
+        "app.services.gemini_service.gemini_service.summarize_stream", fake_stream
+    ):
+        response = client.post(
+            "/api/v1/ai/summarize/stream",
+            json={"content": "Test content", "style": "brief"},
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [block for block in response.text.split("\n\n") if block]
+    assert [e.splitlines()[0] for e in events] == [
+        "event: token",
+        "event: token",
+        "event: done",
+    ]
+    assert '"time_to_first_token_ms"' in events[-1]
+
+def test_study_pack_returns_all_artifacts():
+    response = client.post(
+        "/api/v1/ai/study-pack", json={"content": "Cells are the unit of life."}
+    )
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["summary"]["summary"].startswith("Mock summary")
+    assert data["quiz"]["total_questions"] == 1
+    assert data["diagram"]["title"] == "Mock Diagram"
+    assert data["errors"] == {}
+
+def test_study_pack_streams_each_artifact():
+    response = client.post(
+        "/api/v1/ai/study-pack?stream=ndjson",
+        json={
+            "content": "Cells are the unit of life.",
+            "artifacts": ["quiz", "summary"],
+        },
+    )
+    assert response.status_code == 200
+    messages = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(m["artifact"] for m in messages[:-1]) == ["quiz", "summary"]
+    assert messages[-1]["type"] == "complete"
+
+def test_study_pack_requires_one_source():
+    response = client.post("/api/v1/ai/study-pack", json={"artifacts": ["quiz"]})
+    assert response.status_code == 422
+
+@patch("app.api.v1.routes.ai.sessions_repo.get_by_id", new_callable=AsyncMock)
+def test_study_pack_unknown_session(mock_get_by_id):
+    mock_get_by_id.return_value = None
+    response = client.post(
+        "/api/v1/ai/study-pack",
+        json={"session_id": "00000000-0000-0000-0000-000000000000"},
+    )
+    assert response.status_code == 404
+
+@pytest.mark.anyio
+async def test_study_pack_runs_artifacts_concurrently():
+    async def slow(*args):
+        await asyncio.sleep(0.2)
+        return {}
+
+    with patch.object(gemini_service, "summarize", side_effect=slow), \
+            patch.object(gemini_service, "generate_quiz", side_effect=slow), \
+            patch.object(gemini_service, "generate_diagram", side_effect=slow):
+        started = time.perf_counter()
+        artifacts = ["summary", "quiz", "diagram"]
+        results = [r async for r in gemini_service.iter_study_pack("text", artifacts)]
+        elapsed = time.perf_counter() - started
+
+    assert len(results) == 3
+    assert elapsed < 0.4
+
+@pytest.mark.anyio
+async def test_study_pack_generates_every_artifact_from_one_condensation():
+    service = GeminiService.__new__(GeminiService)
+    service.model_name = "test-model"
+    service.model = LocalModel(latency="fixed:0", tokens_per_second=1e6, seed=1)
+    service.client = GeminiClient(service.model)
+    service.summarizer = MapReduceSummarizer(service._generate_text, chunk_tokens=50)
+    content = " ".join(f"Cells divide by mitosis in stage {i}." for i in range(100))
+    cache = AIResultCache()
+    cache.persistent = False
+
+    with patch("app.services.gemini_service.ai_cache", cache), patch.object(
+        service.summarizer, "condense", wraps=service.summarizer.condense
+    ) as condense:
+        artifacts = ["summary", "quiz", "diagram"]
+        results = {
+            artifact: (result, error)
+            async for artifact, result, error in service.iter_study_pack(
+                content, artifacts
+            )
+        }
+
+    # The summary re-checks the condensed text; the document is condensed once
+    assert [c.args[0] for c in condense.call_args_list].count(content) == 1
+    assert all(error is None for _, error in results.values())
+    assert results["quiz"][0]["total_questions"] == 5
+    assert results["diagram"][0]["mermaid_code"].startswith("flowchart")
+
+@patch(
+    "app.services.gemini_service.gemini_service.generate_quiz", new_callable=AsyncMock
+)
+def test_quiz_focus_sends_only_relevant_chunks(mock_quiz):
+    mock_quiz.return_value = {"title": "Quiz", "questions": [], "total_questions": 0}
+    content = "\n\n".join(
+        ["Photosynthesis happens in chloroplasts using chlorophyll. " * 20]
+        + ["The French Revolution began in 1789 with the Bastille. " * 20] * 5
+    )
+
+    response = client.post(
+        "/api/v1/ai/quiz",
+        json={"content": content, "focus": "chlorophyll photosynthesis", "top_k": 1},
+    )
+
+    assert response.status_code == 200
+    sent = mock_quiz.await_args.args[0]
+    assert "chlorophyll" in sent
+    assert "Bastille" not in sent
+    assert len(sent) < len(content) / 4
+
+class QuizModel:
+    def __init__(self):
+        self.prompts = []
+
+    def generate_content(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        question = {"question": "Where?", "options": ["A", "B"], "correct_answer": "A"}
+        return SimpleNamespace(text=json.dumps({"questions": [question]}))
+
+
+def test_quiz_prompt_carries_only_the_focused_context():
+    service = GeminiService.__new__(GeminiService)
+    service.model_name = "test-model"
+    service.model = QuizModel()
+    service.client = GeminiClient(service.model)
+    service.summarizer = MapReduceSummarizer(service._generate_text)
+    cache = AIResultCache()
+    cache.persistent = False
+    content = "\n\n".join(
+        ["Photosynthesis happens in chloroplasts using chlorophyll. " * 20]
+        + ["The French Revolution began in 1789 with the Bastille. " * 20] * 5
+    )
+
+    with patch("app.api.v1.routes.ai.gemini_service", service), patch(
+        "app.services.gemini_service.ai_cache", cache
+    ):
+        response = client.post(
+            "/api/v1/ai/quiz",
+            json={"content": content, "focus": "chlorophyll", "top_k": 1},
+        )
+
+    assert response.status_code == 200
+    assert response.json()["data"]["total_questions"] == 1
+    [prompt] = service.model.prompts
+    assert "chlorophyll" in prompt
+    assert "Bastille" not in prompt
+
+def test_page_range_requires_document_id():
+    response = client.post(
+        "/api/v1/ai/quiz", json={"content": "Some text", "page_start": 2}
+    )
+    assert response.status_code == 422
@@ -0,0 +1,128 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.core.errors import APIError
+from app.services.cache_service import AIResultCache, TTLCache
+from app.services.gemini_client import GeminiClient
+from app.services.gemini_service import GeminiService
+from app.services.local_model import LocalModel
+from app.services.summarization_engine import MapReduceSummarizer
+
+
+class StubModel:
+    def __init__(self):
+        self.call_count = 0
+
+    def generate_content(self, prompt):
+        self.call_count += 1
+        return SimpleNamespace(text="A summary")
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(max_entries=2, ttl_seconds=-1)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_bounded_by_bytes():
+    cache = TTLCache(max_entries=10, ttl_seconds=60, max_bytes=10, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("b", "xxxx")
+    cache.set("c", "xxxx")
+
+    assert cache.get("a") is None
+    assert cache.nbytes == 8
+    cache.set("huge", "x" * 11)
+    assert cache.get("huge") is None
+    assert cache.get("b") == cache.get("c") == "xxxx"
+
+
+def test_cache_key_changes_with_prompt_version():
+    key_v1 = AIResultCache.make_key("summarize", "abc", {"style": "brief"}, "m", "1")
+    key_v2 = AIResultCache.make_key("summarize", "abc", {"style": "brief"}, "m", "2")
+    assert key_v1 != key_v2
+
+
+@pytest.mark.anyio
+async def test_identical_summaries_hit_the_cache():
+    cache = AIResultCache()
+    cache.persistent = False
+
+    service = GeminiService.__new__(GeminiService)
+    service.model_name = "test-model"
+    service.model = StubModel()
+    service.client = GeminiClient(service.model)
+    service.summarizer = MapReduceSummarizer(service._generate_text)
+
+    with patch("app.services.gemini_service.ai_cache", cache):
+        first = await service.summarize("Some study notes", "brief")
+        second = await service.summarize("Some study notes", "brief")
+        await service.summarize("Some study notes", "detailed")
+
+    assert first == second
+    assert service.model.call_count == 2
+    stats = cache.stats()
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 2
+
+
+def local_service() -> GeminiService:
+    service = GeminiService.__new__(GeminiService)
+    service.model_name = "test-model"
+    service.model = LocalModel(latency="fixed:0", tokens_per_second=1e6, seed=1)
+    service.client = GeminiClient(service.model)
+    service.summarizer = MapReduceSummarizer(service._generate_text)
+    return service
+
+
+@pytest.mark.anyio
+async def test_quiz_and_diagram_are_generated_and_cached():
+    cache = AIResultCache()
+    cache.persistent = False
+    service = local_service()
+
+    notes = "Mitosis splits one cell in two."
+
+    with patch("app.services.gemini_service.ai_cache", cache):
+        quiz = await service.generate_quiz(notes, 3, "easy")
+        again = await service.generate_quiz(notes, 3, "easy")
+        diagram = await service.generate_diagram("Mitosis and meiosis.", "flowchart")
+
+    assert quiz == again
+    assert quiz["total_questions"] == 3
+    assert quiz["questions"][0]["correct_answer"] in quiz["questions"][0]["options"]
+    assert diagram["mermaid_code"].startswith("flowchart")
+    assert service.model.counters["calls"] == 2
+
+
+@pytest.mark.anyio
+async def test_malformed_quiz_is_not_cached():
+    cache = AIResultCache()
+    cache.persistent = False
+    service = local_service()
+    service.model = StubModel()
+    service.client = GeminiClient(service.model)
+
+    with patch("app.services.gemini_service.ai_cache", cache):
+        for _ in range(2):
+            with pytest.raises(APIError):
+                await service.generate_quiz("Some study notes", 3, "easy")
+
+    assert service.model.call_count == 2
+    assert len(cache.memory) == 0
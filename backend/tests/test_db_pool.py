@@ -0,0 +1,32 @@
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+
+from app.core.db_pool import PoolMetrics, instrumented_pool_class
+
+
+@pytest.mark.anyio
+async def test_pool_reports_checkouts_overflow_and_timeouts():
+    metrics = PoolMetrics("test")
+    pool = instrumented_pool_class(metrics)(
+        creator=MagicMock, pool_size=1, max_overflow=1, timeout=0.05
+    )
+
+    def exhaust_pool():
+        first, second = pool.connect(), pool.connect()
+        with pytest.raises(exc.TimeoutError):
+            pool.connect()
+        first.close()
+        second.close()
+
+    await greenlet_spawn(exhaust_pool)
+    stats = metrics.stats()
+
+    assert stats["checkouts"] == 2
+    assert stats["overflow_checkouts"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["max_in_use"] == 2
+    assert stats["in_use"] == 0
+    assert stats["checkout_wait_ms"]["max"] >= 0
@@ -1,7 +1,12 @@
+import hashlib
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
 import pytest
 from httpx import AsyncClient
-from unittest.mock import MagicMock, patch
-import io
+
 
 @pytest.mark.anyio
 async def test_upload_invalid_file_type(client: AsyncClient):
@@ -35,9 +40,29 @@ async def test_successful_pdf_upload(client: AsyncClient):
     mock_pdf.pages = [mock_page]
     mock_pdf.__enter__.return_value = mock_pdf
     
-    with patch("pdfplumber.open", return_value=mock_pdf):
+    async def create_record(db, **fields):
+        return SimpleNamespace(
+            id=uuid.uuid4(),
+            page_count=fields["metadata"].page_count,
+            word_count=fields["metadata"].word_count,
+            language="en",
+            created_at=datetime.utcnow(),
+            **{k: fields[k] for k in ("filename", "content")},
+        )
+
+    services = "app.api.v1.features.extraction.services"
+
+    # No database: the lookup misses, and the insert returns the new row
+    with patch("pdfplumber.open", return_value=mock_pdf), patch(
+        f"{services}.get_extraction_by_hash", AsyncMock(return_value=None)
+    ), patch(f"{services}.create_extraction_record", create_record), patch(
+        f"{services}.link_document_owner", AsyncMock()
+    ), patch(f"{services}.retrieval_service.index_document", AsyncMock()):
         # Create a dummy PDF content
-        dummy_pdf_content = b"%PDF-1.4\n1 0 obj\n<<\n/Title (Test Document)\n>>\nendobj\ntrailer\n<<\n/Root 1 0 R\n>>\n%%EOF"
+        dummy_pdf_content = (
+            b"%PDF-1.4\n1 0 obj\n<<\n/Title (Test Document)\n>>\nendobj\n"
+            b"trailer\n<<\n/Root 1 0 R\n>>\n%%EOF"
+        )
         files = {"file": ("study_guide.pdf", dummy_pdf_content, "application/pdf")}
         
         response = await client.post("/api/v1/extraction/upload", files=files)
@@ -48,3 +73,42 @@ async def test_successful_pdf_upload(client: AsyncClient):
         assert json_data["data"]["filename"] == "study_guide.pdf"
         assert json_data["data"]["text"] == "Extracted test content"
         assert json_data["data"]["metadata"]["page_count"] == 1
+
+@pytest.mark.anyio
+async def test_duplicate_pdf_upload_skips_extraction(client: AsyncClient):
+    """
+    Re-uploading identical bytes should reuse the stored document.
+    """
+    content = b"%PDF-1.4\n%%EOF"
+    existing = SimpleNamespace(
+        id=uuid.uuid4(),
+        filename="lecture.pdf",
+        content="Stored lecture text",
+        page_count=3,
+        word_count=3,
+        language="en",
+        created_at=datetime.utcnow(),
+    )
+    lookup = AsyncMock(return_value=existing)
+
+    link_owner = AsyncMock()
+
+    with patch(
+        "app.api.v1.features.extraction.services.get_extraction_by_hash", lookup
+    ), patch(
+        "app.api.v1.features.extraction.services.link_document_owner", link_owner
+    ), patch("pdfplumber.open") as pdf_open:
+        files = {"file": ("copy.pdf", content, "application/pdf")}
+        response = await client.post("/api/v1/extraction/upload", files=files)
+
+    assert response.status_code == 200
+    json_data = response.json()
+    assert json_data["data"]["id"] == str(existing.id)
+    assert json_data["data"]["text"] == "Stored lecture text"
+    # The row is shared; the other uploader's filename must not leak
+    assert json_data["data"]["filename"] == "copy.pdf"
+    assert json_data["meta"]["extra"]["deduplicated"] is True
+    assert lookup.await_args.args[1] == hashlib.sha256(content).hexdigest()
+    pdf_open.assert_not_called()
+    # A repeat upload still makes the document searchable for this user
+    assert link_owner.await_args.args[1] == existing.id
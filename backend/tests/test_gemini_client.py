@@ -0,0 +1,66 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.gemini_client import GeminiClient
+
+
+class SlowModel:
+    """Blocking stand-in for GenerativeModel.generate_content."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+
+    def generate_content(self, prompt):
+        self.calls += 1
+        time.sleep(self.delay)
+        return SimpleNamespace(text=f"echo: {prompt}")
+
+
+@pytest.mark.anyio
+async def test_blocking_model_does_not_block_the_event_loop():
+    client = GeminiClient(SlowModel(delay=0.3))
+
+    call = asyncio.ensure_future(client.generate("prompt"))
+    started = time.perf_counter()
+    await asyncio.sleep(0.01)
+    assert time.perf_counter() - started < 0.2
+
+    assert (await call).text == "echo: prompt"
+    client.shutdown()
+
+
+@pytest.mark.anyio
+async def test_identical_concurrent_requests_are_coalesced():
+    model = SlowModel(delay=0.1)
+    client = GeminiClient(model)
+
+    results = await asyncio.gather(*(client.generate("same") for _ in range(5)))
+
+    assert model.calls == 1
+    assert all(r is results[0] for r in results)
+    assert client.stats()["coalesced"] == 4
+    client.shutdown()
+
+
+@pytest.mark.anyio
+async def test_in_flight_calls_are_capped():
+    class CountingModel:
+        active = 0
+        peak = 0
+
+        async def generate_content_async(self, prompt):
+            CountingModel.active += 1
+            CountingModel.peak = max(CountingModel.peak, CountingModel.active)
+            await asyncio.sleep(0.02)
+            CountingModel.active -= 1
+            return prompt
+
+    client = GeminiClient(CountingModel(), max_concurrency=2)
+    await asyncio.gather(*(client.generate(f"p{i}") for i in range(6)))
+
+    assert CountingModel.peak == 2
+    client.shutdown()
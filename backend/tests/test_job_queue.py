@@ -0,0 +1,160 @@
+import uuid
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.errors import APIError
+from app.db.models import AIJob
+from app.main import app
+from app.services.ai_jobs import AI_JOB_HANDLERS
+from app.services.job_queue import JobQueue, JobWorkerPool
+
+# The user returned by the mock auth dependency
+USER_ID = uuid.UUID("550e8400-e29b-41d4-a716-446655440000")
+
+
+def make_job(operation="summarize", attempts=1, max_attempts=3, user_id=None):
+    now = datetime.utcnow()
+    return AIJob(
+        id=uuid.uuid4(),
+        user_id=user_id or uuid.uuid4(),
+        operation=operation,
+        payload={"content": "text", "style": "brief"},
+        status="running",
+        attempts=attempts,
+        max_attempts=max_attempts,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+@pytest.mark.anyio
+async def test_worker_completes_successful_job():
+    queue = AsyncMock()
+    queue.visibility_timeout = JobQueue(visibility_timeout_seconds=5).visibility_timeout
+    handler = AsyncMock(return_value={"summary": "S"})
+    pool = JobWorkerPool(queue, {"summarize": handler}, concurrency=1)
+    job = make_job()
+
+    await pool.execute(job, "w1")
+
+    handler.assert_awaited_once_with(job.payload, job.user_id)
+    queue.complete.assert_awaited_once_with(job, "w1", {"summary": "S"})
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "error, retry",
+    [
+        (APIError(code="AI_ERROR", message="upstream", status_code=500), True),
+        (APIError(code="BAD_INPUT", message="bad", status_code=400), False),
+        (RuntimeError("boom"), True),
+    ],
+)
+async def test_worker_retries_only_server_errors(error, retry):
+    queue = AsyncMock()
+    queue.visibility_timeout = JobQueue(visibility_timeout_seconds=5).visibility_timeout
+    pool = JobWorkerPool(
+        queue, {"summarize": AsyncMock(side_effect=error)}, concurrency=1
+    )
+
+    await pool.execute(make_job(), "w1")
+
+    assert queue.fail.await_args.kwargs["retry"] is retry
+
+
+@pytest.mark.anyio
+async def test_failed_job_is_requeued_with_backoff_until_attempts_run_out():
+    queue = JobQueue(max_attempts=3, retry_backoff_seconds=10)
+    with patch.object(queue, "_finish", new_callable=AsyncMock) as finish:
+        await queue.fail(make_job(attempts=2), "w1", {"code": "X", "message": "x"})
+        values = finish.await_args.kwargs
+        assert values["status"] == "queued"
+        delay = (values["run_after"] - datetime.utcnow()).total_seconds()
+        assert 15 < delay <= 20
+
+        await queue.fail(make_job(attempts=3), "w1", {"code": "X", "message": "x"})
+        assert finish.await_args.kwargs["status"] == "failed"
+
+
+def test_async_mode_enqueues_a_job():
+    job = make_job(attempts=0)
+    job.status = "queued"
+    with patch(
+        "app.api.v1.routes.ai.job_queue.enqueue", new_callable=AsyncMock
+    ) as enqueue:
+        enqueue.return_value = job
+        response = TestClient(app).post(
+            "/api/v1/ai/summarize?async=true",
+            json={"content": "text", "style": "brief"},
+        )
+
+    assert response.status_code == 202
+    assert response.json()["data"]["id"] == str(job.id)
+    assert response.headers["location"] == f"/api/v1/jobs/{job.id}"
+    enqueue.assert_awaited_once_with(
+        "summarize", {"content": "text", "style": "brief"}, USER_ID
+    )
+
+
+def test_async_job_on_a_document_stores_the_request_not_the_text():
+    job = make_job(operation="quiz", attempts=0)
+    job.status = "queued"
+    document_id = uuid.uuid4()
+    with patch(
+        "app.api.v1.routes.ai.job_queue.enqueue", new_callable=AsyncMock
+    ) as enqueue, patch(
+        "app.api.v1.routes.ai.retrieval_service.check_access", new_callable=AsyncMock
+    ) as check_access:
+        enqueue.return_value = job
+        response = TestClient(app).post(
+            "/api/v1/ai/quiz?async=true",
+            json={"document_id": str(document_id), "focus": "mitosis"},
+        )
+
+    assert response.status_code == 202
+    check_access.assert_awaited_once_with(document_id, USER_ID)
+    payload = enqueue.await_args.args[1]
+    assert payload == {
+        "document_id": str(document_id),
+        "focus": "mitosis",
+        "question_count": 5,
+        "difficulty": "medium",
+    }
+
+
+@pytest.mark.anyio
+async def test_quiz_job_loads_the_document_text_when_it_runs():
+    document_id = uuid.uuid4()
+    payload = {"document_id": str(document_id), "page_start": 2, "page_end": 3}
+    select = AsyncMock(return_value="Pages two and three")
+    quiz = AsyncMock(return_value={"title": "Q"})
+
+    with patch(
+        "app.services.ai_jobs.retrieval_service.select_context", select
+    ), patch("app.services.ai_jobs.gemini_service.generate_quiz", quiz):
+        result = await AI_JOB_HANDLERS["quiz"](payload, USER_ID)
+
+    assert result == {"title": "Q"}
+    assert select.await_args.args == (USER_ID,)
+    assert select.await_args.kwargs["document_id"] == document_id
+    assert select.await_args.kwargs["page_range"] == (2, 3)
+    quiz.assert_awaited_once_with("Pages two and three", 5, "medium")
+
+
+@pytest.mark.parametrize("owned, status", [(True, 200), (False, 404)])
+def test_get_job_only_returns_the_callers_jobs(owned, status):
+    job = make_job(user_id=USER_ID if owned else uuid.uuid4())
+    job.result = {"summary": "Private notes"}
+    db = AsyncMock()
+    db.get.return_value = job
+    session = MagicMock()
+    session.return_value.__aenter__.return_value = db
+
+    with patch("app.services.job_queue.AsyncSessionLocal", session):
+        response = TestClient(app).get(f"/api/v1/jobs/{job.id}")
+
+    assert response.status_code == status
+    assert ("Private notes" in response.text) is owned
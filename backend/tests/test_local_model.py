@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from app.services.gemini_client import GeminiClient
+from app.services.gemini_service import (
+    DIAGRAM_PROMPT,
+    QUIZ_PROMPT,
+    parse_diagram_json,
+    parse_quiz_json,
+)
+from app.services.local_model import (
+    LatencyDistribution,
+    LocalModel,
+    ResourceExhausted,
+    respond,
+)
+from app.services.rate_limiter import RateLimiter, is_quota_error
+from app.services.summarization_engine import parse_sectioned_summary
+
+
+def fast_model(**kwargs) -> LocalModel:
+    options = {"latency": "fixed:0", "tokens_per_second": 1e6, "seed": 1}
+    return LocalModel(**{**options, **kwargs})
+
+
+def test_responses_are_deterministic_and_follow_the_prompt_format():
+    prompt = "Summarize photosynthesis and chlorophyll. Respond with JSON."
+    assert respond(prompt, seed=3) == respond(prompt, seed=3)
+    assert respond(prompt, seed=3) != respond(prompt, seed=4)
+
+    data = json.loads(respond(prompt))
+    assert data["summary"] and data["key_points"] and data["topics"]
+
+    sectioned = respond("Notes about mitosis. Use KEY POINTS: and TOPICS: sections.")
+    summary = parse_sectioned_summary(sectioned)
+    assert summary["key_points"] and summary["topics"]
+
+    notes = "Mitosis and meiosis."
+    quiz_prompt = QUIZ_PROMPT.format(difficulty="easy", count=2, content=notes)
+    assert parse_quiz_json(respond(quiz_prompt))["total_questions"] == 2
+    diagram_prompt = DIAGRAM_PROMPT.format(diagram_type="flowchart", content=notes)
+    assert parse_diagram_json(respond(diagram_prompt))["mermaid_code"]
+
+
+def test_latency_specs():
+    assert LatencyDistribution.parse("fixed:250").sample(None) == 0.25
+    assert LatencyDistribution.parse("uniform:100:200").kind == "uniform"
+    with pytest.raises(ValueError):
+        LatencyDistribution.parse("gamma:1:2")
+    with pytest.raises(ValueError):
+        LatencyDistribution.parse("fixed")
+
+
+@pytest.mark.anyio
+async def test_streams_in_chunks():
+    model = fast_model(stream_chunk_tokens=4)
+    stream = await model.generate_content_async("Explain mitosis", stream=True)
+    chunks = [chunk.text async for chunk in stream]
+    assert len(chunks) > 1
+    assert "".join(chunks) == respond("Explain mitosis", seed=1)
+
+
+@pytest.mark.anyio
+async def test_injected_quota_errors_look_like_gemini_quota_errors():
+    model = fast_model(quota_error_rate=1.0)
+    with pytest.raises(ResourceExhausted) as exc_info:
+        model.generate_content("prompt")
+    assert is_quota_error(exc_info.value)
+
+    limited = fast_model(requests_per_minute=1)
+    client = GeminiClient(
+        limited, rate_limiter=RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+    )
+    client.max_quota_retries = 0
+    await client.generate("first")
+    with pytest.raises(ResourceExhausted):
+        await client.generate("second")
+    assert limited.stats()["quota_errors"] == 1
+    client.shutdown()
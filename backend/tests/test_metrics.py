@@ -0,0 +1,76 @@
+import pytest
+
+from app.core.metrics import Counter, Histogram, MetricsRegistry
+from app.services.gemini_client import GeminiClient, operation_scope
+from app.services.local_model import LocalModel
+from app.services.rate_limiter import RateLimiter
+
+
+def sample(text: str, prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"no sample {prefix!r} in:\n{text}")
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = Histogram(
+        "op_seconds", "Op time", ("op",), buckets=(0.1, 1.0), registry=registry
+    )
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.labels("read").observe(value)
+    Counter("ops_total", 'Ops with a "quote"', registry=registry).inc(2)
+
+    text = registry.render()
+    assert sample(text, 'op_seconds_bucket{op="read",le="0.1"}') == 2
+    assert sample(text, 'op_seconds_bucket{op="read",le="1"}') == 3
+    assert sample(text, 'op_seconds_bucket{op="read",le="+Inf"}') == 4
+    assert sample(text, 'op_seconds_count{op="read"}') == 4
+    assert sample(text, 'op_seconds_sum{op="read"}') == pytest.approx(3.65)
+    assert sample(text, "ops_total") == 2
+    assert '# HELP ops_total Ops with a \\"quote\\"' in text
+
+
+def test_labels_must_match():
+    registry = MetricsRegistry()
+    counter = Counter("things_total", "Things", ("kind",), registry=registry)
+    with pytest.raises(ValueError):
+        counter.labels("a", "b")
+    with pytest.raises(ValueError):
+        Counter("things_total", "Again", registry=registry)
+
+
+@pytest.mark.anyio
+async def test_metrics_endpoint_reports_routes_by_template(client):
+    await client.get("/api/v1/health")
+    await client.get("/api/v1/sessions/not-a-uuid")
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert sample(
+        text, 'http_requests_total{method="GET",route="/api/v1/health",status="200"}'
+    ) >= 1
+    # Ids are folded into the route template
+    assert 'route="/api/v1/sessions/{session_id}"' in text
+    assert "not-a-uuid" not in text
+    assert "cache_hit_ratio" in text
+
+
+@pytest.mark.anyio
+async def test_gemini_calls_are_recorded_per_operation(client):
+    model = LocalModel(latency="fixed:0", tokens_per_second=1e6)
+    gemini = GeminiClient(
+        model, rate_limiter=RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+    )
+    with operation_scope("metrics_test"):
+        await gemini.generate("Explain osmosis " * 20)
+    gemini.shutdown()
+
+    text = (await client.get("/metrics")).text
+    calls = 'gemini_call_duration_seconds_count{operation="metrics_test",outcome="ok"}'
+    assert sample(text, calls) == 1
+    assert sample(text, 'gemini_prompt_tokens_total{operation="metrics_test"}') > 0
+    assert sample(text, 'gemini_response_tokens_total{operation="metrics_test"}') > 0
@@ -0,0 +1,88 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services.pdf_engine import (
+    PDFExtractionEngine,
+    assess_page_text,
+    split_page_ranges,
+)
+
+
+def test_split_page_ranges_covers_every_page_in_order():
+    ranges = split_page_ranges(page_count=103, workers=4, min_pages_per_task=8)
+
+    assert len(ranges) == 4
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == 103
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+
+
+def test_split_page_ranges_respects_min_pages_per_task():
+    assert split_page_ranges(page_count=20, workers=8, min_pages_per_task=8) == [
+        (0, 10),
+        (10, 20),
+    ]
+    assert split_page_ranges(page_count=3, workers=8, min_pages_per_task=8) == [(0, 3)]
+    assert split_page_ranges(page_count=0, workers=8, min_pages_per_task=8) == []
+
+
+@pytest.mark.anyio
+async def test_extract_pages_keeps_page_order():
+    mock_pdf = MagicMock()
+    pages = []
+    for i in range(3):
+        page = MagicMock()
+        page.extract_text.return_value = f"page {i}" if i != 1 else None
+        pages.append(page)
+    mock_pdf.pages = pages
+    mock_pdf.__enter__.return_value = mock_pdf
+
+    engine = PDFExtractionEngine(max_workers=1)
+    with patch("pdfplumber.open", return_value=mock_pdf):
+        result = await engine.extract_pages(b"%PDF-1.4")
+
+    assert result == ["page 0", "", "page 2"]
+
+
+def test_assess_page_text_flags_broken_output():
+    prose = "The mitochondria is the powerhouse of the cell and produces ATP. " * 3
+    assert assess_page_text(prose) is None
+    assert assess_page_text("  \n ") == "empty"
+    assert assess_page_text("(cid:12)(cid:14)(cid:3) " * 10 + prose) == "garbled"
+    assert assess_page_text("T h e  q u i c k  b r o w n  f o x  j u m p s") == "spaced"
+    run_together = "Themitochondriaisthepowerhouseofthecell " * 3
+    assert assess_page_text(run_together) == "run_together"
+    assert assess_page_text("\n".join(["ab"] * 20 + [prose])) == "fragmented"
+
+
+@pytest.mark.anyio
+async def test_only_broken_pages_fall_back_to_layout_backend():
+    prose = "Photosynthesis converts light energy into chemical energy in plants."
+    fast_pages = []
+    for text in (prose, "", prose):
+        page = MagicMock()
+        page.extract_text.return_value = text
+        fast_pages.append(page)
+    reader = MagicMock(pages=fast_pages)
+
+    layout_pdf = MagicMock()
+    layout_pages = []
+    for i in range(3):
+        page = MagicMock()
+        page.extract_text.return_value = f"layout page {i}"
+        layout_pages.append(page)
+    layout_pdf.pages = layout_pages
+
+    engine = PDFExtractionEngine(max_workers=1, fast_path=True)
+    with patch("PyPDF2.PdfReader", return_value=reader), patch(
+        "pdfplumber.open", return_value=layout_pdf
+    ):
+        pages, report = await engine.extract_document(b"%PDF-1.4")
+
+    assert pages == [prose, "layout page 1", prose]
+    assert layout_pages[0].extract_text.call_count == 0
+    assert (report.fast_pages, report.layout_pages) == (2, 1)
+    assert report.fallback_reasons == {"empty": 1}
+    assert engine.stats()["fast_page_ratio"] == round(2 / 3, 3)
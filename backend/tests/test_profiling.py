@@ -0,0 +1,96 @@
+import time
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import settings
+from app.core.profiling import (
+    ProfilingMiddleware,
+    profile_store,
+    sign_token,
+    verify_token,
+)
+from app.main import app
+
+SECRET = "test-secret"
+
+
+@pytest.fixture
+def profiling(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILING_SECRET", SECRET)
+    monkeypatch.setattr(settings, "PROFILING_INTERVAL_MS", 1.0)
+    monkeypatch.setattr(profile_store, "directory", str(tmp_path))
+    return sign_token(int(time.time()) + 60)
+
+
+async def busy_app(scope, receive, send):
+    """Burns CPU and holds ~8 MB for a moment."""
+    held = [bytes(1024) for _ in range(8 * 1024)]
+    deadline = time.perf_counter() + 0.1
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": str(len(held)).encode()})
+
+
+def test_tokens():
+    expires = int(time.time()) + 60
+    token = sign_token(expires, SECRET)
+    assert verify_token(token, SECRET)
+    assert not verify_token(token, "other-secret")
+    assert not verify_token(token, "")
+    tampered = token[:-1] + ("1" if token.endswith("0") else "0")
+    assert not verify_token(tampered, SECRET)
+    assert not verify_token(sign_token(int(time.time()) - 1, SECRET), SECRET)
+    assert not verify_token(sign_token(int(time.time()) + 10**6, SECRET), SECRET)
+    assert not verify_token("garbage", SECRET)
+
+
+@pytest.mark.anyio
+async def test_signed_request_is_profiled_and_retrievable(profiling, client):
+    async with AsyncClient(
+        transport=ASGITransport(app=ProfilingMiddleware(busy_app, sample_rate=0)),
+        base_url="http://test",
+    ) as busy:
+        plain = await busy.get("/work")
+        assert "x-profile-id" not in plain.headers
+
+        response = await busy.get("/work", headers={"X-Profile": profiling})
+    profile_id = response.headers["x-profile-id"]
+
+    profile = profile_store.get(profile_id)
+    assert profile["path"] == "/work" and profile["status"] == 200
+    assert profile["cpu"]["samples"] > 0
+    assert any("busy_app" in stack for stack in profile["cpu"]["folded"])
+    assert profile["memory"]["peak_bytes"] > 8 * 1024 * 1024
+
+    listing = await client.get("/api/v1/profiles", headers={"X-Profile": profiling})
+    assert [p["id"] for p in listing.json()["data"]] == [profile_id]
+    folded = await client.get(
+        f"/api/v1/profiles/{profile_id}/folded", headers={"X-Profile": profiling}
+    )
+    assert "busy_app" in folded.text
+
+    denied = await client.get(f"/api/v1/profiles/{profile_id}")
+    assert denied.status_code == 403
+    missing = await client.get(
+        "/api/v1/profiles/nope", headers={"X-Profile": profiling}
+    )
+    assert missing.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_reading_profiles_is_not_profiled(profiling):
+    async with AsyncClient(
+        transport=ASGITransport(app=ProfilingMiddleware(app, sample_rate=1.0)),
+        base_url="http://test",
+    ) as profiled:
+        listing = await profiled.get(
+            "/api/v1/profiles", headers={"X-Profile": profiling}
+        )
+
+    assert listing.status_code == 200
+    assert "x-profile-id" not in listing.headers
+    assert listing.json()["data"] == []
+    assert profile_store.list() == []
@@ -0,0 +1,100 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.gemini_client import GeminiClient
+from app.services.rate_limiter import BACKGROUND, INTERACTIVE, RateLimiter, TokenBucket
+
+
+class ResourceExhausted(Exception):
+    code = 429
+
+
+class FlakyModel:
+    """Fails with a quota error ``failures`` times, then succeeds."""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+
+    def generate_content(self, prompt):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ResourceExhausted("quota")
+        return SimpleNamespace(text="ok")
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(rate_per_minute=60)
+    bucket.consume(60)
+
+    assert 0.9 < bucket.time_until(1) <= 1.0
+    # Half the rate doubles the wait
+    assert 1.9 < bucket.time_until(1, factor=0.5) <= 2.0
+
+
+@pytest.mark.anyio
+async def test_interactive_requests_overtake_queued_background_work():
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=0)
+    limiter.requests.tokens = 0
+    order = []
+
+    async def call(name, level):
+        await limiter.acquire(level=level)
+        order.append(name)
+
+    background = [asyncio.create_task(call(f"bg{i}", BACKGROUND)) for i in range(2)]
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(call("ui", INTERACTIVE))
+    await asyncio.gather(interactive, *background)
+
+    assert order[0] == "ui"
+
+
+@pytest.mark.anyio
+async def test_each_waiting_request_is_counted_as_queued_once():
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=0)
+    limiter.requests.tokens = 0
+
+    first = [asyncio.create_task(limiter.acquire()) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    # A new arrival wakes the dispatcher while the first request still waits
+    await asyncio.gather(limiter.acquire(), *first)
+
+    assert limiter.counters["queued"] == 3
+    assert limiter.counters["granted"] == 3
+
+
+@pytest.mark.anyio
+async def test_quota_errors_back_off_and_slow_the_send_rate():
+    limiter = RateLimiter(
+        requests_per_minute=0, tokens_per_minute=0, backoff_base=0.01, backoff_max=0.05
+    )
+    model = FlakyModel(failures=2)
+    client = GeminiClient(model, rate_limiter=limiter)
+
+    started = time.perf_counter()
+    response = await client.generate("prompt")
+
+    assert response.text == "ok"
+    assert model.calls == 3
+    assert limiter.counters["quota_errors"] == 2
+    assert limiter.rate_factor < 1.0
+    # Two cooldowns of at least base/2 and base each
+    assert time.perf_counter() - started >= 0.015
+    client.shutdown()
+
+
+@pytest.mark.anyio
+async def test_quota_error_is_raised_once_retries_run_out():
+    limiter = RateLimiter(
+        requests_per_minute=0, tokens_per_minute=0, backoff_base=0.01, backoff_max=0.01
+    )
+    client = GeminiClient(FlakyModel(failures=100), rate_limiter=limiter)
+    client.max_quota_retries = 1
+
+    with pytest.raises(ResourceExhausted):
+        await client.generate("prompt")
+    client.shutdown()
@@ -0,0 +1,58 @@
+import subprocess
+import sys
+
+import pytest
+
+from app.core.registry import ServiceRegistry
+
+
+class Service:
+    built = 0
+
+    def __init__(self):
+        Service.built += 1
+        self.value = 1
+
+
+def test_service_is_built_on_first_use_only():
+    registry = ServiceRegistry()
+    Service.built = 0
+    service = registry.register("svc", Service)
+
+    assert not service.initialized
+    assert Service.built == 0
+
+    service.value = 2
+    assert service.value == 2
+    assert Service.built == 1
+    assert registry.stats() == {"svc": True}
+
+
+@pytest.mark.anyio
+async def test_warmup_builds_services_and_tolerates_failures():
+    registry = ServiceRegistry()
+
+    def broken():
+        raise RuntimeError("no credentials")
+
+    ok = registry.register("ok", Service)
+    bad = registry.register("bad", broken)
+    cold = registry.register("cold", Service, warm=False)
+
+    await registry.warmup()
+
+    assert ok.initialized
+    assert not bad.initialized
+    assert not cold.initialized
+
+
+def test_importing_the_app_does_not_load_heavy_clients():
+    code = (
+        "import sys, app.main; "
+        "print(any(m in sys.modules for m in "
+        "('google.generativeai', 'supabase', 'asyncpg', 'pdfplumber', 'PyPDF2')))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip().splitlines()[-1] == "False"
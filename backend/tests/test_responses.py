@@ -0,0 +1,31 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from starlette.responses import JSONResponse
+
+from app.api.v1.features.extraction.schemas import ExtractionData, ExtractionMetadata
+from app.core.schemas.responses import MetaData, SuccessResponse
+from app.utils.responses import ModelResponse
+
+
+@pytest.mark.anyio
+async def test_model_response_matches_the_response_model_path():
+    payload = SuccessResponse(
+        data=ExtractionData(
+            id=uuid.uuid4(),
+            filename="notes é.pdf",
+            text='Line "one"\nLine two ✓',
+            metadata=ExtractionMetadata(page_count=1, word_count=5),
+            created_at=datetime.now(timezone.utc),
+        ),
+        meta=MetaData(extra={"deduplicated": False}),
+    )
+    field = create_response_field("response", SuccessResponse[ExtractionData])
+    content = await serialize_response(field=field, response_content=payload)
+    standard = JSONResponse(content)
+
+    assert ModelResponse(payload).body == standard.body
+    assert ModelResponse(b'{"ok":true}').body == b'{"ok":true}'
@@ -0,0 +1,74 @@
+import numpy as np
+
+from app.services.retrieval_index import (
+    VECTOR_DIM,
+    ChunkIndex,
+    _term_weights,
+    chunk_pages,
+    encode_vector,
+)
+
+PAGES = [
+    "Photosynthesis converts light energy into chemical energy in chloroplasts. "
+    "Chlorophyll absorbs light and the Calvin cycle fixes carbon dioxide.",
+    "",
+    "The French Revolution began in 1789. The storming of the Bastille and the "
+    "Declaration of the Rights of Man marked its early phase.",
+    "Mitochondria produce ATP through cellular respiration and the Krebs cycle.",
+]
+
+
+def test_chunks_map_to_pages_and_slice_the_stored_text():
+    text = "\n".join(page for page in PAGES if page)
+    chunks = chunk_pages(PAGES, max_tokens=40)
+
+    assert chunks[0].page_start == 1
+    assert chunks[-1].page_end == 4
+    # Empty pages keep their number but produce no text
+    assert all(c.page_start != 2 for c in chunks)
+    for chunk in chunks:
+        assert len(text[chunk.start:chunk.end]) <= 40 * 4
+        assert text[chunk.start:chunk.end] == text[chunk.start:chunk.end].strip()
+
+
+def test_vectors_are_compact():
+    # 2 bytes of bucket index and 2 bytes of weight per distinct term
+    assert len(encode_vector("alpha beta beta gamma")) == 3 * 4
+    assert encode_vector("the and of") == b""
+
+
+def test_search_ranks_relevant_chunks_first():
+    index = ChunkIndex.build(PAGES, max_tokens=40)
+
+    selected = index.select("Calvin cycle chlorophyll", k=1)
+    assert "Chlorophyll" in selected
+    assert "Bastille" not in selected
+
+
+def test_search_restricted_to_page_range():
+    index = ChunkIndex.build(PAGES, max_tokens=40)
+
+    assert "Bastille" in index.select(None, k=1, page_range=(3, 3))
+    selected = index.select("cycle", k=1, page_range=(4, 4))
+    assert "Krebs" in selected
+    assert "Calvin" not in selected
+
+
+def test_index_stays_sparse_and_scores_like_a_dense_matrix():
+    pages = [f"Chapter {n}. " + "enzymes catalyse reactions " * 40 for n in range(50)]
+    pages[7] += "Ribosomes translate messenger RNA into proteins."
+    index = ChunkIndex.build(pages, max_tokens=64)
+
+    # Memory follows the number of distinct terms, not chunks x VECTOR_DIM
+    assert index.nbytes < len(index) * VECTOR_DIM
+    assert "Ribosomes" in index.select("ribosomes messenger RNA", k=1)
+
+    dense = np.zeros((len(index), VECTOR_DIM), dtype=np.float32)
+    for row in range(len(index)):
+        start, end = index.indptr[row], index.indptr[row + 1]
+        dense[row, index.indices[start:end]] = index.values[start:end]
+    buckets, weights = _term_weights("catalyse ribosomes")
+    q = np.zeros(VECTOR_DIM, dtype=np.float32)
+    q[buckets] = weights * index.idf[buckets]
+    scores = index._scores("catalyse ribosomes")
+    np.testing.assert_allclose(scores, dense @ q, rtol=1e-5)
@@ -0,0 +1,64 @@
+import uuid
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1.features.search.crud import search_documents, search_sessions
+from app.api.v1.features.search.schemas import SearchData, SearchResult
+
+
+def compiled_sql(db: MagicMock) -> str:
+    stmt = db.execute.await_args.args[0]
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "search, owner_filter",
+    [
+        (search_documents, "extraction_document_owners.user_id ="),
+        (search_sessions, "sessions.user_id ="),
+    ],
+)
+async def test_search_queries_use_the_index_and_scope_to_the_user(search, owner_filter):
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=MagicMock(all=MagicMock(return_value=[])))
+
+    await search(db, uuid.uuid4(), "cell division", limit=10)
+    sql = compiled_sql(db)
+
+    assert "search_vector @@ websearch_to_tsquery" in sql
+    assert owner_filter in sql
+    assert "ts_rank_cd" in sql
+    # Snippets are computed only for the top rows, outside the ranking subquery
+    assert sql.index("ts_headline") < sql.index("FROM (SELECT")
+    # Matches are capped in a CTE before any of them is ranked
+    cte, ranked = sql.split("\n SELECT", 1)
+    assert cte.startswith("WITH candidates AS")
+    assert "search_vector @@" in cte and "LIMIT" in cte
+    assert "ts_rank_cd" not in cte
+    assert "JOIN candidates" in ranked
+
+
+@pytest.mark.anyio
+async def test_search_endpoint_returns_ranked_results(client: AsyncClient):
+    result = SearchResult(
+        kind="document",
+        id=uuid.uuid4(),
+        title="biology.pdf",
+        rank=0.5,
+        snippet="<mark>Mitosis</mark> is cell division",
+        created_at=datetime.utcnow(),
+    )
+    search = AsyncMock(return_value=SearchData(query="mitosis", results=[result]))
+
+    with patch("app.api.v1.features.search.routes.search_service.search", search):
+        response = await client.get("/api/v1/search", params={"q": "mitosis"})
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["results"][0]["snippet"].startswith("<mark>Mitosis")
+    assert search.await_args.args[2:] == ("mitosis", "all", 20)
@@ -0,0 +1,79 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.errors import APIError
+
+ROUTES = "app.api.v1.routes.sessions"
+
+
+def stored_session(**values):
+    now = datetime.utcnow()
+    return {
+        "id": uuid.uuid4(),
+        "user_id": uuid.uuid4(),
+        "title": "Biology",
+        "created_at": now,
+        "updated_at": now,
+        **values,
+    }
+
+
+@pytest.mark.anyio
+async def test_create_session_extracts_and_uploads_concurrently(client: AsyncClient):
+    async def slow_extract(path):
+        await asyncio.sleep(0.2)
+        return "Extracted text"
+
+    async def slow_upload(file_content, filename, content_type, path=None):
+        await asyncio.sleep(0.2)
+        return "https://storage/notes.pdf"
+
+    create = AsyncMock(side_effect=lambda *a, **kw: stored_session(
+        file_url=kw["file_url"], original_text=kw["text"]
+    ))
+    with patch(f"{ROUTES}.pdf_service.extract_text", slow_extract), patch(
+        f"{ROUTES}.storage_service.upload_file", slow_upload
+    ), patch(f"{ROUTES}.sessions_repo.create", create):
+        started = time.perf_counter()
+        response = await client.post(
+            "/api/v1/sessions",
+            data={"title": "Biology"},
+            files={"file": ("notes.pdf", b"%PDF-1.4", "application/pdf")},
+        )
+        elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    assert create.await_args.kwargs["text"] == "Extracted text"
+    assert create.await_args.kwargs["file_url"] == "https://storage/notes.pdf"
+    # max(extract, upload), not their sum
+    assert elapsed < 0.35
+
+
+@pytest.mark.anyio
+async def test_create_session_removes_upload_when_extraction_fails(client: AsyncClient):
+    failure = APIError(code="EXTRACTION_FAILED", message="bad pdf", status_code=500)
+    delete = AsyncMock()
+    create = AsyncMock()
+    with patch(
+        f"{ROUTES}.pdf_service.extract_text", AsyncMock(side_effect=failure)
+    ), patch(
+        f"{ROUTES}.storage_service.upload_file", AsyncMock(return_value="https://s/x")
+    ), patch(f"{ROUTES}.storage_service.delete_file", delete), patch(
+        f"{ROUTES}.sessions_repo.create", create
+    ):
+        response = await client.post(
+            "/api/v1/sessions",
+            data={"title": "Biology"},
+            files={"file": ("notes.pdf", b"%PDF-1.4", "application/pdf")},
+        )
+
+    assert response.status_code == 500
+    assert response.json()["error"]["code"] == "EXTRACTION_FAILED"
+    delete.assert_awaited_once()
+    create.assert_not_awaited()
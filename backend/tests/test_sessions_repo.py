@@ -0,0 +1,77 @@
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.errors import APIError
+from app.db.models import StudySession
+from app.db.repositories.sessions_repo import decode_cursor, sessions_repo
+
+
+def fake_db_factory(db):
+    factory = MagicMock()
+    factory.return_value.__aenter__.return_value = db
+    return factory
+
+
+@pytest.mark.anyio
+async def test_get_by_id_only_returns_the_owners_session():
+    owner, other = uuid.uuid4(), uuid.uuid4()
+    now = datetime.utcnow()
+    stored = StudySession(
+        id=uuid.uuid4(), user_id=owner, title="Biology",
+        created_at=now, updated_at=now,
+    )
+    db = MagicMock()
+    db.get = AsyncMock(return_value=stored)
+
+    with patch(
+        "app.db.repositories.sessions_repo.AsyncSessionLocal", fake_db_factory(db)
+    ):
+        found = await sessions_repo.get_by_id(stored.id, owner)
+        hidden = await sessions_repo.get_by_id(stored.id, other)
+
+    assert found.title == "Biology"
+    assert hidden is None
+    db.get.assert_awaited_with(StudySession, stored.id)
+
+
+def make_session(user_id, minutes_ago):
+    created = datetime(2026, 1, 1, 12, 0) - timedelta(minutes=minutes_ago)
+    return StudySession(
+        id=uuid.uuid4(), user_id=user_id, title=f"S{minutes_ago}",
+        created_at=created, updated_at=created,
+    )
+
+
+@pytest.mark.anyio
+async def test_list_page_is_keyset_paginated_and_skips_the_text_column():
+    user_id = uuid.uuid4()
+    rows = [make_session(user_id, m) for m in range(3)]
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = rows
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+
+    with patch(
+        "app.db.repositories.sessions_repo.AsyncSessionLocal", fake_db_factory(db)
+    ):
+        page, next_cursor = await sessions_repo.list_page(user_id, limit=2)
+        await sessions_repo.list_page(user_id, limit=2, cursor=next_cursor)
+
+    assert [s.title for s in page] == ["S0", "S1"]
+    assert decode_cursor(next_cursor) == (rows[1].created_at, rows[1].id)
+
+    first_sql, second_sql = (
+        str(call.args[0].compile(dialect=postgresql.dialect()))
+        for call in db.execute.await_args_list
+    )
+    assert "original_text" not in first_sql
+    assert "(sessions.created_at, sessions.id) <" in second_sql
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(APIError):
+        decode_cursor("not-a-cursor")
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from app.services.summarization_engine import (
+    MapReduceSummarizer,
+    parse_sectioned_summary,
+    parse_summary_json,
+)
+from app.services.text_chunker import chunk_text, estimate_tokens
+
+
+def test_chunk_text_respects_budget_and_paragraphs():
+    paragraphs = [f"Paragraph {i}. " + "word " * 60 for i in range(20)]
+    text = "\n\n".join(paragraphs)
+
+    chunks = chunk_text(text, max_tokens=200)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(c) <= 200 for c in chunks)
+    # No paragraph is cut when every paragraph fits the budget on its own
+    assert all(c.startswith("Paragraph") for c in chunks)
+
+
+def test_chunk_text_splits_oversize_paragraph():
+    text = "A sentence that keeps going. " * 500
+
+    chunks = chunk_text(text, max_tokens=100)
+
+    assert all(estimate_tokens(c) <= 100 for c in chunks)
+    assert "".join(chunks).replace(" ", "") == text.replace(" ", "")
+
+
+def test_parse_summary_json_handles_fences_and_plain_text():
+    fenced = '```json\n{"summary": "S", "key_points": ["a"], "topics": ["t"]}\n```'
+    assert parse_summary_json(fenced) == {
+        "summary": "S",
+        "key_points": ["a"],
+        "topics": ["t"],
+    }
+    assert parse_summary_json("just text")["summary"] == "just text"
+
+
+def test_parse_sectioned_summary_splits_sections():
+    text = (
+        "The cell is the unit of life.\n\n"
+        "KEY POINTS:\n- Cells divide\n- DNA\nTOPICS: Biology, Cells"
+    )
+    assert parse_sectioned_summary(text) == {
+        "summary": "The cell is the unit of life.",
+        "key_points": ["Cells divide", "DNA"],
+        "topics": ["Biology", "Cells"],
+    }
+
+
+@pytest.mark.anyio
+async def test_map_reduce_keeps_every_prompt_within_budget():
+    prompts = []
+
+    async def generate(prompt, max_output_tokens):
+        prompts.append(prompt)
+        return json.dumps(
+            {"summary": "partial " * 40, "key_points": ["kp"], "topics": ["topic"]}
+        )
+
+    summarizer = MapReduceSummarizer(
+        generate, chunk_tokens=300, partial_max_tokens=64, max_parallel=4
+    )
+    content = "\n\n".join("Study material sentence. " * 20 for _ in range(60))
+
+    result = await summarizer.summarize(content, "brief")
+
+    chunk_count = len(chunk_text(content, 300))
+    assert chunk_count > 10
+    # Map calls plus a logarithmic number of reduce levels, ending in one call
+    assert chunk_count < len(prompts) < 2 * chunk_count
+    assert prompts[-1].startswith("Summarize the following content in 'brief'")
+    # Prompt templates add a small fixed overhead on top of the chunk budget
+    assert max(estimate_tokens(p) for p in prompts) <= 300 + 100
+    assert result["topics"] == ["topic"]
+    assert result["word_count"] == 40
+
+
+@pytest.mark.anyio
+async def test_short_content_is_a_single_call():
+    calls = []
+
+    async def generate(prompt, max_output_tokens):
+        calls.append(prompt)
+        return '{"summary": "Short", "key_points": [], "topics": []}'
+
+    result = await MapReduceSummarizer(generate, chunk_tokens=1000).summarize(
+        "A short note about photosynthesis.", "detailed"
+    )
+
+    assert len(calls) == 1
+    assert result["summary"] == "Short"
@@ -0,0 +1,273 @@
+import io
+import json
+import os
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import UploadFile
+from httpx import AsyncClient
+
+from app.api.v1.features.extraction.crud import get_extraction_by_hash
+from app.core.config import settings
+from app.core.errors import APIError
+from app.utils.uploads import spool_upload
+
+
+@pytest.mark.anyio
+async def test_spool_upload_writes_temp_file():
+    file = UploadFile(io.BytesIO(b"%PDF-1.4 hello"), filename="notes.pdf")
+
+    upload = await spool_upload(file)
+    try:
+        assert upload.size == 14
+        assert upload.path.endswith(".pdf")
+        with open(upload.path, "rb") as f:
+            assert f.read() == b"%PDF-1.4 hello"
+    finally:
+        upload.cleanup()
+    assert not os.path.exists(upload.path)
+
+
+@pytest.mark.anyio
+async def test_spool_upload_rejects_oversize_file():
+    file = UploadFile(io.BytesIO(b"x" * (1024 * 1024 + 1)), filename="big.pdf")
+
+    with pytest.raises(APIError) as exc:
+        await spool_upload(file, max_size_mb=1)
+    assert exc.value.code == "FILE_TOO_LARGE"
+
+
+@pytest.mark.anyio
+async def test_upload_over_limit_is_rejected_early(client: AsyncClient):
+    too_big = b"x" * (settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024 + 128 * 1024)
+    files = {"file": ("huge.pdf", too_big, "application/pdf")}
+
+    response = await client.post("/api/v1/extraction/upload", files=files)
+
+    assert response.status_code == 413
+    assert response.json()["error"]["code"] == "FILE_TOO_LARGE"
+
+
+@pytest.mark.anyio
+async def test_chunked_upload_over_limit_is_rejected(client: AsyncClient):
+    boundary = "limitboundary"
+    chunk = b"x" * (1024 * 1024)
+
+    async def body():
+        yield (
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="huge.pdf"\r\n'
+            "Content-Type: application/pdf\r\n\r\n"
+        ).encode()
+        for _ in range(settings.MAX_UPLOAD_SIZE_MB + 2):
+            yield chunk
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = await client.post(
+        "/api/v1/extraction/upload",
+        content=body(),
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+    )
+
+    assert "content-length" not in response.request.headers
+    assert response.status_code == 413
+    assert response.json()["error"]["code"] == "FILE_TOO_LARGE"
+
+
+@pytest.mark.anyio
+async def test_upload_streams_pages_as_ndjson(client: AsyncClient):
+    mock_pdf = MagicMock()
+    pages = []
+    for i in range(2):
+        page = MagicMock()
+        page.extract_text.return_value = f"Page {i + 1} text"
+        pages.append(page)
+    mock_pdf.pages = pages
+    mock_pdf.__enter__.return_value = mock_pdf
+
+    record = SimpleNamespace(
+        id=uuid.uuid4(),
+        filename="notes.pdf",
+        content="Page 1 text\nPage 2 text",
+        page_count=2,
+        word_count=6,
+        language="en",
+        created_at=datetime.utcnow(),
+    )
+    create_record = AsyncMock(return_value=record)
+    services = "app.api.v1.features.extraction.services"
+
+    with patch("pdfplumber.open", return_value=mock_pdf), patch(
+        f"{services}.create_extraction_record", create_record
+    ), patch(f"{services}.get_extraction_by_hash", AsyncMock(return_value=None)), patch(
+        f"{services}.link_document_owner", AsyncMock()
+    ), patch(
+        f"{services}.retrieval_service.index_document", AsyncMock()
+    ) as index_document:
+        files = {"file": ("notes.pdf", b"%PDF-1.4", "application/pdf")}
+        response = await client.post(
+            "/api/v1/extraction/upload?stream=ndjson", files=files
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    messages = [json.loads(line) for line in response.text.splitlines()]
+    assert [m["type"] for m in messages] == ["page", "page", "complete"]
+    assert messages[0] == {"type": "page", "page": 1, "text": "Page 1 text"}
+    assert messages[-1]["data"]["metadata"]["page_count"] == 2
+    assert "text" not in messages[-1]["data"]
+    assert messages[-1]["deduplicated"] is False
+    assert create_record.await_args.kwargs["content"] == "Page 1 text\nPage 2 text"
+    texts = ["Page 1 text", "Page 2 text"]
+    assert index_document.await_args.args[1:] == (record, texts)
+    assert create_record.await_args.kwargs["pages"] == texts
+
+
+@pytest.mark.anyio
+async def test_get_document_pages_reads_requested_range(client: AsyncClient):
+    document_id = uuid.uuid4()
+    rows = [
+        SimpleNamespace(
+            page_number=n, text=f"Page {n} text", char_count=11, word_count=3
+        )
+        for n in (2, 3)
+    ]
+    get_pages = AsyncMock(return_value=rows)
+    services = "app.api.v1.features.extraction.services"
+
+    with patch(f"{services}.user_owns_document", AsyncMock(return_value=True)), patch(
+        f"{services}.get_document_pages", get_pages
+    ):
+        response = await client.get(
+            f"/api/v1/extraction/{document_id}/pages?start=2&end=3"
+        )
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert [p["page_number"] for p in data["pages"]] == [2, 3]
+    assert get_pages.await_args.args[1:] == (document_id, 2, 3)
+
+
+@pytest.mark.anyio
+async def test_get_document_pages_of_unowned_document(client: AsyncClient):
+    services = "app.api.v1.features.extraction.services"
+
+    with patch(f"{services}.user_owns_document", AsyncMock(return_value=False)):
+        response = await client.get(f"/api/v1/extraction/{uuid.uuid4()}/pages")
+
+    assert response.status_code == 404
+    assert response.json()["error"]["code"] == "DOCUMENT_NOT_FOUND"
+
+
+@pytest.mark.anyio
+async def test_upload_without_text_returns_id_and_metadata(client: AsyncClient):
+    record = SimpleNamespace(
+        id=uuid.uuid4(),
+        filename="notes.pdf",
+        content="Long transcript " * 1000,
+        page_count=40,
+        word_count=2000,
+        language="en",
+        created_at=datetime.utcnow(),
+    )
+    services = "app.api.v1.features.extraction.services"
+
+    find_record = AsyncMock(return_value=record)
+
+    with patch(f"{services}.get_extraction_by_hash", find_record), patch(
+        f"{services}.link_document_owner", AsyncMock()
+    ):
+        files = {"file": ("notes.pdf", b"%PDF-1.4", "application/pdf")}
+        response = await client.post(
+            "/api/v1/extraction/upload?include_text=false", files=files
+        )
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["id"] == str(record.id)
+    assert data["metadata"] == {"page_count": 40, "word_count": 2000, "language": "en"}
+    assert "text" not in data
+    # The text column is not read when the text is not returned
+    assert find_record.await_args.kwargs["load_content"] is False
+
+
+@pytest.mark.anyio
+async def test_hash_lookup_can_skip_the_text_column():
+    db = MagicMock(execute=AsyncMock())
+
+    await get_extraction_by_hash(db, "abc", load_content=False)
+
+    columns = db.execute.await_args.args[0].compile().string.split("FROM")[0]
+    assert "extraction_documents.filename" in columns
+    assert "extraction_documents.content," not in columns
+
+
+TEXT = "Mitosis → two cells. Meiosis → four gametes.".encode("utf-8")
+SIZE = len(TEXT)
+
+
+def fake_text_reads():
+    async def read(db, document_id, start, length):
+        return TEXT[start:start + length]
+
+    return AsyncMock(side_effect=read)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "query, headers, status, body, content_range",
+    [
+        ("", {}, 200, TEXT, None),
+        ("", {"Range": "bytes=0-6"}, 206, TEXT[:7], f"bytes 0-6/{SIZE}"),
+        (
+            "",
+            {"Range": "bytes=-8"},
+            206,
+            TEXT[-8:],
+            f"bytes {SIZE - 8}-{SIZE - 1}/{SIZE}",
+        ),
+        ("?offset=10&length=1000", {}, 206, TEXT[10:], f"bytes 10-{SIZE - 1}/{SIZE}"),
+        ("?offset=10", {"Range": "bytes=2-3"}, 206, TEXT[2:4], f"bytes 2-3/{SIZE}"),
+        ("", {"Range": "lines=1-2"}, 200, TEXT, None),
+    ],
+)
+async def test_document_text_is_streamed_in_ranges(
+    client: AsyncClient, monkeypatch, query, headers, status, body, content_range
+):
+    monkeypatch.setattr(settings, "EXTRACTION_TEXT_CHUNK_BYTES", 5)
+    reads = fake_text_reads()
+    services = "app.api.v1.features.extraction.services"
+
+    with patch(f"{services}.user_owns_document", AsyncMock(return_value=True)), patch(
+        f"{services}.get_document_text_size", AsyncMock(return_value=len(TEXT))
+    ), patch(f"{services}.read_document_text", reads):
+        response = await client.get(
+            f"/api/v1/extraction/{uuid.uuid4()}/text{query}", headers=headers
+        )
+
+    assert response.status_code == status
+    assert response.content == body
+    assert response.headers["content-length"] == str(len(body))
+    assert response.headers.get("content-range") == content_range
+    assert response.headers["accept-ranges"] == "bytes"
+    # Read in slices of at most EXTRACTION_TEXT_CHUNK_BYTES
+    assert all(call.args[3] <= 5 for call in reads.await_args_list)
+
+
+@pytest.mark.anyio
+async def test_document_text_range_past_the_end(client: AsyncClient):
+    services = "app.api.v1.features.extraction.services"
+
+    with patch(f"{services}.user_owns_document", AsyncMock(return_value=True)), patch(
+        f"{services}.get_document_text_size", AsyncMock(return_value=len(TEXT))
+    ):
+        response = await client.get(
+            f"/api/v1/extraction/{uuid.uuid4()}/text",
+            headers={"Range": f"bytes={len(TEXT)}-"},
+        )
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(TEXT)}"